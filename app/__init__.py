@@ -4,49 +4,140 @@ This module initializes the Flask application, configures extensions,
 and registers blueprints.
 """
 
+import os
+import sys
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
-from flask_migrate import Migrate
-from config import Config
+from config import PROFILES
 from dotenv import load_dotenv
 
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
 csrf = CSRFProtect()
-migrate = Migrate()
 
 # Load environment variables from .env file
 load_dotenv()
 
 
-def create_app():
+def create_app(config_class=None):
     """Create and configure the Flask application.
 
     This function initializes the Flask app, configures SQLAlchemy,
-    LoginManager, CSRF protection, and database migration. It also
-    imports and registers blueprints for routing.
+    LoginManager, CSRF protection, and the database migration commands. It
+    also imports and registers blueprints for routing.
+
+    The schema is managed with Flask-Migrate (``flask db upgrade``); tables
+    are only created on startup when ``DB_AUTO_CREATE`` is set.
+
+    Args:
+        config_class (type): The configuration class to load. Defaults to
+            the profile named by the APP_PROFILE environment variable.
 
     Returns:
         Flask: The initialized Flask application instance.
     """
     app = Flask(__name__)
-    app.config.from_object(Config)
+    if config_class is None:
+        config_class = PROFILES[os.getenv('APP_PROFILE', 'default')]
+    app.config.from_object(config_class)
+
+    # Tune the engine (pooling, statement caching, SQLite pragmas)
+    from .engine import configure_engine, register_sqlite_pragmas
+    configure_engine(app)
 
     # Initialize extensions with the app
     db.init_app(app)                # Initialize SQLAlchemy with the app
+    register_sqlite_pragmas(app, db)
     login_manager.init_app(app)     # Initialize LoginManager with the app
     csrf.init_app(app)              # Initialize CSRF protection
-    migrate.init_app(app, db)       # Initialize database migration
+
+    # Flask-Migrate pulls in Alembic, so it is only set up here for scripts
+    # that already imported it (e.g. to call flask_migrate.upgrade());
+    # `flask db` sets it up on demand
+    if 'flask_migrate' in sys.modules:
+        from flask_migrate import Migrate
+        Migrate(app, db)            # Initialize database migration
 
     # Import and register blueprints
     from .routes import main        # Import the main blueprint
     app.register_blueprint(main)    # Register the main blueprint
 
-    # Create database tables if they don't exist
-    with app.app_context():
-        db.create_all()             # Create all database tables
+    # The JSON API authenticates by bearer token instead of session cookie
+    from .api import api
+    csrf.exempt(api)
+    app.register_blueprint(api)
+
+    # Set how often the shared question bank version is checked
+    from .services.quiz_service import bank_version
+    bank_version.configure(app.config['QUESTION_BANK_VERSION_TTL'])
+
+    # Size the per-process cache behind the user loader
+    from .services.user_cache import user_cache
+    user_cache.configure(app.config['USER_CACHE_SIZE'],
+                         app.config['USER_CACHE_TTL'])
+
+    # Size the per-process cache of rendered result details
+    from .services.result_cache import result_fragments
+    result_fragments.configure(app.config['RESULT_CACHE_SIZE'],
+                               app.config['RESULT_CACHE_BYTES'])
+
+    # Set up the server-side store for in-progress quiz attempts
+    from .services.attempt_service import init_attempt_store
+    init_attempt_store(app)
+
+    # Size the in-memory top-K leaderboards
+    from .services.leaderboard_service import leaderboard
+    leaderboard.configure(app.config['LEADERBOARD_SIZE'],
+                          app.config['LEADERBOARD_TTL'])
+
+    # Configure the process pool used for password hashing
+    from .services.password_service import password_hasher
+    password_hasher.configure(app.config['PASSWORD_HASH_WORKERS'],
+                              app.config['PASSWORD_HASH_QUEUE_SIZE'],
+                              app.config['PASSWORD_HASH_TIMEOUT'],
+                              app.config['PASSWORD_HASH_METHOD'])
+
+    # Size the batches of background regrades after answer key edits
+    from .services.regrade_service import regrader
+    regrader.configure(app.config['REGRADE_BATCH_SIZE'])
+
+    # Set how often the per-process list of scheduled exams is reloaded
+    from .services.exam_service import exam_schedule
+    exam_schedule.configure(app.config['EXAM_SCHEDULE_TTL'])
+
+    # Read archived quiz results from the segment files under instance/
+    from .services.result_archive import result_archive
+    result_archive.configure(app.config['RESULT_ARCHIVE_DIR']
+                             or os.path.join(app.instance_path, 'archive'))
+
+    # Register the maintenance and (lazily loaded) migration CLI commands
+    from .commands import register_commands
+    register_commands(app)
+
+    # Record per-request latency, SQL and template metrics
+    from .metrics import init_metrics
+    init_metrics(app, db)
+
+    # Profile sampled requests when profiling is turned on
+    from .profiling import init_profiling
+    init_profiling(app)
+
+    # Create missing tables in development; otherwise the schema comes from
+    # the migrations and the search index is checked on first search
+    if app.config['DB_AUTO_CREATE']:
+        with app.app_context():
+            db.create_all()         # Create all database tables
+
+        # Set up full-text search over the question bank
+        from .services.search_service import init_search_index
+        init_search_index(app)
+
+    # Replay journaled submissions a stopped process left behind, and set
+    # up the write-behind submission buffer if it is turned on
+    from .services.submission_buffer import init_submission_buffer
+    init_submission_buffer(app)
 
     return app                      # Return the initialized Flask application
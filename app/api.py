@@ -0,0 +1,249 @@
+"""Versioned JSON API for headless and mobile clients.
+
+Clients exchange a username and password for a bearer token at
+``POST /api/v1/tokens`` and send it as ``Authorization: Bearer <token>``.
+Tokens are signed with the app's secret key and expire after
+``API_TOKEN_TTL`` seconds, so checking one needs no database access.
+
+Finished results never change for a given question bank, so they are
+served with a strong ETag derived from the result ID and the bank
+version; a repeat fetch carrying it in ``If-None-Match`` gets a 304
+before the database is touched.
+"""
+
+from flask import Blueprint, current_app, g, jsonify, request
+from functools import wraps
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from time import time
+from app import db
+from app.models import User
+from app.services.attempt_service import get_attempt_store
+from app.services.exam_service import draw_questions
+from app.services.grading_service import get_answer_key
+from app.services.password_service import (HashingPoolSaturated,
+                                           password_hasher)
+from app.services.result_cache import result_etag
+from app.services.result_service import (get_result_answers,
+                                         get_results_page, get_user_result)
+from app.services.snapshot_service import get_snapshots
+from app.services.submission_service import (submit_attempt,
+                                             wait_for_submissions)
+from app.services.user_cache import user_cache
+
+# Create a blueprint for the API, versioned by URL prefix
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Answer identifiers, in the order options are listed in payloads
+ANSWER_IDS = 'ABCD'
+
+
+def _error(status, message, headers=None):
+    """Returns a JSON error response."""
+    return jsonify(error=message), status, headers or {}
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.secret_key, salt='api-token')
+
+
+def issue_token(user_id):
+    """Returns a signed bearer token for a user."""
+    return _serializer().dumps(user_id)
+
+
+def token_required(view):
+    """Authenticates the request by its bearer token.
+
+    The user is loaded through the user cache and kept in ``g.api_user``.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        scheme, _, token = request.headers.get('Authorization', '') \
+            .partition(' ')
+        user = None
+        if scheme.lower() == 'bearer' and token:
+            try:
+                user_id = _serializer().loads(
+                    token, max_age=current_app.config['API_TOKEN_TTL'])
+                user = user_cache.get(int(user_id))
+            except (BadSignature, TypeError, ValueError):
+                user = None
+        if user is None:
+            return _error(401, 'A valid bearer token is required.',
+                          {'WWW-Authenticate': 'Bearer'})
+        g.api_user = user
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def _question_payload(snapshot):
+    return {'id': snapshot.id, 'text': snapshot.question_text,
+            'options': [option.text for option in snapshot.options]}
+
+
+def _attempt_payload(attempt):
+    return {'id': attempt.id, 'deadline': int(attempt.deadline),
+            'questions': [_question_payload(snapshot) for snapshot
+                          in get_snapshots(attempt.question_ids)]}
+
+
+def _result_summary(result):
+    return {'id': result.id, 'score': result.score,
+            'total': result.total_questions,
+            'at': result.timestamp.isoformat()}
+
+
+@api.errorhandler(HashingPoolSaturated)
+def hashing_pool_saturated(error):
+    """Reject token requests quickly while the hashing pool is busy."""
+    return _error(503, 'The server is busy, please try again in a moment.',
+                  {'Retry-After': '1'})
+
+
+@api.route('/tokens', methods=['POST'])
+def create_token():
+    """Exchange a username and password for a bearer token.
+
+    Expects a JSON body with ``username`` and ``password``.
+
+    Returns:
+        Response: The token and its lifetime in seconds.
+    """
+    body = request.get_json(silent=True) or {}
+    user = User.query.filter_by(username=body.get('username')).first()
+    if not user or not password_hasher.verify_password(
+            user.password, str(body.get('password', ''))):
+        return _error(401, 'Invalid username or password.')
+    return jsonify(token=issue_token(user.id),
+                   expires_in=current_app.config['API_TOKEN_TTL']), 201
+
+
+@api.route('/attempts', methods=['POST'])
+@token_required
+def start_attempt():
+    """Start a quiz attempt with a random set of questions.
+
+    While an exam is open, the attempt gets one of its papers instead,
+    with the time limit ending at the exam's closing time at the latest.
+
+    Returns:
+        Response: The attempt ID, its deadline (Unix time) and the
+        questions, each with its four options in A-D order.
+    """
+    attempts = get_attempt_store()
+    question_ids, _, time_limit = draw_questions(
+        current_app.config.get('QUIZ_TIME_LIMIT', 1200))
+    questions = get_snapshots(question_ids)
+    if not questions:
+        return _error(409, 'No questions available.')
+    attempt = attempts.create(
+        g.api_user.id, [question.id for question in questions], time_limit)
+    db.session.commit()
+    return jsonify(_attempt_payload(attempt)), 201
+
+
+@api.route('/attempts/<attempt_id>', methods=['GET'])
+@token_required
+def get_attempt(attempt_id):
+    """Fetch the questions of an attempt in progress.
+
+    Returns:
+        Response: The attempt, as returned when it was started.
+    """
+    attempt = get_attempt_store().get(attempt_id, g.api_user.id)
+    if attempt is None:
+        return _error(404, 'Attempt not found or expired.')
+    return jsonify(_attempt_payload(attempt))
+
+
+@api.route('/attempts/<attempt_id>/answers', methods=['POST'])
+@token_required
+def submit_answers(attempt_id):
+    """Submit the answers of an attempt.
+
+    Expects a JSON body ``{"answers": {"<question id>": "A", ...}}``;
+    questions left out are recorded as unanswered. Submissions are
+    accepted until the deadline plus ``QUIZ_ATTEMPT_GRACE`` seconds.
+
+    Returns:
+        Response: The summary of the stored result.
+    """
+    attempts = get_attempt_store()
+    attempt = attempts.get(attempt_id, g.api_user.id)
+    if attempt is None:
+        return _error(404, 'Attempt not found or expired.')
+    if time() > attempt.deadline + attempts.grace:
+        return _error(409, 'The time limit of this attempt has passed.')
+
+    body = request.get_json(silent=True) or {}
+    submitted = body.get('answers')
+    if not isinstance(submitted, dict):
+        return _error(400, 'Expected an "answers" object.')
+    answers = {}
+    for question_id, answer in submitted.items():
+        if answer not in (None, *ANSWER_IDS):
+            return _error(400, f'Invalid answer for question {question_id}.')
+        try:
+            answers[int(question_id)] = answer
+        except ValueError:
+            return _error(400, f'Invalid question ID {question_id!r}.')
+
+    result = submit_attempt(attempt, g.api_user, answers)
+    return jsonify(_result_summary(result)), 201
+
+
+@api.route('/results', methods=['GET'])
+@token_required
+def list_results():
+    """Page through the user's results, newest first.
+
+    The ``cursor`` query argument selects the page that follows a
+    previously returned one, and ``limit`` the page size (1 to 100).
+
+    Returns:
+        Response: The result summaries and the cursor of the next page,
+        or null on the last page.
+    """
+    wait_for_submissions(g.api_user.id)
+    per_page = max(1, min(request.args.get('limit', type=int)
+                          or current_app.config.get('RESULTS_PER_PAGE', 20),
+                          100))
+    results, next_cursor = get_results_page(
+        g.api_user.id, request.args.get('cursor'), per_page)
+    return jsonify(results=[_result_summary(result) for result in results],
+                   next=next_cursor)
+
+
+@api.route('/results/<int:result_id>', methods=['GET'])
+@token_required
+def get_result(result_id):
+    """Fetch a finished result with its answers.
+
+    Answers are ``[question ID, chosen answer or null, correct answer]``
+    triples in quiz order. The response carries a strong ETag and must be
+    revalidated, which costs no database work while the tag matches.
+
+    Returns:
+        Response: The result, or 304 if the client's copy is current.
+    """
+    etag = result_etag('api', g.api_user.id, result_id)
+    if etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        wait_for_submissions(g.api_user.id, result_id)
+        result = get_user_result(g.api_user.id, result_id)
+        if result is None:
+            return _error(404, 'Result not found.')
+        question_ids, user_answers = get_result_answers(result)
+        answer_key = get_answer_key(question_ids)
+        payload = _result_summary(result)
+        payload['answers'] = [
+            [question_id,
+             None if user_answers[str(question_id)] == 'None'
+             else user_answers[str(question_id)],
+             answer_key.get(question_id)]
+            for question_id in question_ids]
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
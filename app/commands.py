@@ -0,0 +1,234 @@
+"""Flask CLI commands for maintaining the quiz application's data."""
+
+from contextlib import nullcontext
+from datetime import timezone
+
+import click
+from flask import current_app
+from flask.cli import ScriptInfo, with_appcontext
+
+
+class MigrateGroup(click.Group):
+    """The ``flask db`` commands of Flask-Migrate, loaded on first use.
+
+    Flask-Migrate imports Alembic, which only the migration commands need,
+    so the extension is set up when a ``db`` command is looked up instead
+    of on every application start.
+    """
+
+    def _load(self, ctx):
+        from app import db
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as migrate_group
+
+        app = ctx.ensure_object(ScriptInfo).load_app()
+        if 'migrate' not in app.extensions:
+            Migrate(app, db)
+        return migrate_group
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # Parse and run the arguments with Flask-Migrate's own group
+        return self._load(parent).make_context(info_name, args, parent,
+                                               **extra)
+
+    def invoke(self, ctx):
+        return ctx.command.invoke(ctx)
+
+
+@click.command('backfill-answers')
+@click.option('--batch-size', default=1000, show_default=True,
+              help='Number of results to process per transaction.')
+@with_appcontext
+def backfill_answers_command(batch_size):
+    """Copy legacy JSON answers of existing results into quiz_answer."""
+    from app.services.result_service import backfill_answers
+
+    def report(results_written, answers_written):
+        click.echo(f'{results_written} results, '
+                   f'{answers_written} answers backfilled')
+
+    results_written, answers_written = backfill_answers(batch_size, report)
+    click.echo(f'Done: {results_written} results, '
+               f'{answers_written} answers.')
+
+
+@click.command('reap-attempts')
+@with_appcontext
+def reap_attempts_command():
+    """Delete quiz attempts that are past their deadline."""
+    from app import db
+    from app.services.attempt_service import get_attempt_store
+
+    count = get_attempt_store().reap()
+    db.session.commit()
+    click.echo(f'Reaped {count} expired quiz attempts.')
+
+
+@click.command('rebuild-question-stats')
+@with_appcontext
+def rebuild_question_stats_command():
+    """Recompute per-question statistics from the stored answers."""
+    from app.services.stats_service import rebuild_question_stats
+
+    count = rebuild_question_stats()
+    click.echo(f'Rebuilt statistics for {count} questions.')
+
+
+@click.command('rebuild-leaderboard')
+@click.option('--batch-size', default=10000, show_default=True,
+              help='Number of results read per query.')
+@with_appcontext
+def rebuild_leaderboard_command(batch_size):
+    """Recompute the leaderboard rollups from the stored results."""
+    from app.services.leaderboard_service import rebuild_leaderboard
+
+    count = rebuild_leaderboard(batch_size)
+    click.echo(f'Rebuilt {count} leaderboard entries.')
+
+
+@click.command('regrade-results')
+@click.option('--question', 'question_ids', type=int, multiple=True,
+              help='Only regrade answers to this question ID (repeatable).')
+@click.option('--batch-size', default=5000, show_default=True,
+              help='Number of answers per transaction.')
+@with_appcontext
+def regrade_results_command(question_ids, batch_size):
+    """Regrade stored results against the current answer key."""
+    from app.services.regrade_service import regrade_results
+
+    def report(checked, total, results_changed):
+        click.echo(f'{checked}/{total} answers checked, '
+                   f'{results_changed} results rescored')
+
+    checked, answers_changed, results_changed = regrade_results(
+        question_ids or None, batch_size, report)
+    click.echo(f'Done: {checked} answers checked, {answers_changed} '
+               f'regraded, {results_changed} results rescored.')
+
+
+@click.command('import-questions')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']),
+              help='File format; defaults to the file extension.')
+@click.option('--batch-size', default=1000, show_default=True,
+              help='Number of rows inserted per transaction.')
+@click.option('--errors', 'errors_path', type=click.Path(dir_okay=False),
+              help='Write rejected rows to this CSV file.')
+@with_appcontext
+def import_questions_command(path, file_format, batch_size, errors_path):
+    """Bulk-import quiz questions from a CSV or JSONL file."""
+    from app.services.question_io_service import import_questions
+
+    file_format = file_format or path.rsplit('.', 1)[-1].lower()
+
+    def report(imported, rejected):
+        click.echo(f'{imported} imported, {rejected} rejected')
+
+    errors = (open(errors_path, 'w', newline='', encoding='utf-8')
+              if errors_path else nullcontext())
+    with open(path, newline='', encoding='utf-8-sig') as stream, \
+            errors as error_stream:
+        imported, rejected = import_questions(
+            stream, file_format, batch_size, error_stream, report)
+    click.echo(f'Done: {imported} imported, {rejected} rejected.')
+
+
+@click.command('export-questions')
+@click.argument('path', type=click.Path(dir_okay=False))
+@click.option('--format', 'file_format', type=click.Choice(['csv', 'jsonl']),
+              help='File format; defaults to the file extension.')
+@with_appcontext
+def export_questions_command(path, file_format):
+    """Export the question bank to a CSV or JSONL file."""
+    from app.services.question_io_service import export_questions
+
+    file_format = file_format or path.rsplit('.', 1)[-1].lower()
+    with open(path, 'w', newline='', encoding='utf-8') as stream:
+        for chunk in export_questions(file_format):
+            stream.write(chunk)
+    click.echo(f'Exported questions to {path}.')
+
+
+@click.command('export-answers')
+@click.argument('directory', type=click.Path(file_okay=False))
+@click.option('--format', 'file_format',
+              type=click.Choice(['parquet', 'npz', 'csv']),
+              help='File format; defaults to Parquet if pyarrow is '
+                   'installed, then npz if NumPy is, then gzipped CSV.')
+@click.option('--full', is_flag=True,
+              help='Export everything, archived results included, and '
+                   'leave the watermark alone.')
+@click.option('--since', type=click.DateTime(),
+              help='Only export results taken after this time (UTC) when '
+                   'the directory has no watermark yet.')
+@click.option('--lag', type=int,
+              help='Seconds of the newest results left for the next run '
+                   '(default: EXPORT_WATERMARK_LAG).')
+@click.option('--chunk-size', type=int,
+              help='Number of results read and written at a time '
+                   '(default: EXPORT_CHUNK_SIZE).')
+@with_appcontext
+def export_answers_command(directory, file_format, full, since, lag,
+                           chunk_size):
+    """Export answered questions to a columnar file in DIRECTORY."""
+    from app.services.export_service import export_answers
+
+    def report(results, rows):
+        click.echo(f'{results} results, {rows} answers exported')
+
+    try:
+        path, results, rows = export_answers(
+            directory, file_format, incremental=not full,
+            # The option is documented as UTC, not the server's local time
+            since=since and since.replace(tzinfo=timezone.utc),
+            lag=current_app.config['EXPORT_WATERMARK_LAG'] if lag is None
+            else lag,
+            chunk_size=chunk_size or current_app.config['EXPORT_CHUNK_SIZE'],
+            progress=report)
+    except ValueError as error:
+        raise click.UsageError(str(error))
+    if path is None:
+        click.echo('No new answers to export.')
+    else:
+        click.echo(f'Done: {results} results, {rows} answers exported to '
+                   f'{path}.')
+
+
+@click.command('archive-results')
+@click.option('--older-than', type=float,
+              help='Archive results taken more than this many days ago '
+                   '(default: RESULT_ARCHIVE_AGE).')
+@click.option('--segment-size', default=100000, show_default=True,
+              help='Maximum number of results per archive segment.')
+@with_appcontext
+def archive_results_command(older_than, segment_size):
+    """Move old quiz results from the database to archive segments."""
+    from app.services.result_archive import archive_results, result_archive
+
+    def report(results, answers):
+        click.echo(f'{results} results, {answers} answers archived')
+
+    if older_than is None:
+        older_than = current_app.config['RESULT_ARCHIVE_AGE']
+    results, answers = archive_results(result_archive.directory, older_than,
+                                       segment_size, report)
+    click.echo(f'Done: {results} results, {answers} answers archived.')
+
+
+def register_commands(app):
+    """Register the CLI commands with the Flask application.
+
+    Args:
+        app (Flask): The application to register the commands with.
+    """
+    app.cli.add_command(backfill_answers_command)
+    app.cli.add_command(reap_attempts_command)
+    app.cli.add_command(rebuild_question_stats_command)
+    app.cli.add_command(rebuild_leaderboard_command)
+    app.cli.add_command(regrade_results_command)
+    app.cli.add_command(import_questions_command)
+    app.cli.add_command(export_questions_command)
+    app.cli.add_command(export_answers_command)
+    app.cli.add_command(archive_results_command)
+    app.cli.add_command(MigrateGroup('db',
+                                     help='Perform database migrations.'))
@@ -0,0 +1,105 @@
+"""SQLAlchemy engine tuning for the quiz application.
+
+Builds the engine options (connection pooling and statement caching)
+from the application config and applies the SQLite connection pragmas
+(WAL journal, synchronous mode, busy timeout, page cache and mmap size)
+on every new connection.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def _is_sqlite(config):
+    """Returns whether the configured database is SQLite."""
+    return make_url(config['SQLALCHEMY_DATABASE_URI']).get_backend_name() \
+        == 'sqlite'
+
+
+def engine_options(config):
+    """
+    Builds the engine options from the application config.
+
+    Server databases get a sized, recycled and pre-pinged connection pool.
+    SQLite gets a larger per-connection prepared statement cache; its
+    pool is left to SQLAlchemy's defaults since writes serialize anyway.
+
+    Args:
+        config (Config): The application config mapping.
+
+    Returns:
+        dict: The engine options.
+    """
+    options = {'query_cache_size': config['DB_QUERY_CACHE_SIZE']}
+    if _is_sqlite(config):
+        options['connect_args'] = {
+            'cached_statements': config['SQLITE_STATEMENT_CACHE']}
+    else:
+        options.update(pool_size=config['DB_POOL_SIZE'],
+                       max_overflow=config['DB_MAX_OVERFLOW'],
+                       pool_recycle=config['DB_POOL_RECYCLE'],
+                       pool_timeout=config['DB_POOL_TIMEOUT'],
+                       pool_pre_ping=True)
+    return options
+
+
+def sqlite_pragmas(config):
+    """
+    Returns the PRAGMA statements to run on each new SQLite connection.
+
+    Args:
+        config (Config): The application config mapping.
+
+    Returns:
+        list: The PRAGMA statements; settings set to None are skipped.
+    """
+    settings = [('journal_mode', config['SQLITE_JOURNAL_MODE']),
+                ('synchronous', config['SQLITE_SYNCHRONOUS']),
+                ('busy_timeout', config['SQLITE_BUSY_TIMEOUT']),
+                ('cache_size', config['SQLITE_CACHE_SIZE']),
+                ('mmap_size', config['SQLITE_MMAP_SIZE'])]
+    return [f'PRAGMA {name}={value}' for name, value in settings
+            if value is not None]
+
+
+def configure_engine(app):
+    """
+    Merges the tuned engine options into ``SQLALCHEMY_ENGINE_OPTIONS``.
+
+    Must run before ``db.init_app``, which creates the engine. Options set
+    explicitly in ``SQLALCHEMY_ENGINE_OPTIONS`` take precedence.
+
+    Args:
+        app (Flask): The application being configured.
+    """
+    options = engine_options(app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def register_sqlite_pragmas(app, db):
+    """
+    Runs the configured PRAGMAs on every new SQLite connection.
+
+    Does nothing for server databases. Must run after ``db.init_app`` and
+    before the first connection is opened.
+
+    Args:
+        app (Flask): The application whose engine should be tuned.
+        db (SQLAlchemy): The Flask-SQLAlchemy extension.
+    """
+    if not _is_sqlite(app.config):
+        return
+
+    pragmas = sqlite_pragmas(app.config)
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
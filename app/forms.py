@@ -1,6 +1,9 @@
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileAllowed, FileRequired
 from wtforms import StringField, PasswordField, SubmitField, SelectField, TextAreaField, RadioField
-from wtforms.validators import DataRequired, EqualTo, Length
+from wtforms import DateTimeLocalField, IntegerField
+from wtforms.validators import (DataRequired, EqualTo, Length, NumberRange,
+                                ValidationError)
 
 
 class RegistrationForm(FlaskForm):
@@ -55,6 +58,7 @@ class QuestionForm(FlaskForm):
 
     This form captures the information required to create or update a quiz question,
     including the question text, four possible answers, and the correct answer.
+    Text lengths are capped to match the database columns.
 
     Attributes:
         question_text (TextAreaField): The field for the quiz question text.
@@ -67,15 +71,20 @@ class QuestionForm(FlaskForm):
         submit (SubmitField): The submission button.
     """
     question_text = TextAreaField('Question',
-                                  validators=[DataRequired()])
+                                  validators=[DataRequired(),
+                                              Length(max=500)])
     answer_a = StringField('Answer A',
-                           validators=[DataRequired()])
+                           validators=[DataRequired(),
+                                       Length(max=100)])
     answer_b = StringField('Answer B',
-                           validators=[DataRequired()])
+                           validators=[DataRequired(),
+                                       Length(max=100)])
     answer_c = StringField('Answer C',
-                           validators=[DataRequired()])
+                           validators=[DataRequired(),
+                                       Length(max=100)])
     answer_d = StringField('Answer D',
-                           validators=[DataRequired()])
+                           validators=[DataRequired(),
+                                       Length(max=100)])
     correct_answer = SelectField('Correct Answer',
                                  choices=[
                                      ('A', 'Answer A'),
@@ -85,3 +94,57 @@ class QuestionForm(FlaskForm):
                                  ],
                                  validators=[DataRequired()])
     submit = SubmitField('Save Question')
+
+
+class QuestionImportForm(FlaskForm):
+    """Form for uploading a file of quiz questions.
+
+    Attributes:
+        file (FileField): The CSV or JSONL file to import. Each row holds
+                          the fields of ``QuestionForm``.
+        submit (SubmitField): The submission button.
+    """
+    file = FileField('Questions File',
+                     validators=[FileRequired(),
+                                 FileAllowed(['csv', 'jsonl'],
+                                             'CSV or JSONL files only.')])
+    submit = SubmitField('Import Questions')
+
+
+class ExamForm(FlaskForm):
+    """Form for scheduling an exam.
+
+    Attributes:
+        title (StringField): The title of the exam.
+        opens_at (DateTimeLocalField): When the exam opens (UTC).
+        closes_at (DateTimeLocalField): When the exam closes (UTC); must
+                                        be after ``opens_at``.
+        time_limit (IntegerField): The time limit per attempt, in minutes.
+        num_questions (IntegerField): The number of questions per paper.
+        paper_count (IntegerField): The number of papers to generate.
+        submit (SubmitField): The submission button.
+    """
+    title = StringField('Title',
+                        validators=[DataRequired(),
+                                    Length(max=100)])
+    opens_at = DateTimeLocalField('Opens At (UTC)',
+                                  format='%Y-%m-%dT%H:%M',
+                                  validators=[DataRequired()])
+    closes_at = DateTimeLocalField('Closes At (UTC)',
+                                   format='%Y-%m-%dT%H:%M',
+                                   validators=[DataRequired()])
+    time_limit = IntegerField('Time Limit (minutes)', default=20,
+                              validators=[DataRequired(),
+                                          NumberRange(min=1, max=600)])
+    num_questions = IntegerField('Questions per Paper', default=20,
+                                 validators=[DataRequired(),
+                                             NumberRange(min=1, max=200)])
+    paper_count = IntegerField('Number of Papers', default=50,
+                               validators=[DataRequired(),
+                                           NumberRange(min=1, max=1000)])
+    submit = SubmitField('Schedule Exam')
+
+    def validate_closes_at(self, field):
+        """Ensure the exam closes after it opens."""
+        if self.opens_at.data and field.data <= self.opens_at.data:
+            raise ValidationError('The exam must close after it opens.')
@@ -0,0 +1,363 @@
+"""Per-request performance metrics for the quiz application.
+
+Records, for every request, the latency and response size per endpoint,
+the number and total time of the SQL statements it issued (through
+SQLAlchemy cursor events) and the render time of each template, along
+with the hit and miss counts of the per-process caches. The numbers are
+kept in per-process histograms and counters and exposed in the
+Prometheus text format; requests slower than ``METRICS_SLOW_REQUEST``
+are logged with a breakdown of their queries.
+"""
+
+from bisect import bisect_left
+from flask import (before_render_template, g, has_request_context, request,
+                   template_rendered)
+from sqlalchemy import event
+from threading import Lock
+from time import perf_counter
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+# Number of distinct statements listed in a slow-request log entry
+SLOW_LOG_STATEMENTS = 10
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, as Prometheus exposes it.
+
+    Attributes:
+        buckets (tuple): The bucket upper bounds, in increasing order.
+        counts (list): Observations per bucket, plus one for +Inf.
+        total (float): The sum of all observed values.
+    """
+    __slots__ = ('buckets', 'counts', 'total')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        """Adds one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def samples(self):
+        """Yields (le label, cumulative count) pairs, ending with +Inf."""
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            yield ('+Inf' if bound == '+Inf' else repr(float(bound)),
+                   cumulative)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"') \
+        .replace('\n', r'\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"'
+             for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class MetricsRegistry:
+    """Per-process store of request, SQL and template metrics.
+
+    Each metric is keyed by its label values; all updates happen under
+    one lock, taken once per request.
+    """
+
+    # name -> (type, help text, label names, histogram buckets)
+    METRICS = {
+        'quiz_http_requests_total': (
+            'counter', 'Requests handled.',
+            ('endpoint', 'method', 'status'), None),
+        'quiz_http_request_duration_seconds': (
+            'histogram', 'Time spent handling a request.',
+            ('endpoint',), LATENCY_BUCKETS),
+        'quiz_http_response_size_bytes': (
+            'histogram', 'Size of response bodies of known length.',
+            ('endpoint',), SIZE_BUCKETS),
+        'quiz_sql_statements_per_request': (
+            'histogram', 'SQL statements issued per request.',
+            ('endpoint',), QUERY_COUNT_BUCKETS),
+        'quiz_sql_duration_seconds': (
+            'histogram', 'Time spent in SQL statements per request.',
+            ('endpoint',), LATENCY_BUCKETS),
+        'quiz_template_render_seconds': (
+            'histogram', 'Time spent rendering a template.',
+            ('template',), LATENCY_BUCKETS),
+        'quiz_cache_hits_total': (
+            'counter', 'Lookups served from a per-process cache.',
+            ('cache',), None),
+        'quiz_cache_misses_total': (
+            'counter', 'Lookups a per-process cache could not serve.',
+            ('cache',), None),
+        'quiz_cache_entries': (
+            'gauge', 'Entries held by a per-process cache.',
+            ('cache',), None),
+    }
+
+    def __init__(self):
+        self._lock = Lock()
+        self._values = {name: {} for name in self.METRICS}
+        self._caches = {}
+
+    def clear(self):
+        """Drops all recorded values."""
+        with self._lock:
+            self._values = {name: {} for name in self.METRICS}
+
+    def _observe(self, name, labels, value):
+        series = self._values[name]
+        histogram = series.get(labels)
+        if histogram is None:
+            histogram = series[labels] = Histogram(self.METRICS[name][3])
+        histogram.observe(value)
+
+    def record_request(self, endpoint, method, status, duration, size,
+                       statements, sql_time):
+        """
+        Records one finished request.
+
+        Args:
+            endpoint (str): The endpoint name.
+            method (str): The HTTP method.
+            status (int): The response status code.
+            duration (float): Seconds spent handling the request.
+            size (int): The response body size, or None if unknown.
+            statements (int): The number of SQL statements issued.
+            sql_time (float): Seconds spent in those statements.
+        """
+        with self._lock:
+            counters = self._values['quiz_http_requests_total']
+            key = (endpoint, method, str(status))
+            counters[key] = counters.get(key, 0) + 1
+            self._observe('quiz_http_request_duration_seconds', (endpoint,),
+                          duration)
+            if size is not None:
+                self._observe('quiz_http_response_size_bytes', (endpoint,),
+                              size)
+            self._observe('quiz_sql_statements_per_request', (endpoint,),
+                          statements)
+            self._observe('quiz_sql_duration_seconds', (endpoint,),
+                          sql_time)
+
+    def add_cache(self, name, stats):
+        """
+        Exposes the counters of a per-process cache.
+
+        The counters are read from the cache whenever the metrics are
+        rendered.
+
+        Args:
+            name (str): The value of the ``cache`` label, e.g. 'user'.
+            stats (callable): Returns the cache's 'hits', 'misses' and
+                              'size', like ``UserCache.stats``.
+        """
+        with self._lock:
+            self._caches[name] = stats
+
+    def _read_caches(self):
+        with self._lock:
+            caches = list(self._caches.items())
+        # Every cache takes its own lock to read its counters
+        samples = [(name, stats()) for name, stats in caches]
+        with self._lock:
+            for metric, field in (('quiz_cache_hits_total', 'hits'),
+                                  ('quiz_cache_misses_total', 'misses'),
+                                  ('quiz_cache_entries', 'size')):
+                self._values[metric] = {(name,): values[field]
+                                        for name, values in samples}
+
+    def record_template(self, template, duration):
+        """Records the render time of one template."""
+        with self._lock:
+            self._observe('quiz_template_render_seconds', (template,),
+                          duration)
+
+    def render(self):
+        """
+        Returns all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics, one family after another.
+        """
+        self._read_caches()
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, label_names, _) in \
+                    self.METRICS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in sorted(self._values[name].items()):
+                    if kind in ('counter', 'gauge'):
+                        lines.append(
+                            f'{name}{_labels(label_names, labels)} {value}')
+                        continue
+                    for bound, count in value.samples():
+                        bucket = _labels(label_names, labels, f'le="{bound}"')
+                        lines.append(f'{name}_bucket{bucket} {count}')
+                    lines.append(f'{name}_sum{_labels(label_names, labels)} '
+                                 f'{value.total!r}')
+                    lines.append(f'{name}_count{_labels(label_names, labels)} '
+                                 f'{sum(value.counts)}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+class RequestMetrics:
+    """Measurements of the request being handled, kept on ``flask.g``.
+
+    Attributes:
+        started (float): perf_counter() at the start of the request.
+        statements (dict): SQL text -> [count, seconds].
+        statement_count (int): The number of SQL statements issued.
+        sql_time (float): Seconds spent in SQL statements.
+        templates (list): (template name, seconds) per rendered template.
+        status (int): The response status code; 500 until a response was
+            made, e.g. when the request failed with an unhandled error.
+        size (int): The response body size, or None if unknown.
+    """
+    __slots__ = ('started', 'statements', 'statement_count', 'sql_time',
+                 'templates', 'status', 'size')
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.statements = {}
+        self.statement_count = 0
+        self.sql_time = 0.0
+        self.templates = []
+        self.status = 500
+        self.size = None
+
+    def add_statement(self, statement, duration):
+        entry = self.statements.get(statement)
+        if entry is None:
+            entry = self.statements[statement] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += duration
+        self.statement_count += 1
+        self.sql_time += duration
+
+
+def _current():
+    """Returns the RequestMetrics of the current request, if any."""
+    if has_request_context():
+        return g.get('request_metrics')
+    return None
+
+
+def _log_slow_request(app, endpoint, duration, current):
+    breakdown = sorted(current.statements.items(),
+                       key=lambda item: item[1][1], reverse=True)
+    lines = [f'{count:5d}x {seconds * 1000:9.1f} ms  '
+             f'{" ".join(statement.split())[:200]}'
+             for statement, (count, seconds)
+             in breakdown[:SLOW_LOG_STATEMENTS]]
+    app.logger.warning(
+        'Slow request: %s %s (%s) -> %s in %.1f ms; %d SQL statements in '
+        '%.1f ms%s', request.method, request.path, endpoint,
+        current.status, duration * 1000, current.statement_count,
+        current.sql_time * 1000, ''.join('\n' + line for line in lines))
+
+
+def init_metrics(app, db):
+    """
+    Installs the request, SQL and template instrumentation.
+
+    Does nothing unless ``METRICS_ENABLED`` is set. Must run after
+    ``db.init_app``.
+
+    Args:
+        app (Flask): The application to instrument.
+        db (SQLAlchemy): The Flask-SQLAlchemy extension.
+    """
+    if not app.config['METRICS_ENABLED']:
+        return
+    slow_threshold = app.config['METRICS_SLOW_REQUEST']
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_metrics = RequestMetrics()
+
+    @app.after_request
+    def note_response(response):
+        current = _current()
+        if current is not None:
+            current.status = response.status_code
+            current.size = (None if response.is_streamed
+                            else response.content_length)
+        return response
+
+    # Recorded on teardown, which also runs when an unhandled error skips
+    # the after_request functions, so failed requests count as 500s
+    @app.teardown_request
+    def record_request_metrics(exception=None):
+        current = g.pop('request_metrics', None)
+        if current is None:
+            return
+        duration = perf_counter() - current.started
+        endpoint = request.endpoint or '<unmatched>'
+        metrics.record_request(endpoint, request.method, current.status,
+                               duration, current.size,
+                               current.statement_count, current.sql_time)
+        for template, seconds in current.templates:
+            metrics.record_template(template, seconds)
+        if slow_threshold and duration >= slow_threshold:
+            _log_slow_request(app, endpoint, duration, current)
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement_timer(conn, cursor, statement, parameters, context,
+                              executemany):
+        conn.info.setdefault('statement_started', []).append(perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def record_statement(conn, cursor, statement, parameters, context,
+                         executemany):
+        duration = perf_counter() - conn.info['statement_started'].pop()
+        current = _current()
+        if current is not None:
+            current.add_statement(statement, duration)
+
+    @event.listens_for(engine, 'handle_error')
+    def drop_statement_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None:
+            timers = connection.info.get('statement_started')
+            if timers:
+                timers.pop()
+
+    def start_template_timer(sender, template, context, **extra):
+        current = _current()
+        if current is not None:
+            g.setdefault('template_started', []).append(perf_counter())
+
+    def record_template_time(sender, template, context, **extra):
+        current = _current()
+        timers = g.get('template_started') if current is not None else None
+        if timers:
+            current.templates.append((template.name or '<string>',
+                                      perf_counter() - timers.pop()))
+
+    before_render_template.connect(start_template_timer, app, weak=False)
+    template_rendered.connect(record_template_time, app, weak=False)
+
+    # Expose the hit rates of the per-process caches
+    from app.services.result_cache import result_fragments
+    from app.services.user_cache import user_cache
+    metrics.add_cache('user', user_cache.stats)
+    metrics.add_cache('result_fragment', result_fragments.stats)
@@ -96,7 +96,10 @@ class QuizResult(db.Model):
         timestamp (datetime): The timestamp when the quiz was taken.
         total_questions (int): The total number of questions in the quiz.
         user_answers (list): A list of the user's answers as a JSON array.
+            Kept for compatibility; new code reads ``answers`` instead.
         question_ids (list): A list of the question IDs as a JSON array.
+            Kept for compatibility; new code reads ``answers`` instead.
+        answers (list): The per-question answers for this result.
     """
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -105,3 +108,198 @@ class QuizResult(db.Model):
     total_questions = db.Column(db.Integer)
     user_answers = db.Column(db.JSON, nullable=False, default=json.dumps([]))
     question_ids = db.Column(db.JSON, nullable=False, default=json.dumps([]))
+    answers = db.relationship('QuizAnswer', backref='result', lazy=True,
+                              cascade='all, delete-orphan')
+
+    __table_args__ = (
+        db.Index('ix_quiz_result_user_id_timestamp', 'user_id', 'timestamp'),
+        db.Index('ix_quiz_result_timestamp', 'timestamp'),
+    )
+
+
+class QuizAnswer(db.Model):
+    """QuizAnswer model for storing one answered question of a quiz result.
+
+    Attributes:
+        id (int): The primary key for the answer.
+        result_id (int): The foreign key referencing the quiz result.
+        question_id (int): The ID of the answered question. Not a foreign
+            key so that deleting a question keeps the history intact.
+        chosen (str): The selected answer identifier (A, B, C or D), or
+            None if the question was left unanswered.
+        is_correct (bool): Whether the chosen answer was correct.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    result_id = db.Column(db.Integer, db.ForeignKey('quiz_result.id'),
+                          nullable=False)
+    question_id = db.Column(db.Integer, nullable=False, index=True)
+    chosen = db.Column(db.String(1), nullable=True)
+    is_correct = db.Column(db.Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        db.Index('ix_quiz_answer_result_id_question_id',
+                 'result_id', 'question_id'),
+    )
+
+
+class QuestionStats(db.Model):
+    """QuestionStats model for storing running answer statistics per question.
+
+    Rows are updated in the same transaction as each quiz submission, so
+    reading the stats never requires scanning the quiz results.
+
+    Attributes:
+        question_id (int): The ID of the question (also the primary key).
+        times_served (int): The number of submitted quizzes containing it.
+        times_correct (int): The number of correct answers to it.
+        count_a (int): The number of times answer A was chosen.
+        count_b (int): The number of times answer B was chosen.
+        count_c (int): The number of times answer C was chosen.
+        count_d (int): The number of times answer D was chosen.
+        correct_rate (float): times_correct / times_served, stored and
+            indexed so questions can be sorted by difficulty.
+    """
+    question_id = db.Column(db.Integer, primary_key=True,
+                            autoincrement=False)
+    times_served = db.Column(db.Integer, nullable=False, default=0)
+    times_correct = db.Column(db.Integer, nullable=False, default=0)
+    count_a = db.Column(db.Integer, nullable=False, default=0)
+    count_b = db.Column(db.Integer, nullable=False, default=0)
+    count_c = db.Column(db.Integer, nullable=False, default=0)
+    count_d = db.Column(db.Integer, nullable=False, default=0)
+    correct_rate = db.Column(db.Float, nullable=False, default=0.0,
+                             index=True)
+
+
+class LeaderboardEntry(db.Model):
+    """LeaderboardEntry model for storing a user's rollup for one period.
+
+    Each submission updates three rows per user: the all-time period and
+    the current week and month.
+
+    Attributes:
+        period (str): The period key, e.g. 'all', 'week:2026-W42' or
+            'month:2026-10'.
+        user_id (int): The foreign key referencing the user.
+        attempts (int): The number of quizzes submitted in the period.
+        total_score (int): The sum of scores in the period.
+        total_questions (int): The sum of questions answered in the period.
+        best_pct (float): The best score ratio (score / questions).
+        avg_pct (float): total_score / total_questions.
+    """
+    period = db.Column(db.String(20), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'),
+                        primary_key=True, autoincrement=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    total_score = db.Column(db.Integer, nullable=False, default=0)
+    total_questions = db.Column(db.Integer, nullable=False, default=0)
+    best_pct = db.Column(db.Float, nullable=False, default=0.0)
+    avg_pct = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.Index('ix_leaderboard_entry_period_rank',
+                 'period', 'best_pct', 'avg_pct'),
+    )
+
+
+class QuizAttempt(db.Model):
+    """QuizAttempt model for storing an in-progress quiz on the server.
+
+    Only the attempt ID is kept in the user's session cookie.
+
+    Attributes:
+        id (str): The random attempt ID, also stored in the session.
+        user_id (int): The foreign key referencing the user.
+        question_ids (bytes): The question order, packed as 64-bit ints.
+        started_at (float): The start time as a Unix timestamp.
+        deadline (float): The submission deadline as a Unix timestamp.
+    """
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    question_ids = db.Column(db.LargeBinary, nullable=False)
+    started_at = db.Column(db.Float, nullable=False)
+    deadline = db.Column(db.Float, nullable=False, index=True)
+
+
+class IdSequence(db.Model):
+    """IdSequence model for handing out blocks of primary keys.
+
+    Used where IDs must be known before the rows are written, e.g. by the
+    submission buffer, which reserves a block of quiz result IDs at a
+    time. Every row inserted into the table must then take its ID from
+    the sequence.
+
+    Attributes:
+        name (str): The name of the sequence, e.g. 'quiz_result'.
+        next_id (int): The first ID not handed out yet.
+    """
+    name = db.Column(db.String(50), primary_key=True)
+    next_id = db.Column(db.Integer, nullable=False)
+
+
+class CacheVersion(db.Model):
+    """CacheVersion model for versions shared by per-process caches.
+
+    Every worker process caches data derived from some tables (e.g. the
+    question bank) under the version stored here, and bumping it retires
+    those caches in all processes, including after CLI commands.
+
+    Attributes:
+        name (str): What the version covers, e.g. 'question_bank'.
+        version (int): Bumped every time that data changes.
+        changed_at (float): When it last changed, as a Unix timestamp.
+    """
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    changed_at = db.Column(db.Float, nullable=False)
+
+
+class Exam(db.Model):
+    """Exam model for a scheduled exam served from pre-generated papers.
+
+    While an exam is open every quiz start is served one of its papers,
+    round-robin, instead of a fresh random draw.
+
+    Attributes:
+        id (int): The primary key for the exam.
+        title (str): The title of the exam.
+        opens_at (datetime): When the exam opens (UTC).
+        closes_at (datetime): When the exam closes (UTC).
+        time_limit (int): The time limit per attempt, in seconds.
+        num_questions (int): The number of questions per paper.
+        paper_count (int): The number of papers generated.
+        papers (list): The generated papers of the exam.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(100), nullable=False)
+    opens_at = db.Column(db.DateTime, nullable=False)
+    closes_at = db.Column(db.DateTime, nullable=False, index=True)
+    time_limit = db.Column(db.Integer, nullable=False)
+    num_questions = db.Column(db.Integer, nullable=False)
+    paper_count = db.Column(db.Integer, nullable=False)
+    papers = db.relationship('ExamPaper', backref='exam', lazy=True,
+                             cascade='all, delete-orphan')
+
+
+class ExamPaper(db.Model):
+    """ExamPaper model for one pre-generated paper of an exam.
+
+    Attributes:
+        id (int): The primary key for the paper.
+        exam_id (int): The foreign key referencing the exam.
+        number (int): The number of the paper within its exam, from 0.
+        question_ids (bytes): The question order, packed as 64-bit ints.
+        body (str): The questions of the paper, rendered as HTML.
+        built_at (datetime): When the paper was last (re)built (UTC).
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    exam_id = db.Column(db.Integer, db.ForeignKey('exam.id'), nullable=False)
+    number = db.Column(db.Integer, nullable=False)
+    question_ids = db.Column(db.LargeBinary, nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    built_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('exam_id', 'number',
+                            name='uq_exam_paper_exam_id_number'),
+    )
@@ -0,0 +1,184 @@
+"""Opt-in request profiler for the quiz application.
+
+When ``PROFILING_ENABLED`` is set, a random ``PROFILE_SAMPLE_RATE``
+fraction of requests, plus requests from admins that carry the
+``PROFILE_HEADER`` header, run under cProfile. Each profile is written
+as a pstats file into a per-endpoint directory below ``PROFILE_DIR``;
+only the newest ``PROFILE_KEEP`` files are kept. ``hottest_functions``
+aggregates them for the admin profiles page.
+
+Only one request is profiled at a time per process: a sampled request
+that arrives while another one is being profiled runs unprofiled, as
+profilers cannot overlap (Python 3.12 refuses to enable a second one).
+"""
+
+from flask import g, request
+from flask_login import current_user
+import cProfile
+import os
+import pstats
+import random
+import secrets
+import sys
+import threading
+import time
+
+# Suffix of the profile files written by the profiler
+PROFILE_SUFFIX = '.pstats'
+
+# Held while a request of this process is being profiled
+_profile_lock = threading.Lock()
+
+
+def _endpoint_directory(endpoint):
+    """Returns a file-system safe directory name for an endpoint."""
+    return ''.join(char if char.isalnum() or char in '._-' else '_'
+                   for char in endpoint or 'unmatched').strip('_')
+
+
+def _profile_files(directory):
+    """Yields (mtime, path) for every stored profile below ``directory``."""
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(PROFILE_SUFFIX):
+                path = os.path.join(root, name)
+                try:
+                    yield os.path.getmtime(path), path
+                except OSError:
+                    pass  # Removed by a concurrent rotation
+
+
+def rotate_profiles(directory, keep):
+    """
+    Deletes the oldest profiles so that at most ``keep`` remain.
+
+    Args:
+        directory (str): The profile directory.
+        keep (int): The number of profiles to keep.
+
+    Returns:
+        int: The number of profiles deleted.
+    """
+    files = sorted(_profile_files(directory))
+    deleted = 0
+    for _, path in files[:max(0, len(files) - keep)]:
+        try:
+            os.remove(path)
+            deleted += 1
+        except OSError:
+            pass
+    return deleted
+
+
+def _short_name(filename, roots):
+    for root in roots:
+        if filename.startswith(root):
+            return os.path.relpath(filename, root)
+    return filename
+
+
+def hottest_functions(directory, limit=15):
+    """
+    Aggregates the stored profiles per endpoint.
+
+    Args:
+        directory (str): The profile directory.
+        limit (int): The number of functions to return per endpoint.
+
+    Returns:
+        list: One (endpoint, profile count, functions) tuple per endpoint,
+              sorted by endpoint. ``functions`` lists
+              (function, calls, own seconds, cumulative seconds) tuples,
+              hottest (by own time) first.
+    """
+    if not os.path.isdir(directory):
+        return []
+
+    roots = sorted({os.path.dirname(os.path.dirname(__file__)),
+                    sys.prefix, sys.base_prefix}, key=len, reverse=True)
+    endpoints = []
+    for endpoint in sorted(os.listdir(directory)):
+        paths = [path for _, path in
+                 _profile_files(os.path.join(directory, endpoint))]
+        stats = None
+        for path in paths:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(path)
+                else:
+                    stats.add(path)
+            except (OSError, EOFError, TypeError, ValueError):
+                pass  # Partially written or rotated away
+        if stats is None:
+            continue
+
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2],
+                      reverse=True)[:limit]
+        functions = [(f'{_short_name(filename, roots)}:{line}({name})'
+                      if line else name, calls, own_time, cumulative_time)
+                     for (filename, line, name),
+                     (_, calls, own_time, cumulative_time, _) in rows]
+        endpoints.append((endpoint, len(paths), functions))
+    return endpoints
+
+
+def get_profile_directory(app):
+    """Returns the configured profile directory of an application."""
+    return app.config['PROFILE_DIR'] or os.path.join(app.instance_path,
+                                                     'profiles')
+
+
+def init_profiling(app):
+    """
+    Installs the request profiler if ``PROFILING_ENABLED`` is set.
+
+    Args:
+        app (Flask): The application to profile.
+    """
+    if not app.config['PROFILING_ENABLED']:
+        return
+    directory = get_profile_directory(app)
+    sample_rate = app.config['PROFILE_SAMPLE_RATE']
+    header = app.config['PROFILE_HEADER']
+    keep = app.config['PROFILE_KEEP']
+
+    def wants_profile():
+        if sample_rate and random.random() < sample_rate:
+            return True
+        # The header is only honoured for admins
+        return bool(header and request.headers.get(header)
+                    and current_user.is_authenticated
+                    and current_user.is_admin)
+
+    @app.before_request
+    def start_profiler():
+        if not wants_profile() or not _profile_lock.acquire(blocking=False):
+            return  # Not sampled, or another request is being profiled
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool (e.g. a debugger) is active
+            _profile_lock.release()
+            return
+        g.profiler = profiler
+
+    @app.teardown_request
+    def save_profile(exception=None):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        try:
+            profiler.disable()
+        finally:
+            _profile_lock.release()
+
+        target = os.path.join(directory, _endpoint_directory(request.endpoint))
+        name = (time.strftime('%Y%m%d-%H%M%S')
+                + f'-{secrets.token_hex(4)}{PROFILE_SUFFIX}')
+        try:
+            os.makedirs(target, exist_ok=True)
+            profiler.dump_stats(os.path.join(target, name))
+            rotate_profiles(directory, keep)
+        except OSError:
+            app.logger.exception('Could not write request profile.')
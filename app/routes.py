@@ -1,14 +1,47 @@
 from flask import render_template, redirect, url_for, flash, session, request
+from flask import Response, send_file, send_from_directory, stream_with_context
+from flask import make_response
+from markupsafe import Markup
 from flask_login import login_user, logout_user, login_required, current_user
 from flask import Blueprint
 from flask import current_app
 from app import db, login_manager, csrf
-from app.forms import RegistrationForm, LoginForm, QuestionForm
-from app.models import User, QuizQuestion, QuizResult
-from app.services.quiz_service import get_random_questions
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.metrics import metrics
+from app.profiling import get_profile_directory, hottest_functions
+from app.forms import (RegistrationForm, LoginForm, QuestionForm,
+                       QuestionImportForm, ExamForm)
+from app.models import User, QuizQuestion, Exam
+from app.services.attempt_service import get_attempt_store
+from app.services.exam_service import (delete_exam, draw_questions,
+                                       refresh_exam_papers, schedule_exam)
+from app.services.export_service import (available_formats,
+                                         export_answers)
+from app.services.leaderboard_service import (PERIOD_TYPES, leaderboard,
+                                              period_keys)
+from app.services.password_service import (HashingPoolSaturated,
+                                           password_hasher)
+from app.services.question_io_service import (export_questions,
+                                              import_questions)
+from app.services.quiz_service import invalidate_question_cache
+from app.services.regrade_service import regrader
+from app.services.result_cache import (result_etag, result_fragments,
+                                       result_last_modified)
+from app.services.result_service import (get_latest_result_stamp,
+                                         get_result_answers,
+                                         get_results_page, get_user_result)
+from app.services.search_service import search_questions
+from app.services.snapshot_service import get_snapshots
+from app.services.stats_service import get_question_stats_page
+from app.services.submission_service import (submit_attempt,
+                                             wait_for_submissions)
+from app.services.user_cache import user_cache
+from datetime import datetime, timezone
 from time import time
-import json
+from uuid import uuid4
+import io
+import os
+import shutil
+import tempfile
 
 # Create a blueprint for the routes
 main = Blueprint('main', __name__)
@@ -16,15 +49,48 @@ main = Blueprint('main', __name__)
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Load a user from the database by user ID.
+    """Load a user by user ID, served from the per-process user cache.
 
     Args:
         user_id (int): The ID of the user to load.
 
     Returns:
-        User: The user object if found, otherwise None.
+        CachedUser: A snapshot of the user if found, otherwise None.
     """
-    return User.query.get(int(user_id))
+    return user_cache.get(int(user_id))
+
+
+@main.errorhandler(HashingPoolSaturated)
+def hashing_pool_saturated(error):
+    """Reject auth requests quickly while the hashing pool is full or
+    too slow to finish a job in time.
+
+    Returns:
+        tuple: A 503 response asking the client to retry shortly.
+    """
+    return ('The server is busy, please try again in a moment.', 503,
+            {'Retry-After': '1'})
+
+
+def _has_pending_flashes():
+    """Whether the page about to be rendered would show flash messages."""
+    return bool(session.get('_flashes'))
+
+
+def _set_validators(response, etag, last_modified):
+    """Make a results page revalidated by ETag and Last-Modified."""
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.make_conditional(request)
+
+
+def _not_modified(etag):
+    """Return an empty 304 response for a still-current results page."""
+    response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
 # Home route
 
@@ -80,7 +146,7 @@ def register():
 
         # Proceed to create the new user
         role = form.role.data if form.role else 'user'
-        hashed_password = generate_password_hash(form.password.data)
+        hashed_password = password_hasher.hash_password(form.password.data)
         user = User(username=form.username.data,
                     password=hashed_password, role=role)
         db.session.add(user)
@@ -106,7 +172,16 @@ def login():
     if form.validate_on_submit():
         # Retrieve user by username
         user = User.query.filter_by(username=form.username.data).first()
-        if user and check_password_hash(user.password, form.password.data):
+        if user and password_hasher.verify_password(user.password,
+                                                    form.password.data):
+            # Upgrade hashes made with outdated parameters
+            if password_hasher.needs_rehash(user.password):
+                try:
+                    user.password = password_hasher.hash_password(
+                        form.password.data)
+                    db.session.commit()
+                except HashingPoolSaturated:
+                    pass  # Retry on a later login
             # Log in the user if credentials are correct
             login_user(user)
             flash('Login successful!', 'success')
@@ -139,10 +214,15 @@ def logout():
 def dashboard():
     """Render the user dashboard.
 
+    Shows the user's leaderboard rank for each period.
+
     Returns:
         str: Rendered HTML for the user dashboard.
     """
-    return render_template('dashboard.html', user=current_user)
+    periods = period_keys()
+    ranks = {period_type: leaderboard.rank(period, current_user.id)
+             for period_type, period in periods.items()}
+    return render_template('dashboard.html', user=current_user, ranks=ranks)
 
 # Quiz route
 
@@ -158,75 +238,51 @@ def quiz():
     Returns:
         str: Rendered HTML for the quiz page.
     """
-    session['quiz_time_limit'] = current_app.config.get(
-        'QUIZ_TIME_LIMIT', 1200)
-
-    def get_correct_answer(question_id):
-        """Get the correct answer for a given question ID.
-
-        Args:
-            question_id (int): The ID of the question.
-
-        Returns:
-            str: The correct answer for the question.
-        """
-        question = QuizQuestion.query.get(question_id)
-        return question.correct_answer if question else None
+    time_limit = current_app.config.get('QUIZ_TIME_LIMIT', 1200)
+    attempts = get_attempt_store()
 
     if request.method == 'POST':
         is_timeout = request.form.get('timeout') == "1"
-        start_time = session.get('quiz_start_time')
+        attempt = attempts.get(session.get('quiz_attempt'), current_user.id)
+        if attempt is None:
+            flash('Your quiz session has expired. Please start a new quiz.',
+                  'warning')
+            return redirect(url_for('main.quiz'))
 
         # Check if the quiz time has exceeded the limit
-        time_exceeded = time() - start_time > session['quiz_time_limit']
-        if not is_timeout and start_time and time_exceeded:
+        time_exceeded = time() > attempt.deadline
+        if not is_timeout and time_exceeded:
             flash('Your time is up! Submitting the quiz.', 'warning')
             return redirect(url_for('main.results'))
 
-        user_answers = {}
-        question_ids = session.get('quiz_questions', [])
-
-        # Collect user answers
-        for question_id in question_ids:
-            selected_answer = request.form.get(f'answer_{question_id}')
-            # Store 'None' if no answer selected
-            user_answers[question_id] = selected_answer or 'None'
-
-        # Calculate the score based on correct answers
-        correct_answers_count = [
-            user_answers[question_id] == get_correct_answer(question_id)
-            for question_id in question_ids
-        ]
-        score = sum(correct_answers_count)
-
-        # Ensure all questions were answered
-        if len(user_answers) != len(question_ids):
-            flash('Please answer all questions before submitting the quiz.',
-                  'warning')
-            return redirect(url_for('main.quiz'))
+        # Collect user answers; unanswered questions are stored as 'None'
+        answers = {question_id: request.form.get(f'answer_{question_id}')
+                   for question_id in attempt.question_ids}
 
-        # Save the quiz result to the database
-        quiz_result = QuizResult(
-            user_id=current_user.id,
-            score=score,
-            total_questions=len(question_ids),
-            user_answers=json.dumps(user_answers),
-            question_ids=json.dumps(question_ids)
-        )
-        db.session.add(quiz_result)
-        db.session.commit()
+        # Grade and save the quiz result
+        result = submit_attempt(attempt, current_user, answers)
 
         # Clear the session data related to the quiz
-        session.pop('quiz_questions', None)
-        return redirect(url_for('main.results'))
-
-    # Generate a new set of quiz questions
-    questions = get_random_questions()
-    # Store question IDs in session
-    session['quiz_questions'] = [question.id for question in questions]
-    session['quiz_start_time'] = time()  # Record the start time for the quiz
-
-    return render_template('quiz.html', questions=questions)
+        session.pop('quiz_attempt', None)
+        return redirect(url_for('main.results', result_id=result.id))
+
+    # During an exam, deal one of its pre-generated papers; otherwise
+    # draw a new set of quiz questions from the snapshot cache
+    question_ids, body, time_limit = draw_questions(time_limit)
+    if body is None:
+        questions = get_snapshots(question_ids)
+        question_ids = [question.id for question in questions]
+        body = Markup(render_template('quiz_questions.html',
+                                      questions=questions))
+
+    # Replace any unfinished attempt with a new server-side attempt and
+    # keep only its ID in the session
+    attempts.delete(session.get('quiz_attempt'))
+    attempt = attempts.create(current_user.id, question_ids, time_limit)
+    db.session.commit()
+    session['quiz_attempt'] = attempt.id
+
+    return render_template('quiz.html', body=body, time_limit=time_limit)
 
 # Results route
 
@@ -237,38 +293,57 @@ def results():
     """Display the quiz results for the current user.
 
     Fetches and displays the most recent quiz result or a result by its ID.
+    Results never change for a given question bank, so the page supports
+    conditional GET and its details are served from the fragment cache.
 
     Returns:
         str: Rendered HTML for the results page.
     """
     result_id = request.args.get("result_id")
     if result_id:
-        result = QuizResult.query.filter_by(
-            id=result_id, user_id=current_user.id).first()
+        result_id = int(result_id) if result_id.isdigit() else None
+        wait_for_submissions(current_user.id, result_id)
     else:
+        wait_for_submissions(current_user.id)
         # Get the most recent result for the current user
-        result = QuizResult.query.filter_by(user_id=current_user.id).order_by(
-            QuizResult.timestamp.desc()).first()
+        latest = get_latest_result_stamp(current_user.id)
+        result_id = latest[0] if latest else None
 
-    if not result:
-        flash("No quiz results found.", "warning")
-        return redirect(url_for('main.dashboard'))
+    etag = result_etag(current_user.id, result_id)
+    cacheable = result_id is not None and not _has_pending_flashes()
+    if cacheable and etag in request.if_none_match:
+        return _not_modified(etag)
+
+    cached = result_fragments.get(result_id) if result_id else None
+    if cached and cached[1][0] == current_user.id:
+        detail, (_, timestamp) = cached
+    else:
+        result = get_user_result(current_user.id, result_id) \
+            if result_id else None
+        if not result:
+            flash("No quiz results found.", "warning")
+            return redirect(url_for('main.dashboard'))
+
+        # Read the per-question answers of this result
+        question_ids, user_answers = get_result_answers(result)
 
-    # Parse user answers from JSON
-    user_answers = json.loads(result.user_answers)
-    # Parse question IDs from JSON
-    question_ids = json.loads(result.question_ids)
+        # Fetch the questions attempted in this specific quiz
+        questions = get_snapshots(question_ids)
 
-    # Fetch the questions attempted in this specific quiz
-    questions = QuizQuestion.query.filter(
-        QuizQuestion.id.in_(question_ids)).all()
+        detail = render_template('result_detail.html',
+                                 result=result,
+                                 questions_count=result.total_questions,
+                                 user_answers=user_answers,
+                                 questions=questions)
+        timestamp = result.timestamp
+        result_fragments.put(result_id, detail, (current_user.id, timestamp))
 
-    return render_template('results.html',
-                           user=current_user,
-                           result=result,
-                           questions_count=result.total_questions,
-                           user_answers=user_answers,
-                           questions=questions)
+    response = make_response(render_template('results.html',
+                                             user=current_user,
+                                             detail=Markup(detail)))
+    if cacheable:
+        _set_validators(response, etag, result_last_modified(timestamp))
+    return response
 
 # Results history route
 
@@ -278,12 +353,33 @@ def results():
 def results_history():
     """Display the quiz results history for the current user.
 
+    Results are paginated by cursor; the ``cursor`` query argument
+    selects the page that follows a previously shown one. Pages are
+    validated by the user's newest result, so revisits are answered with
+    304 until a quiz is submitted.
+
     Returns:
         str: Rendered HTML for the results history page.
     """
-    results = QuizResult.query.filter_by(user_id=current_user.id).order_by(
-        QuizResult.timestamp.desc()).all()
-    return render_template('results_history.html', results=results)
+    cursor = request.args.get('cursor')
+    wait_for_submissions(current_user.id)
+    latest = get_latest_result_stamp(current_user.id)
+    etag = result_etag(current_user.id, 'history',
+                       latest[0] if latest else 0, cursor or '')
+    cacheable = latest is not None and not _has_pending_flashes()
+    if cacheable and etag in request.if_none_match:
+        return _not_modified(etag)
+
+    results, next_cursor = get_results_page(
+        current_user.id, cursor,
+        current_app.config.get('RESULTS_PER_PAGE', 20))
+    response = make_response(render_template(
+        'results_history.html', results=results, cursor=cursor,
+        next_cursor=next_cursor))
+    if cacheable:
+        _set_validators(response, etag, result_last_modified(latest[1]))
+    return response
+
 
 # Add question route
 
@@ -316,6 +412,9 @@ def add_question():
         )
         db.session.add(question)  # Add the question to the session
         db.session.commit()  # Commit the changes to the database
+        # Reload the question ID cache; commits the whole session
+        invalidate_question_cache()
+        refresh_exam_papers([question.id], added=True)
         flash('Question added successfully!', 'success')
         return redirect(url_for('main.add_question'))
 
@@ -327,19 +426,26 @@ def add_question():
 @main.route('/questions')
 @login_required
 def view_questions():
-    """Allow admins to view all quiz questions.
+    """Allow admins to browse and search the quiz questions.
+
+    The ``q`` query argument filters questions by full-text search and
+    ``after`` selects the page following the given question ID.
 
     Returns:
-        str: Rendered HTML to view all quiz questions.
+        str: Rendered HTML to view the quiz questions.
     """
     # Ensure the user is an admin
     if not current_user.is_admin:
         flash('You do not have permission to access this page.', 'danger')
         return redirect(url_for('main.dashboard'))
 
-    # Retrieve all questions from the database
-    questions = QuizQuestion.query.all()
-    return render_template('view_questions.html', questions=questions)
+    # Retrieve one page of (matching) questions from the database
+    search = request.args.get('q', '').strip()
+    after = request.args.get('after', type=int)
+    questions, next_after = search_questions(
+        search, after, current_app.config.get('QUESTIONS_PER_PAGE', 50))
+    return render_template('view_questions.html', questions=questions,
+                           search=search, after=after, next_after=next_after)
 
 # Delete question route
 
@@ -364,6 +470,9 @@ def delete_question(question_id):
     if question:
         db.session.delete(question)  # Remove the question from the session
         db.session.commit()  # Commit the changes to the database
+        # Reload the question ID cache; commits the whole session
+        invalidate_question_cache()
+        refresh_exam_papers([question_id], deleted=True)
         flash('Question deleted successfully!', 'success')
     else:
         flash('Question not found.', 'danger')
@@ -391,6 +500,8 @@ def edit_question(question_id):
     question = QuizQuestion.query.get_or_404(question_id)
     form = QuestionForm(obj=question)
     if form.validate_on_submit():
+        key_changed = form.correct_answer.data != question.correct_answer
+
         # Update the question with form data
         question.question_text = form.question_text.data
         question.answer_a = form.answer_a.data
@@ -399,7 +510,348 @@ def edit_question(question_id):
         question.answer_d = form.answer_d.data
         question.correct_answer = form.correct_answer.data
         db.session.commit()
+        # Reload the question ID cache; commits the whole session
+        invalidate_question_cache()
+        refresh_exam_papers([question.id])
         flash('Question updated successfully!', 'success')
+
+        # Past results were scored against the old answer key
+        if key_changed:
+            regrader.submit(current_app._get_current_object(), [question.id])
+            flash('The answer key changed; past results are being regraded.',
+                  'info')
         return redirect(url_for('main.view_questions'))
 
     return render_template('edit_question.html', form=form, question=question)
+
+# Import questions route
+
+
+@main.route('/questions/import', methods=['GET', 'POST'])
+@login_required
+def upload_questions():
+    """Allow admins to bulk-import quiz questions from a CSV or JSONL file.
+
+    Rejected rows are written to an error report that can be downloaded
+    afterwards.
+
+    Returns:
+        str: Rendered HTML for the import page, including the import
+             summary after an upload.
+    """
+    # Ensure the user is an admin
+    if not current_user.is_admin:
+        flash('You do not have permission to access this page.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    form = QuestionImportForm()
+    report = None
+    if form.validate_on_submit():
+        upload = form.file.data
+        file_format = upload.filename.rsplit('.', 1)[-1].lower()
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig',
+                                  newline='')
+
+        # Write rejected rows to a per-upload error report
+        errors_dir = os.path.join(current_app.instance_path, 'import_errors')
+        os.makedirs(errors_dir, exist_ok=True)
+        error_file = f'{uuid4().hex}.csv'
+        error_path = os.path.join(errors_dir, error_file)
+        with open(error_path, 'w', newline='', encoding='utf-8') as errors:
+            imported, rejected = import_questions(
+                stream, file_format,
+                current_app.config.get('IMPORT_BATCH_SIZE', 1000), errors)
+        if not rejected:
+            os.remove(error_path)
+            error_file = None
+
+        report = {'imported': imported, 'rejected': rejected,
+                  'error_file': error_file}
+        flash(f'Imported {imported} questions, rejected {rejected} rows.',
+              'success' if not rejected else 'warning')
+
+    return render_template('import_questions.html', form=form, report=report)
+
+# Import error report route
+
+
+@main.route('/questions/import/errors/<error_file>')
+@login_required
+def download_import_errors(error_file):
+    """Allow admins to download the error report of an import.
+
+    Args:
+        error_file (str): The file name of the error report.
+
+    Returns:
+        Response: The CSV error report as an attachment.
+    """
+    # Ensure the user is an admin
+    if not current_user.is_admin:
+        flash('You do not have permission to access this page.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    errors_dir = os.path.join(current_app.instance_path, 'import_errors')
+    return send_from_directory(errors_dir, error_file, as_attachment=True)
+
+# Export questions route
+
+
+@main.route('/questions/export')
+@login_required
+def download_questions():
+    """Allow admins to export the question bank as CSV or JSONL.
+
+    The ``format`` query argument selects 'csv' (default) or 'jsonl'. The
+    file is streamed in batches and never held in memory as a whole.
+
+    Returns:
+        Response: The streamed export as an attachment.
+    """
+    # Ensure the user is an admin
+    if not current_user.is_admin:
+        flash('You do not have permission to access this page.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    file_format = request.args.get('format', 'csv')
+    if file_format not in ('csv', 'jsonl'):
+        flash('Unsupported export format.', 'danger')
+        return redirect(url_for('main.view_questions'))
+
+    mimetype = 'text/csv' if file_format == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(export_questions(file_format)),
+        mimetype=mimetype,
+        headers={'Content-Disposition':
+                 f'attachment; filename=questions.{file_format}'})
+
+# Export answers route
+
+
+@main.route('/results/export')
+@login_required
+def download_answers():
+    """Allow admins to export every answered question for offline analysis.
+
+    The ``format`` query argument selects 'parquet', 'npz' or 'csv' and
+    defaults to the first one whose optional dependency is installed;
+    ``since`` (an ISO date or time, UTC) limits the export to results
+    taken after it. Nightly jobs should use ``flask export-answers``
+    instead, which exports incrementally.
+
+    Returns:
+        Response: The export file as an attachment.
+    """
+    # Ensure the user is an admin
+    if not current_user.is_admin:
+        flash('You do not have permission to access this page.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    file_format = request.args.get('format') or available_formats()[0]
+    if file_format not in available_formats():
+        flash('Unsupported export format.', 'danger')
+        return redirect(url_for('main.dashboard'))
+    try:
+        since = (datetime.fromisoformat(request.args['since'])
+                 if request.args.get('since') else None)
+    except ValueError:
+        flash('Invalid export start date.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    directory = tempfile.mkdtemp()
+    try:
+        path, _, _ = export_answers(
+            directory, file_format, incremental=False, since=since, lag=0,
+            chunk_size=current_app.config['EXPORT_CHUNK_SIZE'])
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    if path is None:
+        shutil.rmtree(directory, ignore_errors=True)
+        flash('There are no answers to export.', 'info')
+        return redirect(url_for('main.dashboard'))
+
+    response = send_file(path, as_attachment=True,
+                         download_name=os.path.basename(path))
+    response.call_on_close(lambda: shutil.rmtree(directory,
+                                                 ignore_errors=True))
+    return response
+
+# Question statistics route
+
+
+@main.route('/questions/stats')
+@login_required
+def question_stats():
+    """Allow admins to view questions sorted by difficulty.
+
+    The ``order`` query argument is 'hardest' (default) or 'easiest' and
+    ``cursor`` selects the page following a previously shown one.
+
+    Returns:
+        str: Rendered HTML for the question statistics page.
+    """
+    # Ensure the user is an admin
+    if not current_user.is_admin:
+        flash('You do not have permission to access this page.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    order = request.args.get('order', 'hardest')
+    cursor = request.args.get('cursor')
+    rows, next_cursor = get_question_stats_page(
+        order != 'easiest', cursor,
+        current_app.config.get('QUESTIONS_PER_PAGE', 50))
+    return render_template('question_stats.html', rows=rows, order=order,
+                           cursor=cursor, next_cursor=next_cursor)
+
+# Leaderboard route
+
+
+@main.route('/leaderboard')
+@login_required
+def leaderboard_view():
+    """Display the top users for a leaderboard period.
+
+    The ``period`` query argument is 'all' (default), 'week' or 'month';
+    weekly and monthly boards cover the current week and month.
+
+    Returns:
+        str: Rendered HTML for the leaderboard page.
+    """
+    period_type = request.args.get('period', 'all')
+    if period_type not in PERIOD_TYPES:
+        period_type = 'all'
+    period = period_keys()[period_type]
+    return render_template('leaderboard.html',
+                           entries=leaderboard.top(period),
+                           period_type=period_type,
+                           rank=leaderboard.rank(period, current_user.id))
+
+# Metrics route
+
+
+@main.route('/metrics')
+@login_required
+def metrics_view():
+    """Allow admins to scrape the request metrics of this process.
+
+    Returns:
+        Response: The metrics in the Prometheus text format.
+    """
+    # Ensure the user is an admin
+    if not current_user.is_admin:
+        flash('You do not have permission to access this page.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    return Response(metrics.render(),
+                    mimetype='text/plain; version=0.0.4')
+
+# Profiles route
+
+
+@main.route('/profiles')
+@login_required
+def profiles():
+    """Allow admins to view the hottest functions of profiled requests.
+
+    Returns:
+        str: Rendered HTML listing the top functions per endpoint.
+    """
+    # Ensure the user is an admin
+    if not current_user.is_admin:
+        flash('You do not have permission to access this page.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    return render_template(
+        'profiles.html',
+        enabled=current_app.config['PROFILING_ENABLED'],
+        endpoints=hottest_functions(get_profile_directory(current_app)))
+
+# Regrade route
+
+
+@main.route('/regrade', methods=['GET', 'POST'])
+@login_required
+def regrade():
+    """Allow admins to regrade all results and follow regrade progress.
+
+    Regrades also start on their own when a question's answer key is
+    edited. Posting starts a full regrade, which rechecks every stored
+    answer.
+
+    Returns:
+        str: Rendered HTML listing the recent regrade jobs, or a redirect
+             back to it after starting a regrade.
+    """
+    # Ensure the user is an admin
+    if not current_user.is_admin:
+        flash('You do not have permission to access this page.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    if request.method == 'POST':
+        regrader.submit(current_app._get_current_object())
+        flash('Regrading all results in the background.', 'info')
+        return redirect(url_for('main.regrade'))
+
+    jobs = regrader.jobs()
+    return render_template('regrade.html', jobs=jobs,
+                           active=any(job.active for job in jobs))
+
+# Exams route
+
+
+@main.route('/exams', methods=['GET', 'POST'])
+@login_required
+def exams():
+    """Allow admins to schedule exams and list the scheduled ones.
+
+    Scheduling an exam generates its papers right away; while it is open,
+    quiz starts are served those papers instead of a random draw.
+
+    Returns:
+        str: Rendered HTML with the exam form and the scheduled exams.
+    """
+    # Ensure the user is an admin
+    if not current_user.is_admin:
+        flash('You do not have permission to access this page.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    form = ExamForm(paper_count=current_app.config['EXAM_PAPER_COUNT'])
+    if form.validate_on_submit():
+        exam = schedule_exam(form.title.data, form.opens_at.data,
+                             form.closes_at.data, form.time_limit.data * 60,
+                             form.num_questions.data, form.paper_count.data)
+        flash(f'Exam "{exam.title}" scheduled with {exam.paper_count} '
+              f'papers.', 'success')
+        return redirect(url_for('main.exams'))
+
+    scheduled = Exam.query.order_by(Exam.opens_at.desc()).all()
+    return render_template('exams.html', form=form, exams=scheduled,
+                           now=datetime.now(timezone.utc).replace(tzinfo=None))
+
+# Delete exam route
+
+
+@main.route('/exams/<int:exam_id>/delete', methods=['POST'])
+@login_required
+def delete_exam_view(exam_id):
+    """Allow admins to delete an exam and its papers.
+
+    Args:
+        exam_id (int): The ID of the exam to delete.
+
+    Returns:
+        str: Redirect to the exams page.
+    """
+    # Ensure the user is an admin
+    if not current_user.is_admin:
+        flash('You do not have permission to access this page.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+    exam = db.session.get(Exam, exam_id)
+    if exam:
+        delete_exam(exam)
+        flash('Exam deleted successfully!', 'success')
+    else:
+        flash('Exam not found.', 'danger')
+    return redirect(url_for('main.exams'))
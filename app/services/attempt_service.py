@@ -0,0 +1,204 @@
+from app import db
+from app.models import QuizAttempt
+from array import array
+from collections import namedtuple
+from flask import current_app
+from threading import Lock
+from time import monotonic, time
+import secrets
+
+Attempt = namedtuple('Attempt', ['id', 'user_id', 'question_ids',
+                                 'started_at', 'deadline'])
+
+
+def pack_question_ids(question_ids):
+    """Packs question IDs into a compact byte string of 64-bit ints."""
+    return array('q', question_ids).tobytes()
+
+
+def unpack_question_ids(packed):
+    """Unpacks a byte string made by ``pack_question_ids``."""
+    question_ids = array('q')
+    question_ids.frombytes(packed)
+    return question_ids.tolist()
+
+
+class AttemptStore:
+    """Base class for server-side stores of in-progress quiz attempts.
+
+    Subclasses implement ``_save``, ``_load``, ``_delete`` and ``_reap``,
+    and may override ``_delete_many`` to remove attempts in bulk.
+    Expired attempts are reaped in bulk, at most once per
+    ``reap_interval`` seconds, whenever a new attempt is created.
+
+    Attributes:
+        grace (float): Seconds past the deadline an attempt is kept, so a
+            late auto-submit can still be matched to it.
+        reap_interval (float): Minimum seconds between automatic reaps.
+    """
+
+    def __init__(self, grace=60, reap_interval=60):
+        self.grace = grace
+        self.reap_interval = reap_interval
+        self._next_reap = 0
+
+    def create(self, user_id, question_ids, time_limit):
+        """
+        Starts a new attempt.
+
+        Args:
+            user_id (int): The ID of the user taking the quiz.
+            question_ids (list): The question IDs in quiz order.
+            time_limit (int): The time limit in seconds.
+
+        Returns:
+            Attempt: The new attempt.
+        """
+        if monotonic() >= self._next_reap:
+            self._next_reap = monotonic() + self.reap_interval
+            self.reap()
+
+        started_at = time()
+        attempt = Attempt(secrets.token_hex(16), user_id, list(question_ids),
+                          started_at, started_at + time_limit)
+        self._save(attempt)
+        return attempt
+
+    def get(self, attempt_id, user_id):
+        """
+        Looks up an attempt of a user.
+
+        Args:
+            attempt_id (str): The attempt ID from the session.
+            user_id (int): The ID of the user who must own the attempt.
+
+        Returns:
+            Attempt: The attempt, or None if it does not exist, belongs to
+                     another user or was reaped.
+        """
+        if not attempt_id:
+            return None
+        attempt = self._load(attempt_id)
+        if attempt is None or attempt.user_id != user_id:
+            return None
+        return attempt
+
+    def delete(self, attempt_id):
+        """Removes an attempt, e.g. after it was submitted."""
+        if attempt_id:
+            self._delete(attempt_id)
+
+    def delete_many(self, attempt_ids):
+        """Removes several attempts, e.g. after a batch was submitted."""
+        attempt_ids = [attempt_id for attempt_id in attempt_ids if attempt_id]
+        if attempt_ids:
+            self._delete_many(attempt_ids)
+
+    def _delete_many(self, attempt_ids):
+        for attempt_id in attempt_ids:
+            self._delete(attempt_id)
+
+    def reap(self):
+        """
+        Removes all attempts past their deadline plus the grace period.
+
+        Returns:
+            int: The number of attempts removed.
+        """
+        return self._reap(time() - self.grace)
+
+
+class DatabaseAttemptStore(AttemptStore):
+    """Attempt store backed by the ``quiz_attempt`` table.
+
+    Writes go through the caller's session, so they are committed with
+    the rest of the request's work.
+    """
+
+    def _save(self, attempt):
+        db.session.add(QuizAttempt(
+            id=attempt.id, user_id=attempt.user_id,
+            question_ids=pack_question_ids(attempt.question_ids),
+            started_at=attempt.started_at, deadline=attempt.deadline))
+
+    def _load(self, attempt_id):
+        row = db.session.get(QuizAttempt, attempt_id)
+        if row is None:
+            return None
+        return Attempt(row.id, row.user_id,
+                       unpack_question_ids(row.question_ids),
+                       row.started_at, row.deadline)
+
+    def _delete(self, attempt_id):
+        db.session.execute(db.delete(QuizAttempt).where(
+            QuizAttempt.id == attempt_id))
+
+    def _delete_many(self, attempt_ids):
+        db.session.execute(db.delete(QuizAttempt).where(
+            QuizAttempt.id.in_(attempt_ids)))
+
+    def _reap(self, cutoff):
+        result = db.session.execute(db.delete(QuizAttempt).where(
+            QuizAttempt.deadline < cutoff))
+        return result.rowcount
+
+
+class MemoryAttemptStore(AttemptStore):
+    """Attempt store kept in process memory, for single-node deployments.
+
+    Question IDs are held packed, as with the database store. Attempts do
+    not survive a restart and are not shared between worker processes.
+    """
+
+    def __init__(self, grace=60, reap_interval=60):
+        super().__init__(grace, reap_interval)
+        self._attempts = {}
+        self._lock = Lock()
+
+    def _save(self, attempt):
+        with self._lock:
+            self._attempts[attempt.id] = attempt._replace(
+                question_ids=pack_question_ids(attempt.question_ids))
+
+    def _load(self, attempt_id):
+        attempt = self._attempts.get(attempt_id)
+        if attempt is None:
+            return None
+        return attempt._replace(
+            question_ids=unpack_question_ids(attempt.question_ids))
+
+    def _delete(self, attempt_id):
+        with self._lock:
+            self._attempts.pop(attempt_id, None)
+
+    def _reap(self, cutoff):
+        with self._lock:
+            expired = [attempt_id for attempt_id, attempt
+                       in self._attempts.items() if attempt.deadline < cutoff]
+            for attempt_id in expired:
+                del self._attempts[attempt_id]
+        return len(expired)
+
+
+ATTEMPT_STORES = {
+    'database': DatabaseAttemptStore,
+    'memory': MemoryAttemptStore,
+}
+
+
+def init_attempt_store(app):
+    """
+    Creates the attempt store selected by ``QUIZ_ATTEMPT_STORE``.
+
+    Args:
+        app (Flask): The application to attach the store to.
+    """
+    store_class = ATTEMPT_STORES[app.config['QUIZ_ATTEMPT_STORE']]
+    app.extensions['quiz_attempts'] = store_class(
+        app.config['QUIZ_ATTEMPT_GRACE'],
+        app.config['QUIZ_ATTEMPT_REAP_INTERVAL'])
+
+
+def get_attempt_store():
+    """Returns the attempt store of the current application."""
+    return current_app.extensions['quiz_attempts']
@@ -0,0 +1,288 @@
+from app import db
+from app.models import Exam, ExamPaper
+from app.services.attempt_service import (pack_question_ids,
+                                          unpack_question_ids)
+from app.services.quiz_service import (get_question_ids,
+                                       get_random_question_ids)
+from app.services.snapshot_service import get_snapshots
+from collections import namedtuple
+from datetime import datetime, timezone
+from flask import render_template
+from itertools import count
+from markupsafe import Markup
+from threading import Lock
+from time import monotonic
+import random
+
+OpenExam = namedtuple('OpenExam', ['id', 'title', 'opens_at', 'closes_at',
+                                   'time_limit'])
+
+
+def _now():
+    """The current time as a naive UTC datetime, as stored for exams."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def render_paper(question_ids):
+    """
+    Renders the questions of a quiz, as shown inside the quiz form.
+
+    Args:
+        question_ids (list): The question IDs in quiz order.
+
+    Returns:
+        str: The rendered HTML.
+    """
+    return render_template('quiz_questions.html',
+                           questions=get_snapshots(question_ids))
+
+
+def schedule_exam(title, opens_at, closes_at, time_limit, num_questions,
+                  paper_count):
+    """
+    Schedules an exam and generates its papers.
+
+    Every paper is a random draw from the question bank with its own
+    question order, rendered once here so that serving it later needs no
+    query or template work.
+
+    Args:
+        title (str): The title of the exam.
+        opens_at (datetime): When the exam opens (UTC).
+        closes_at (datetime): When the exam closes (UTC).
+        time_limit (int): The time limit per attempt, in seconds.
+        num_questions (int): The number of questions per paper.
+        paper_count (int): The number of papers to generate.
+
+    Returns:
+        Exam: The new exam.
+    """
+    exam = Exam(title=title, opens_at=opens_at, closes_at=closes_at,
+                time_limit=time_limit, num_questions=num_questions,
+                paper_count=paper_count)
+    db.session.add(exam)
+    db.session.flush()  # Assign the exam ID for the paper rows
+
+    built_at = _now()
+    rows = []
+    for number in range(paper_count):
+        question_ids = get_random_question_ids(num_questions)
+        rows.append({'exam_id': exam.id, 'number': number,
+                     'question_ids': pack_question_ids(question_ids),
+                     'body': render_paper(question_ids),
+                     'built_at': built_at})
+    if rows:
+        db.session.execute(db.insert(ExamPaper), rows)
+    db.session.commit()
+    exam_schedule.clear()
+    return exam
+
+
+def _replace_questions(question_ids, removed):
+    """
+    Swaps removed questions for random ones not already in the quiz.
+
+    Questions are dropped instead when the bank has no unused question
+    left.
+    """
+    available = get_question_ids()
+    taken = {question_id for question_id in question_ids
+             if question_id not in removed}
+    replaced = []
+    for question_id in question_ids:
+        if question_id not in removed:
+            replaced.append(question_id)
+        elif len(available) > len(taken):
+            while True:
+                candidate = random.choice(available)
+                if candidate not in taken and candidate not in removed:
+                    break
+            taken.add(candidate)
+            replaced.append(candidate)
+    return replaced
+
+
+def refresh_exam_papers(question_ids, deleted=False, added=False):
+    """
+    Rebuilds the papers of upcoming exams affected by changed questions.
+
+    Edited questions are rendered again in place in the papers that have
+    them, and deleted ones are replaced by random questions the paper
+    does not have yet. Added questions are in no paper yet, so every
+    paper is drawn again from the whole bank to give them their chance.
+    Papers of exams that already opened stay as they are, so everyone
+    sitting an exam gets the same papers. Must run after the bank version
+    was bumped, so the new question texts are rendered.
+
+    Args:
+        question_ids (iterable): The questions that were edited, deleted
+                                 or added.
+        deleted (bool): Whether the questions were deleted.
+        added (bool): Whether the questions were added.
+
+    Returns:
+        int: The number of papers rebuilt.
+    """
+    changed = {int(question_id) for question_id in question_ids}
+    papers = db.session.execute(
+        db.select(ExamPaper.id, ExamPaper.question_ids, Exam.num_questions)
+        .join(Exam).where(Exam.opens_at > _now())).all()
+
+    built_at = _now()
+    updates = []
+    for paper_id, packed, num_questions in papers:
+        paper_question_ids = unpack_question_ids(packed)
+        if added:
+            paper_question_ids = get_random_question_ids(num_questions)
+        elif changed.isdisjoint(paper_question_ids):
+            continue
+        elif deleted:
+            paper_question_ids = _replace_questions(paper_question_ids,
+                                                    changed)
+        updates.append({
+            'paper_id': paper_id,
+            'new_question_ids': pack_question_ids(paper_question_ids),
+            'new_body': render_paper(paper_question_ids),
+            'new_built_at': built_at})
+    if updates:
+        table = ExamPaper.__table__
+        db.session.execute(
+            db.update(table).where(table.c.id == db.bindparam('paper_id'))
+            .values(question_ids=db.bindparam('new_question_ids'),
+                    body=db.bindparam('new_body'),
+                    built_at=db.bindparam('new_built_at')),
+            updates)
+        db.session.commit()
+    return len(updates)
+
+
+def delete_exam(exam):
+    """
+    Deletes an exam with its papers.
+
+    Args:
+        exam (Exam): The exam to delete.
+    """
+    db.session.execute(db.delete(ExamPaper).where(
+        ExamPaper.exam_id == exam.id))
+    db.session.delete(exam)
+    db.session.commit()
+    exam_schedule.clear()
+
+
+def draw_questions(time_limit, num_questions=20):
+    """
+    Picks the questions of a new quiz attempt.
+
+    While an exam is open, one of its pre-generated papers is dealt and
+    the time limit ends at the exam's closing time at the latest;
+    otherwise a random set of questions is drawn.
+
+    Args:
+        time_limit (int): The time limit outside of exams, in seconds.
+        num_questions (int): The number of questions drawn outside of
+                             exams.
+
+    Returns:
+        tuple: The question IDs, the rendered paper (None outside of
+               exams) and the time limit in seconds.
+    """
+    exam = exam_schedule.current()
+    paper = exam_schedule.next_paper(exam) if exam else None
+    if paper is None:
+        return get_random_question_ids(num_questions), None, time_limit
+    question_ids, body = paper
+    return question_ids, body, min(
+        exam.time_limit, int((exam.closes_at - _now()).total_seconds()))
+
+
+class ExamSchedule:
+    """Per-process view of the scheduled exams and their papers.
+
+    The exams that have not closed yet are reloaded at most every ``ttl``
+    seconds, so an exam scheduled from another worker process is picked
+    up within that time. The papers of an open exam are loaded once, as
+    they do not change after the exam opened, and dealt out round-robin.
+    Starting an exam quiz is then a lookup in memory.
+
+    Attributes:
+        ttl (float): Seconds the list of exams is served from memory.
+    """
+
+    def __init__(self, ttl=10):
+        self.ttl = ttl
+        self._exams = []
+        self._expires = 0.0
+        self._papers = {}
+        self._lock = Lock()
+
+    def configure(self, ttl):
+        """Apply a new TTL and drop the cached exams."""
+        self.ttl = ttl
+        self.clear()
+
+    def clear(self):
+        """Drop the cached exams and papers, e.g. after scheduling one."""
+        with self._lock:
+            self._exams = []
+            self._expires = 0.0
+            self._papers = {}
+
+    def current(self):
+        """
+        Returns the exam that is open now.
+
+        Returns:
+            OpenExam: The open exam (the earliest to close if several
+                      overlap), or None outside of exams.
+        """
+        now = _now()
+        if monotonic() >= self._expires:
+            self._reload(now)
+        for exam in self._exams:
+            if exam.opens_at <= now < exam.closes_at:
+                return exam
+        return None
+
+    def next_paper(self, exam):
+        """
+        Deals the next paper of an open exam.
+
+        Args:
+            exam (OpenExam): An exam returned by ``current``.
+
+        Returns:
+            tuple: The question IDs and the rendered questions of the
+                   paper, or None if the exam has no papers.
+        """
+        entry = self._papers.get(exam.id)
+        if entry is None:
+            with self._lock:
+                entry = self._papers.get(exam.id)
+                if entry is None:
+                    papers = db.session.execute(
+                        db.select(ExamPaper.question_ids, ExamPaper.body)
+                        .where(ExamPaper.exam_id == exam.id)
+                        .order_by(ExamPaper.number)).all()
+                    entry = ([(unpack_question_ids(packed), Markup(body))
+                              for packed, body in papers], count())
+                    self._papers[exam.id] = entry
+        papers, turns = entry
+        if not papers:
+            return None
+        return papers[next(turns) % len(papers)]
+
+    def _reload(self, now):
+        rows = db.session.execute(
+            db.select(Exam.id, Exam.title, Exam.opens_at, Exam.closes_at,
+                      Exam.time_limit).where(Exam.closes_at > now)
+            .order_by(Exam.closes_at)).all()
+        with self._lock:
+            self._exams = [OpenExam(*row) for row in rows]
+            self._expires = monotonic() + self.ttl
+            open_ids = {exam.id for exam in self._exams}
+            self._papers = {exam_id: entry for exam_id, entry
+                            in self._papers.items() if exam_id in open_ids}
+
+
+exam_schedule = ExamSchedule()
@@ -0,0 +1,374 @@
+from app import db
+from app.models import QuizAnswer, QuizResult
+from app.services.result_archive import NO_ANSWER, result_archive
+from datetime import datetime, timedelta, timezone
+from itertools import chain, groupby
+import csv
+import gzip
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+
+# Optional and slow to import: NumPy is needed for .npz exports only and
+# pyarrow for Parquet exports only, so each is loaded by its first export
+np = pa = pq = None
+
+# Columns of an exported answer row, in file order
+ANSWER_COLUMNS = ('result_id', 'user_id', 'taken_at', 'position',
+                  'question_id', 'chosen', 'is_correct', 'score',
+                  'total_questions')
+WATERMARK_FILE = 'watermark.json'
+EPOCH = datetime(1970, 1, 1)
+ONE_SECOND = timedelta(seconds=1)
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy as np
+    return np
+
+
+def _load_pyarrow():
+    global pa, pq
+    if pq is None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    return pq
+
+
+class ParquetAnswerWriter:
+    """Writes answer rows to a zstd-compressed Parquet file.
+
+    Every chunk becomes a row group; ``chosen`` is dictionary-encoded.
+    """
+
+    extension = '.parquet'
+
+    def __init__(self, path):
+        _load_pyarrow()
+        self.schema = pa.schema([
+            ('result_id', pa.int64()), ('user_id', pa.int64()),
+            ('taken_at', pa.timestamp('ms')), ('position', pa.int16()),
+            ('question_id', pa.int64()), ('chosen', pa.string()),
+            ('is_correct', pa.bool_()), ('score', pa.int16()),
+            ('total_questions', pa.int16())])
+        self._writer = pq.ParquetWriter(path, self.schema,
+                                        compression='zstd',
+                                        use_dictionary=['chosen'])
+
+    def write(self, columns):
+        self._writer.write_table(pa.table(columns, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class NpzAnswerWriter:
+    """Writes answer rows to a compressed NumPy ``.npz`` archive.
+
+    Holds one typed array per column, like ``np.savez_compressed``, but
+    spools the chunks to temporary files first so the export never has
+    to fit in memory. ``chosen`` is stored as 1-byte strings, empty when
+    unanswered.
+    """
+
+    extension = '.npz'
+    DTYPES = {'result_id': 'int64', 'user_id': 'int64',
+              'taken_at': 'datetime64[s]', 'position': 'int16',
+              'question_id': 'int64', 'chosen': 'S1', 'is_correct': 'bool',
+              'score': 'int16', 'total_questions': 'int16'}
+
+    def __init__(self, path):
+        _load_numpy()
+        self.path = path
+        self._spool = tempfile.mkdtemp(dir=os.path.dirname(path) or None)
+        self._files = {name: open(os.path.join(self._spool, name), 'wb')
+                       for name in ANSWER_COLUMNS}
+        self._rows = 0
+
+    def write(self, columns):
+        columns['chosen'] = [chosen or '' for chosen in columns['chosen']]
+        # NumPy converts datetime objects one by one and slowly; seconds
+        # since the epoch go through as plain integers
+        columns['taken_at'] = np.fromiter(
+            ((taken_at - EPOCH) // ONE_SECOND
+             for taken_at in columns['taken_at']),
+            'int64', len(columns['taken_at'])).astype('datetime64[s]')
+        for name, values in columns.items():
+            np.asarray(values, dtype=self.DTYPES[name]).tofile(
+                self._files[name])
+        self._rows += len(columns['result_id'])
+
+    def close(self):
+        try:
+            with zipfile.ZipFile(self.path, 'w', zipfile.ZIP_DEFLATED,
+                                 allowZip64=True) as archive:
+                for name, spooled in self._files.items():
+                    spooled.close()
+                    header = {'descr': np.lib.format.dtype_to_descr(
+                                  np.dtype(self.DTYPES[name])),
+                              'fortran_order': False,
+                              'shape': (self._rows,)}
+                    with archive.open(f'{name}.npy', 'w',
+                                      force_zip64=True) as member, \
+                            open(spooled.name, 'rb') as data:
+                        np.lib.format.write_array_header_2_0(member, header)
+                        shutil.copyfileobj(data, member, 1024 * 1024)
+        finally:
+            shutil.rmtree(self._spool, ignore_errors=True)
+
+
+class CsvAnswerWriter:
+    """Writes answer rows to a gzip-compressed CSV file with a header."""
+
+    extension = '.csv.gz'
+
+    def __init__(self, path):
+        self._stream = gzip.open(path, 'wt', compresslevel=6, newline='',
+                                 encoding='utf-8')
+        self._writer = csv.writer(self._stream)
+        self._writer.writerow(ANSWER_COLUMNS)
+
+    def write(self, columns):
+        columns['taken_at'] = [taken_at.isoformat()
+                               for taken_at in columns['taken_at']]
+        columns['is_correct'] = [int(correct)
+                                 for correct in columns['is_correct']]
+        self._writer.writerows(zip(*(columns[name]
+                                     for name in ANSWER_COLUMNS)))
+
+    def close(self):
+        self._stream.close()
+
+
+EXPORT_FORMATS = {
+    'parquet': ParquetAnswerWriter,
+    'npz': NpzAnswerWriter,
+    'csv': CsvAnswerWriter,
+}
+
+
+def available_formats():
+    """Returns the export formats whose dependencies are installed."""
+    return [name for name, module in (('parquet', 'pyarrow'),
+                                      ('npz', 'numpy'), ('csv', None))
+            if module is None or importlib.util.find_spec(module)]
+
+
+def read_watermark(directory):
+    """
+    Returns the moment up to which a directory has been exported.
+
+    Args:
+        directory (str): The export directory.
+
+    Returns:
+        datetime: The time up to which results were exported (UTC), or
+                  None if nothing was exported there yet.
+    """
+    try:
+        with open(os.path.join(directory, WATERMARK_FILE)) as stream:
+            return datetime.fromisoformat(json.load(stream)['until'])
+    except FileNotFoundError:
+        return None
+
+
+def _write_watermark(directory, until):
+    path = os.path.join(directory, WATERMARK_FILE)
+    with open(path + '.tmp', 'w') as stream:
+        json.dump({'until': until.isoformat()}, stream)
+    os.replace(path + '.tmp', path)
+
+
+def iter_answer_columns(after=None, until=None, chunk_size=2500):
+    """
+    Streams answered questions joined with their results, column-wise.
+
+    Results are read in ID order through a server-side cursor where the
+    database supports it, and the answers of each chunk of results with
+    one query; the result columns are repeated per answer in Python
+    instead of by a join, which would transfer and parse them once per
+    answered question.
+
+    Args:
+        after (datetime): Only include results taken after this moment.
+        until (datetime): Only include results taken up to this moment.
+        chunk_size (int): The number of results read at a time.
+
+    Yields:
+        tuple: The number of results in the chunk, and a dict mapping
+               each of ``ANSWER_COLUMNS`` to a list of values.
+    """
+    results = QuizResult.__table__
+    answers = QuizAnswer.__table__
+    query = db.select(results.c.id, results.c.user_id, results.c.timestamp,
+                      results.c.score, results.c.total_questions)
+    if after is not None:
+        query = query.where(results.c.timestamp > after)
+    if until is not None:
+        query = query.where(results.c.timestamp <= until)
+    query = query.order_by(results.c.id).execution_options(
+        yield_per=chunk_size)
+    for chunk in db.session.execute(query).partitions():
+        by_id = {row[0]: row for row in chunk}
+        rows = db.session.execute(
+            db.select(answers.c.result_id, answers.c.question_id,
+                      answers.c.chosen, answers.c.is_correct)
+            .where(answers.c.result_id.in_(by_id))
+            .order_by(answers.c.result_id, answers.c.id)).all()
+        if not rows:
+            continue
+        result_ids, question_ids, chosen, is_correct = map(list, zip(*rows))
+        rows = [by_id[result_id] for result_id in result_ids]
+        positions = [position for _, group in groupby(result_ids)
+                     for position in range(1, sum(1 for _ in group) + 1)]
+        yield len(chunk), {
+            'result_id': result_ids,
+            'user_id': [row[1] for row in rows],
+            'taken_at': [row[2] for row in rows],
+            'position': positions,
+            'question_id': question_ids,
+            'chosen': chosen,
+            'is_correct': [bool(correct) for correct in is_correct],
+            'score': [row[3] for row in rows],
+            'total_questions': [row[4] or 0 for row in rows],
+        }
+
+
+def iter_archived_answer_columns(after=None, until=None, chunk_size=2500):
+    """
+    Streams the answered questions of archived results, column-wise.
+
+    Yields the same chunks as ``iter_answer_columns``, read from the
+    segments of the result archive in file order.
+
+    Args:
+        after (datetime): Only include results taken after this moment.
+        until (datetime): Only include results taken up to this moment.
+        chunk_size (int): The number of results per chunk.
+
+    Yields:
+        tuple: The number of results in the chunk, and a dict mapping
+               each of ``ANSWER_COLUMNS`` to a list of values.
+    """
+    columns = {name: [] for name in ANSWER_COLUMNS}
+    count = 0
+    for segment in result_archive.segments():
+        for result in segment.results():
+            if ((after is not None and result.timestamp <= after)
+                    or (until is not None and result.timestamp > until)):
+                continue
+            rows = segment.answers(result.answer_start, result.answer_count)
+            for position, (question_id, chosen, correct) in enumerate(
+                    rows, 1):
+                columns['result_id'].append(result.id)
+                columns['user_id'].append(result.user_id)
+                columns['taken_at'].append(result.timestamp)
+                columns['position'].append(position)
+                columns['question_id'].append(question_id)
+                columns['chosen'].append(
+                    None if chosen == NO_ANSWER else chosen.decode())
+                columns['is_correct'].append(bool(correct))
+                columns['score'].append(result.score)
+                columns['total_questions'].append(result.total_questions)
+            count += 1
+            if count >= chunk_size:
+                if columns['result_id']:
+                    yield count, columns
+                columns = {name: [] for name in ANSWER_COLUMNS}
+                count = 0
+    if columns['result_id']:
+        yield count, columns
+
+
+def _utc_naive(moment):
+    """Converts an aware datetime to naive UTC; naive ones are UTC."""
+    if moment is not None and moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def export_answers(directory, file_format=None, incremental=True,
+                   since=None, lag=60, chunk_size=2500, progress=None):
+    """
+    Exports one row per answered question to a columnar file.
+
+    Incremental exports continue after the watermark left in the
+    directory by the previous export and only write results taken since
+    then, each run to a new file. Results from the last ``lag`` seconds
+    are left for the next run, so results whose timestamp was set just
+    before they were committed are not skipped. Run ``backfill-answers``
+    first for results older than the answer table.
+
+    Archived results are included by full exports and by the first
+    incremental export of a directory. Later incremental exports only
+    read the tables, which is enough as long as they run more often than
+    results are archived.
+
+    Args:
+        directory (str): The directory written to.
+        file_format (str): 'parquet', 'npz' or 'csv'; defaults to the
+                           first of them whose dependencies are installed.
+        incremental (bool): Whether to continue after (and advance) the
+                            directory's watermark.
+        since (datetime): Only export results taken after this moment,
+                          unless a watermark says otherwise. Naive
+                          datetimes are taken as UTC.
+        lag (int): Seconds of the newest results left out.
+        chunk_size (int): The number of results read and written at a
+                          time.
+        progress (callable): Optional callback receiving the number of
+                             results and rows written so far.
+
+    Returns:
+        tuple: The path of the written file (None if there was nothing
+               new to export), and the number of results and rows.
+    """
+    file_format = file_format or available_formats()[0]
+    if file_format not in available_formats():
+        raise ValueError(f'The {file_format} export format needs an '
+                         f'optional dependency that is not installed.')
+    os.makedirs(directory, exist_ok=True)
+
+    watermark = read_watermark(directory) if incremental else None
+    after = watermark or _utc_naive(since)
+    until = (datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+             - timedelta(seconds=lag))
+    if after is not None and until <= after:
+        return None, 0, 0  # Never move the watermark back
+    writer_class = EXPORT_FORMATS[file_format]
+    file_name = f'answers-{until:%Y%m%dT%H%M%S}{writer_class.extension}'
+    path = os.path.join(directory, file_name)
+    writer = writer_class(path + '.part')
+
+    results = rows = 0
+    try:
+        chunks = iter_answer_columns(after, until, chunk_size)
+        if watermark is None:
+            chunks = chain(
+                iter_archived_answer_columns(after, until, chunk_size),
+                chunks)
+        for count, columns in chunks:
+            rows += len(columns['result_id'])
+            writer.write(columns)
+            results += count
+            if progress:
+                progress(results, rows)
+        writer.close()
+    except BaseException:
+        writer.close()
+        os.remove(path + '.part')
+        raise
+
+    if rows:
+        os.replace(path + '.part', path)
+    else:
+        os.remove(path + '.part')
+        path = None
+    if incremental:
+        _write_watermark(directory, until)
+    return path, results, rows
@@ -0,0 +1,83 @@
+from app.models import QuizQuestion
+from app.services.quiz_service import get_bank_version
+from threading import Lock
+
+# Upper bound on cached answer-key entries; the cache is simply reset
+# when it would grow past this size.
+ANSWER_KEY_CACHE_SIZE = 100_000
+
+# In-process answer key: question ID -> correct answer identifier. The
+# whole cache is tied to the question bank version it was filled under.
+_answer_key = {}
+_answer_key_version = None
+_answer_key_lock = Lock()
+
+
+def get_answer_key(question_ids, fresh=False):
+    """
+    Returns the correct answers for the given question IDs.
+
+    Cached entries are reused as long as the question bank version has
+    not changed; any missing IDs are loaded with a single ``IN`` query.
+
+    Args:
+        question_ids (iterable): The IDs of the questions to look up.
+        fresh (bool): Check the stored bank version first instead of
+                      trusting the one read within its TTL, so an answer
+                      key edited by another process is never used stale.
+
+    Returns:
+        dict: A mapping of question ID to its correct answer identifier.
+              Questions that no longer exist are left out.
+    """
+    global _answer_key, _answer_key_version
+    question_ids = [int(question_id) for question_id in question_ids]
+    version = get_bank_version(fresh)
+
+    with _answer_key_lock:
+        if _answer_key_version != version:
+            _answer_key = {}
+            _answer_key_version = version
+        cache = _answer_key
+
+    answer_key = {question_id: cache[question_id]
+                  for question_id in question_ids if question_id in cache}
+    missing_ids = [question_id for question_id in question_ids
+                   if question_id not in answer_key]
+    if missing_ids:
+        rows = QuizQuestion.query.with_entities(
+            QuizQuestion.id, QuizQuestion.correct_answer).filter(
+            QuizQuestion.id.in_(missing_ids))
+        loaded = dict(rows.all())
+        with _answer_key_lock:
+            # Only publish entries if the bank did not change meanwhile
+            if _answer_key_version == version:
+                if len(_answer_key) + len(loaded) > ANSWER_KEY_CACHE_SIZE:
+                    _answer_key = {}
+                _answer_key.update(loaded)
+        answer_key.update(loaded)
+
+    return answer_key
+
+
+def grade_answers(user_answers):
+    """
+    Grades a set of submitted answers against the answer key.
+
+    The bank version is checked on every call, so submissions are never
+    scored against an answer key another process has changed since.
+
+    Args:
+        user_answers (dict): A mapping of question ID to the selected
+                             answer identifier.
+
+    Returns:
+        tuple: The score (int) and a dict mapping each question ID to
+               whether it was answered correctly.
+    """
+    answer_key = get_answer_key(user_answers, fresh=True)
+    correctness = {
+        question_id: answer == answer_key.get(int(question_id))
+        for question_id, answer in user_answers.items()
+    }
+    return sum(correctness.values()), correctness
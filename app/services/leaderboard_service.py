@@ -0,0 +1,427 @@
+from app import db
+from app.models import LeaderboardEntry, QuizResult, User
+from app.services.result_archive import result_archive
+from datetime import datetime, timezone
+from itertools import chain
+from threading import Lock
+from time import monotonic
+
+PERIOD_TYPES = ('all', 'week', 'month')
+
+
+def period_keys(moment=None):
+    """
+    Returns the leaderboard period keys a moment falls into.
+
+    Args:
+        moment (datetime): The moment to look up; defaults to now (UTC).
+
+    Returns:
+        dict: A mapping of period type to period key, e.g.
+              {'all': 'all', 'week': 'week:2026-W42',
+               'month': 'month:2026-10'}.
+    """
+    moment = moment or datetime.now(timezone.utc)
+    year, week, _ = moment.isocalendar()
+    return {'all': 'all',
+            'week': f'week:{year}-W{week:02d}',
+            'month': f'month:{moment:%Y-%m}'}
+
+
+def _upsert_statement(dialect_name):
+    """Builds an accumulating upsert for dialects with ON CONFLICT."""
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+
+    table = LeaderboardEntry.__table__
+    statement = insert(table)
+    excluded = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=['period', 'user_id'],
+        set_={
+            'attempts': table.c.attempts + excluded.attempts,
+            'total_score': table.c.total_score + excluded.total_score,
+            'total_questions': (table.c.total_questions
+                                + excluded.total_questions),
+            'best_pct': db.case(
+                (excluded.best_pct > table.c.best_pct, excluded.best_pct),
+                else_=table.c.best_pct),
+            'avg_pct': ((table.c.total_score + excluded.total_score) * 1.0
+                        / (table.c.total_questions
+                           + excluded.total_questions)),
+        })
+
+
+def record_result(user_id, score, total_questions, moment=None):
+    """
+    Adds a quiz result to the user's all-time, weekly and monthly rollups.
+
+    Runs in the caller's session, so the rollups are committed together
+    with the quiz result.
+
+    Args:
+        user_id (int): The ID of the user.
+        score (int): The number of correct answers.
+        total_questions (int): The number of questions in the quiz.
+        moment (datetime): When the quiz was taken; defaults to now.
+    """
+    record_results([(user_id, score, total_questions, moment)])
+
+
+def record_results(results):
+    """
+    Adds a batch of quiz results to the leaderboard rollups.
+
+    Results are summed per user and period first, so each rollup row is
+    written once per batch.
+
+    Args:
+        results (iterable): (user ID, score, total questions, moment)
+                            tuples, as taken by ``record_result``.
+    """
+    totals = {}
+    for user_id, score, total_questions, moment in results:
+        if not total_questions:
+            continue
+        ratio = score / total_questions
+        for period in period_keys(moment).values():
+            row = totals.get((period, user_id))
+            if row is None:
+                totals[(period, user_id)] = {
+                    'period': period, 'user_id': user_id, 'attempts': 1,
+                    'total_score': score, 'total_questions': total_questions,
+                    'best_pct': ratio}
+                continue
+            row['attempts'] += 1
+            row['total_score'] += score
+            row['total_questions'] += total_questions
+            row['best_pct'] = max(row['best_pct'], ratio)
+    rows = list(totals.values())
+    if not rows:
+        return
+    for row in rows:
+        row['avg_pct'] = row['total_score'] / row['total_questions']
+
+    upsert = _upsert_statement(db.session.get_bind().dialect.name)
+    if upsert is not None:
+        db.session.execute(upsert, rows)
+        return
+
+    # Portable fallback: read-modify-write through the ORM
+    for row in rows:
+        entry = db.session.get(LeaderboardEntry,
+                               (row['period'], row['user_id']))
+        if entry is None:
+            db.session.add(LeaderboardEntry(**row))
+            continue
+        entry.attempts += row['attempts']
+        entry.total_score += row['total_score']
+        entry.total_questions += row['total_questions']
+        entry.best_pct = max(entry.best_pct, row['best_pct'])
+        entry.avg_pct = entry.total_score / entry.total_questions
+
+
+def rebuild_leaderboard(batch_size=10000):
+    """
+    Recomputes every leaderboard rollup from the stored quiz results.
+
+    Results are streamed in primary-key batches, followed by the archived
+    ones, and aggregated in memory (one small record per user and period)
+    before the table is replaced.
+
+    Args:
+        batch_size (int): The number of results read per query.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    def stored_results():
+        last_id = 0
+        while True:
+            batch = db.session.query(
+                QuizResult.id, QuizResult.user_id, QuizResult.score,
+                QuizResult.total_questions, QuizResult.timestamp).filter(
+                QuizResult.id > last_id).order_by(
+                QuizResult.id).limit(batch_size).all()
+            if not batch:
+                return
+            last_id = batch[-1].id
+            yield from batch
+
+    totals = {}
+    archived_results = ((result.id, result.user_id, result.score,
+                         result.total_questions, result.timestamp)
+                        for result in result_archive.results())
+    for _, user_id, score, total_questions, timestamp in chain(
+            stored_results(), archived_results):
+        if not total_questions:
+            continue
+        ratio = score / total_questions
+        for period in period_keys(timestamp).values():
+            entry = totals.get((period, user_id))
+            if entry is None:
+                totals[(period, user_id)] = [1, score, total_questions,
+                                             ratio]
+            else:
+                entry[0] += 1
+                entry[1] += score
+                entry[2] += total_questions
+                entry[3] = max(entry[3], ratio)
+
+    db.session.execute(db.delete(LeaderboardEntry))
+    rows = [{'period': period, 'user_id': user_id, 'attempts': attempts,
+             'total_score': total_score, 'total_questions': total_questions,
+             'best_pct': best_pct, 'avg_pct': total_score / total_questions}
+            for (period, user_id), (attempts, total_score, total_questions,
+                                    best_pct) in totals.items()]
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(db.insert(LeaderboardEntry.__table__),
+                           rows[start:start + batch_size])
+    db.session.commit()
+    leaderboard.clear()
+    return len(rows)
+
+
+def apply_score_changes(changes):
+    """
+    Adjusts the leaderboard rollups of results whose score changed.
+
+    Totals and averages are shifted by the score differences, and a best
+    score is raised when a result now beats it. Only when a result that
+    may have set a best score lost points is that best recomputed, from
+    the user's stored and archived results. Runs in the caller's session,
+    after the new scores were written.
+
+    Args:
+        changes (list): (user ID, timestamp, total questions, old score,
+                        new score) tuples, one per changed result.
+    """
+    pending = {}
+    for user_id, timestamp, total_questions, old_score, new_score in changes:
+        if not total_questions or old_score == new_score:
+            continue
+        for period in period_keys(timestamp).values():
+            # [score change, best new ratio, best ratio that lost points]
+            change = pending.setdefault((period, user_id), [0, 0.0, -1.0])
+            change[0] += new_score - old_score
+            change[1] = max(change[1], new_score / total_questions)
+            if new_score < old_score:
+                change[2] = max(change[2], old_score / total_questions)
+    if not pending:
+        return
+
+    table = LeaderboardEntry.__table__
+    rows = db.session.execute(
+        db.select(table.c.period, table.c.user_id, table.c.total_score,
+                  table.c.total_questions, table.c.best_pct).where(
+            table.c.user_id.in_({user_id for _, user_id in pending}),
+            table.c.period.in_({period for period, _ in pending}))).all()
+    updates = {}
+    stale = set()
+    for period, user_id, total_score, total_questions, best_pct in rows:
+        change = pending.get((period, user_id))
+        if change is None:
+            continue
+        score_change, best_new, best_lost = change
+        if best_lost >= best_pct - 1e-9:
+            stale.add((period, user_id))
+        total_score += score_change
+        updates[(period, user_id)] = {
+            'entry_period': period, 'entry_user_id': user_id,
+            'new_total_score': total_score,
+            'new_avg_pct': total_score / total_questions,
+            'new_best_pct': max(best_pct, best_new)}
+
+    if stale:
+        best = dict.fromkeys(stale, 0.0)
+        user_ids = {user_id for _, user_id in stale}
+        results = db.session.execute(
+            db.select(QuizResult.user_id, QuizResult.score,
+                      QuizResult.total_questions, QuizResult.timestamp).where(
+                QuizResult.user_id.in_(user_ids),
+                QuizResult.total_questions > 0))
+        archived_results = ((result.user_id, result.score,
+                             result.total_questions, result.timestamp)
+                            for result in result_archive.results(user_ids)
+                            if result.total_questions)
+        for user_id, score, total_questions, timestamp in chain(
+                results, archived_results):
+            for period in period_keys(timestamp).values():
+                if (period, user_id) in best:
+                    best[(period, user_id)] = max(best[(period, user_id)],
+                                                  score / total_questions)
+        for key, best_pct in best.items():
+            updates[key]['new_best_pct'] = best_pct
+
+    if updates:
+        db.session.execute(
+            db.update(table).where(
+                table.c.period == db.bindparam('entry_period'),
+                table.c.user_id == db.bindparam('entry_user_id')).values(
+                total_score=db.bindparam('new_total_score'),
+                avg_pct=db.bindparam('new_avg_pct'),
+                best_pct=db.bindparam('new_best_pct')),
+            list(updates.values()))
+
+
+def _sort_key(entry):
+    """Orders leaderboard entries best first; ties broken by user ID."""
+    return (-entry['best_pct'], -entry['avg_pct'], entry['user_id'])
+
+
+class Leaderboard:
+    """In-memory top-K view of the leaderboard rollups, per period.
+
+    Each period's top K is loaded lazily from ``leaderboard_entry`` with
+    one indexed query and then kept current incrementally as
+    submissions come in. A TTL bounds how stale a board can get when
+    other processes record results.
+
+    Attributes:
+        size (int): The number of entries (K) kept per period.
+        ttl (float): The number of seconds a loaded board stays valid.
+    """
+
+    def __init__(self, size=10, ttl=30):
+        self.size = size
+        self.ttl = ttl
+        self._boards = {}
+        self._lock = Lock()
+
+    def configure(self, size, ttl):
+        """Change the board size and TTL, dropping all loaded boards."""
+        with self._lock:
+            self.size = size
+            self.ttl = ttl
+            self._boards.clear()
+
+    def clear(self):
+        """Drop all loaded boards so they are reloaded on next use."""
+        with self._lock:
+            self._boards.clear()
+
+    def _load(self, period):
+        rows = db.session.query(
+            LeaderboardEntry.user_id, User.username,
+            LeaderboardEntry.attempts, LeaderboardEntry.best_pct,
+            LeaderboardEntry.avg_pct).join(
+            User, User.id == LeaderboardEntry.user_id).filter(
+            LeaderboardEntry.period == period).order_by(
+            LeaderboardEntry.best_pct.desc(), LeaderboardEntry.avg_pct.desc(),
+            LeaderboardEntry.user_id).limit(self.size).all()
+        return [row._asdict() for row in rows]
+
+    def top(self, period):
+        """
+        Returns the top K entries of a period, best first.
+
+        Args:
+            period (str): The period key.
+
+        Returns:
+            list: Dicts with user_id, username, attempts, best_pct and
+                  avg_pct.
+        """
+        now = monotonic()
+        with self._lock:
+            board = self._boards.get(period)
+            if board is not None and board[0] > now:
+                return list(board[1])
+
+        entries = self._load(period)
+        with self._lock:
+            self._boards[period] = (now + self.ttl, entries)
+        return list(entries)
+
+    def update(self, period, entry):
+        """
+        Applies a user's new rollup to a loaded board.
+
+        Args:
+            period (str): The period key.
+            entry (dict): The user's entry, as returned by ``top``.
+        """
+        with self._lock:
+            board = self._boards.get(period)
+            if board is None:
+                return
+            expires, entries = board
+            was_full = len(entries) >= self.size
+            previous = next((index for index, current in enumerate(entries)
+                             if current['user_id'] == entry['user_id']), None)
+
+            entries = [current for current in entries
+                       if current['user_id'] != entry['user_id']]
+            entries.append(entry)
+            entries.sort(key=_sort_key)
+
+            # A user who dropped to the bottom of a full board may now be
+            # outranked by someone who is not loaded; reload lazily
+            if (previous is not None and was_full
+                    and entries[-1]['user_id'] == entry['user_id']
+                    and previous != len(entries) - 1):
+                del self._boards[period]
+                return
+
+            self._boards[period] = (expires, entries[:self.size])
+
+    def record(self, user_id, username, moment=None):
+        """
+        Refreshes the loaded boards after a user's result was committed.
+
+        Args:
+            user_id (int): The ID of the user.
+            username (str): The username of the user.
+            moment (datetime): When the quiz was taken; defaults to now.
+        """
+        periods = list(period_keys(moment).values())
+        rows = LeaderboardEntry.query.filter(
+            LeaderboardEntry.user_id == user_id,
+            LeaderboardEntry.period.in_(periods)).all()
+        for row in rows:
+            self.update(row.period, {
+                'user_id': user_id, 'username': username,
+                'attempts': row.attempts, 'best_pct': row.best_pct,
+                'avg_pct': row.avg_pct})
+
+    def rank(self, period, user_id):
+        """
+        Returns a user's rank in a period.
+
+        Users with the same best and average score share a rank. Served
+        from the loaded board when the user is in the top K, otherwise
+        with one indexed count query.
+
+        Args:
+            period (str): The period key.
+            user_id (int): The ID of the user.
+
+        Returns:
+            tuple: The rank (int) and the user's entry (dict), or None if
+                   the user has no result in the period.
+        """
+        entries = self.top(period)
+        for entry in entries:
+            if entry['user_id'] == user_id:
+                key = (entry['best_pct'], entry['avg_pct'])
+                better = sum(1 for other in entries
+                             if (other['best_pct'], other['avg_pct']) > key)
+                return better + 1, entry
+
+        row = db.session.get(LeaderboardEntry, (period, user_id))
+        if row is None:
+            return None
+        better = LeaderboardEntry.query.filter(
+            LeaderboardEntry.period == period,
+            db.tuple_(LeaderboardEntry.best_pct, LeaderboardEntry.avg_pct)
+            > db.tuple_(row.best_pct, row.avg_pct)).count()
+        return better + 1, {'user_id': user_id, 'attempts': row.attempts,
+                            'best_pct': row.best_pct,
+                            'avg_pct': row.avg_pct}
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,169 @@
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from threading import BoundedSemaphore, Lock
+from werkzeug.security import (DEFAULT_PBKDF2_ITERATIONS,
+                               generate_password_hash, check_password_hash)
+import atexit
+import multiprocessing
+
+# Werkzeug's default method for new hashes
+DEFAULT_HASH_METHOD = 'scrypt'
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when the hashing pool has no free slot for a new job."""
+
+
+class HashingTimedOut(HashingPoolSaturated):
+    """Raised when a hashing job does not finish within the timeout."""
+
+
+def _worker_context():
+    """Return the multiprocessing context for the hashing workers."""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def hash_method_prefix(method):
+    """Return the prefix of the hashes a Werkzeug hash method makes.
+
+    Werkzeug stores the method with its defaults filled in, e.g.
+    ``'scrypt'`` becomes ``'scrypt:32768:8:1'``; this expands the method
+    string the same way without hashing anything.
+
+    Args:
+        method (str): A Werkzeug hash method, e.g. ``'pbkdf2:sha256'``.
+
+    Returns:
+        str: The method part of the hashes it makes.
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt' and not args:
+        return 'scrypt:32768:8:1'
+    if name == 'pbkdf2' and len(args) < 2:
+        hash_name = args[0] if args else 'sha256'
+        return f'pbkdf2:{hash_name}:{DEFAULT_PBKDF2_ITERATIONS}'
+    return method
+
+
+class PasswordHasher:
+    """Runs password hashing and verification in a dedicated process pool.
+
+    Hashing is deliberately CPU-heavy, so it is moved off the request
+    threads into worker processes. The number of jobs in flight (running
+    plus queued) is bounded; once the bound is reached new jobs are
+    rejected immediately with ``HashingPoolSaturated`` instead of piling
+    up behind each other. A job that does not finish within ``timeout``
+    seconds raises ``HashingTimedOut``, so callers answer both cases the
+    same way.
+
+    The workers are started with the forkserver method (spawn where it
+    is unavailable) rather than forked from a multi-threaded request
+    process.
+
+    Attributes:
+        workers (int): The number of worker processes. 0 hashes inline
+            on the calling thread.
+        queue_size (int): The number of jobs allowed to wait for a worker.
+        timeout (float): The number of seconds to wait for a job result.
+        method (str): The Werkzeug hash method for new hashes, or None for
+            ``DEFAULT_HASH_METHOD``.
+    """
+
+    def __init__(self, workers=0, queue_size=0, timeout=10, method=None):
+        self._executor = None
+        self._lock = Lock()
+        self.configure(workers, queue_size, timeout, method)
+
+    def configure(self, workers, queue_size, timeout, method):
+        """Apply new pool settings, shutting down any running pool."""
+        self.shutdown()
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.method = method
+        self._slots = BoundedSemaphore(max(workers + queue_size, 1))
+        # Prefix of a hash made with the current settings, e.g.
+        # 'scrypt:32768:8:1'; stored hashes with another prefix are stale
+        self._method_prefix = hash_method_prefix(
+            method or DEFAULT_HASH_METHOD)
+
+    def shutdown(self):
+        """Stop the worker processes, if they were started."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=_worker_context())
+            return self._executor
+
+    def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+
+        # A job that outlives a reconfiguration frees a slot of the old pool
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HashingPoolSaturated()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise HashingTimedOut() from None
+
+    def hash_password(self, password):
+        """Hash a password with the configured method.
+
+        Args:
+            password (str): The plain-text password.
+
+        Returns:
+            str: The Werkzeug password hash.
+
+        Raises:
+            HashingPoolSaturated: If the pool is full or the job timed out.
+        """
+        return self._run(generate_password_hash, password,
+                         self.method or DEFAULT_HASH_METHOD)
+
+    def verify_password(self, password_hash, password):
+        """Check a password against a stored hash.
+
+        Args:
+            password_hash (str): The stored Werkzeug password hash.
+            password (str): The plain-text password to check.
+
+        Returns:
+            bool: True if the password matches.
+
+        Raises:
+            HashingPoolSaturated: If the pool is full or the job timed out.
+        """
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Check whether a stored hash uses outdated hash parameters.
+
+        Args:
+            password_hash (str): The stored Werkzeug password hash.
+
+        Returns:
+            bool: True if the hash was made with different parameters than
+                  the configured method.
+        """
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+
+password_hasher = PasswordHasher()
+atexit.register(password_hasher.shutdown)
@@ -0,0 +1,176 @@
+from app import db
+from app.forms import QuestionForm
+from app.models import QuizQuestion
+from app.services.exam_service import refresh_exam_papers
+from app.services.quiz_service import invalidate_question_cache
+from werkzeug.datastructures import MultiDict
+import csv
+import io
+import json
+
+# Columns of an import/export row, in file order
+QUESTION_FIELDS = ('question_text', 'answer_a', 'answer_b', 'answer_c',
+                   'answer_d', 'correct_answer')
+FORMATS = ('csv', 'jsonl')
+
+
+def _read_rows(stream, file_format):
+    """Yields (line number, row, parse error) from a text stream.
+
+    When a line cannot be parsed the row is the raw line instead.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                yield line_number, line.strip(), f'Invalid JSON: {error}'
+                continue
+            if not isinstance(row, dict):
+                yield line_number, line.strip(), 'Expected a JSON object'
+                continue
+            yield line_number, row, None
+
+
+def validate_row(row):
+    """
+    Validates an imported row with the same rules as ``QuestionForm``.
+
+    Args:
+        row (dict): The raw row, keyed by question field name.
+
+    Returns:
+        tuple: The cleaned row (or None if invalid) and a list of error
+               messages.
+    """
+    formdata = MultiDict({field: '' if row.get(field) is None
+                          else str(row.get(field)).strip()
+                          for field in QUESTION_FIELDS})
+    form = QuestionForm(formdata=formdata, meta={'csrf': False})
+    if not form.validate():
+        errors = [f'{field}: {message}'
+                  for field, messages in form.errors.items()
+                  for message in messages]
+        return None, errors
+    return {field: form[field].data for field in QUESTION_FIELDS}, []
+
+
+def import_questions(stream, file_format='csv', batch_size=1000,
+                     errors=None, progress=None):
+    """
+    Streams questions from a CSV or JSONL file into the question bank.
+
+    Rows are parsed and validated one at a time and inserted in batches
+    of ``batch_size``, each committed in its own transaction, so memory
+    use is bounded regardless of file size. Invalid rows are skipped and
+    reported. Once anything was committed, even if a later batch failed,
+    the question caches are invalidated and the papers of upcoming exams
+    are drawn again, so the imported questions are served.
+
+    Args:
+        stream (file): A text stream with the file contents.
+        file_format (str): Either 'csv' or 'jsonl'.
+        batch_size (int): The number of rows inserted per transaction.
+        errors (file): Optional text stream receiving a CSV error report
+                       with the line number, the error and the raw row.
+        progress (callable): Optional callback receiving the number of
+                             imported and rejected rows after each batch.
+
+    Returns:
+        tuple: The number of imported and rejected rows.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f'Unsupported format: {file_format}')
+
+    error_writer = csv.writer(errors) if errors is not None else None
+    if error_writer:
+        error_writer.writerow(['line', 'error', 'row'])
+
+    imported = rejected = 0
+    batch = []
+
+    def flush():
+        nonlocal imported
+        if batch:
+            db.session.execute(db.insert(QuizQuestion), batch)
+            db.session.commit()
+            imported += len(batch)
+            batch.clear()
+        if progress:
+            progress(imported, rejected)
+
+    try:
+        for line_number, row, parse_error in _read_rows(stream,
+                                                        file_format):
+            if parse_error:
+                cleaned, row_errors = None, [parse_error]
+            else:
+                cleaned, row_errors = validate_row(row)
+            if row_errors:
+                rejected += 1
+                if error_writer:
+                    raw = row if parse_error else json.dumps(row)
+                    error_writer.writerow([line_number,
+                                           '; '.join(row_errors), raw])
+                continue
+
+            batch.append(cleaned)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        if imported:
+            db.session.rollback()   # Drop a batch that failed midway
+            invalidate_question_cache()  # Commits the (now empty) session
+            refresh_exam_papers((), added=True)
+    return imported, rejected
+
+
+def export_questions(file_format='csv', batch_size=1000):
+    """
+    Streams the whole question bank as CSV or JSONL.
+
+    Questions are read in primary-key batches as plain tuples, so no ORM
+    objects are built and only one batch is held in memory at a time.
+
+    Args:
+        file_format (str): Either 'csv' or 'jsonl'.
+        batch_size (int): The number of questions read per query.
+
+    Yields:
+        str: Chunks of the exported file.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f'Unsupported format: {file_format}')
+
+    columns = [getattr(QuizQuestion, field) for field in QUESTION_FIELDS]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if file_format == 'csv':
+        writer.writerow(QUESTION_FIELDS)
+        yield buffer.getvalue()
+
+    last_id = 0
+    while True:
+        rows = db.session.query(QuizQuestion.id, *columns).filter(
+            QuizQuestion.id > last_id).order_by(
+            QuizQuestion.id).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            if file_format == 'csv':
+                writer.writerow(row[1:])
+            else:
+                buffer.write(json.dumps(dict(zip(QUESTION_FIELDS, row[1:]))))
+                buffer.write('\n')
+        yield buffer.getvalue()
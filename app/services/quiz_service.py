@@ -1,11 +1,226 @@
-from app.models import QuizQuestion
+from app import db
+from app.models import CacheVersion, QuizQuestion
+from array import array
+from threading import Lock
+from time import monotonic, time
 import random
 
+# Name of the question bank's row in the cache_version table
+BANK_VERSION = 'question_bank'
+
+# Compact cache of every question ID in the bank, with the bank version
+# it was loaded under. IDs are held in a typed array rather than a list
+# of ORM objects so a 1M-question bank costs ~8 MB instead of a full
+# hydration on every quiz start.
+_question_ids = None
+_question_ids_lock = Lock()
+
+
+def _bump_statement(dialect_name, now):
+    """Builds the version bump as an upsert for dialects with ON CONFLICT."""
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+
+    table = CacheVersion.__table__
+    statement = insert(table).values(name=BANK_VERSION, version=1,
+                                     changed_at=now)
+    return statement.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'version': table.c.version + 1,
+              'changed_at': statement.excluded.changed_at})
+
+
+class BankVersion:
+    """The question bank version, shared by all processes.
+
+    The version is a counter in the ``cache_version`` table, bumped
+    whenever the bank changes. Read-side caches (question IDs, answer
+    key, snapshots, rendered result pages and their ETags) key their
+    entries on it, so a single bump retires stale data in every worker
+    process, including after changes made by CLI commands. The stored
+    version is re-read at most every ``ttl`` seconds.
+
+    Attributes:
+        ttl (float): Seconds a version read from the database is trusted.
+    """
+
+    def __init__(self, ttl=2):
+        self.ttl = ttl
+        self._version = None
+        self._base = 0
+        # Until the bank first changes, the process start time serves as
+        # a conservative Last-Modified for bank-derived pages
+        self._changed_at = time()
+        self._checked_at = None
+        self._lock = Lock()
+
+    def configure(self, ttl):
+        """Apply a new TTL and re-read the version on next use."""
+        with self._lock:
+            self.ttl = ttl
+            if self._version is not None:
+                # An earlier app (and database) ran in this process; keep
+                # versions from repeating so its cached data is not reused
+                self._base = self._version + 1
+            self._checked_at = None
+
+    def current(self, fresh=False):
+        """
+        Returns the current question bank version.
+
+        Args:
+            fresh (bool): Read the stored version even if the one read
+                          last is still within its TTL.
+
+        Returns:
+            int: A counter that changes every time the bank is modified.
+        """
+        checked_at = self._checked_at
+        if fresh or checked_at is None or monotonic() - checked_at >= self.ttl:
+            self._load()
+        return self._version
+
+    def changed_at(self):
+        """
+        Returns when the question bank last changed.
+
+        Returns:
+            float: A Unix timestamp; the process start time if the bank
+                   has never changed.
+        """
+        self.current()
+        return self._changed_at
+
+    def bump(self):
+        """
+        Increments the stored version and commits the session.
+
+        The commit covers everything pending in the caller's session, so
+        callers commit (or roll back) their own changes first. The first
+        bump creates the row; on SQLite and PostgreSQL this is a single
+        upsert, so concurrent first bumps cannot collide on it.
+        """
+        table = CacheVersion.__table__
+        now = time()
+        statement = _bump_statement(db.session.get_bind().dialect.name, now)
+        if statement is not None:
+            db.session.execute(statement)
+        else:
+            bumped = db.session.execute(
+                db.update(table).where(table.c.name == BANK_VERSION)
+                .values(version=table.c.version + 1, changed_at=now)
+            ).rowcount
+            if not bumped:
+                db.session.execute(db.insert(table).values(
+                    name=BANK_VERSION, version=1, changed_at=now))
+        db.session.commit()
+        self._load()
+
+    def _load(self):
+        table = CacheVersion.__table__
+        row = db.session.execute(
+            db.select(table.c.version, table.c.changed_at).where(
+                table.c.name == BANK_VERSION)).first()
+        with self._lock:
+            if row is None:
+                self._version = self._base
+            else:
+                self._version = self._base + row[0]
+                self._changed_at = row[1]
+            self._checked_at = monotonic()
+
+
+bank_version = BankVersion()
+
+
+def invalidate_question_cache():
+    """
+    Drops the cached question ID array and bumps the bank version.
+
+    Must be called after any change to the question bank (add, edit or
+    delete) has been committed, so the next quiz start, in this and every
+    other process, reloads the ID set. Commits the session, including
+    anything else still pending in it.
+    """
+    global _question_ids
+    with _question_ids_lock:
+        _question_ids = None
+    bank_version.bump()
+
+
+def get_bank_version(fresh=False):
+    """
+    Returns the current question bank version.
+
+    Args:
+        fresh (bool): Skip the TTL and read the stored version.
+
+    Returns:
+        int: A counter that changes every time the bank is modified.
+    """
+    return bank_version.current(fresh)
+
+
+def get_bank_changed_at():
+    """
+    Returns when the question bank last changed.
+
+    Returns:
+        float: A Unix timestamp; the process start time if the bank has
+               not changed since.
+    """
+    return bank_version.changed_at()
+
+
+def get_question_ids():
+    """
+    Returns the cached array of all question IDs, loading it if needed.
+
+    Only the primary key column is selected, so no ORM objects are
+    built while filling the cache. The array is reloaded once the bank
+    version changes.
+
+    Returns:
+        array: A typed array of question IDs.
+    """
+    global _question_ids
+    version = get_bank_version()
+    cached = _question_ids
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _question_ids_lock:
+        if _question_ids is None or _question_ids[0] != version:
+            rows = QuizQuestion.query.with_entities(QuizQuestion.id)
+            _question_ids = (version, array('q', (row[0] for row in rows)))
+        return _question_ids[1]
+
+
+def get_random_question_ids(num_questions=20):
+    """
+    Draws a random subset of question IDs from the cached ID array.
+
+    Args:
+        num_questions (int): The number of IDs to draw. Defaults to 20.
+
+    Returns:
+        list: The randomly selected question IDs, without duplicates.
+    """
+    ids = get_question_ids()
+    return random.sample(ids, min(num_questions, len(ids)))
+
 
 def get_random_questions(num_questions=20):
     """
     Fetches a random subset of quiz questions from the database.
 
+    Question IDs are drawn from the cached ID array and only the chosen
+    rows are loaded, with a single ``IN`` query.
+
     Args:
         num_questions (int): The number of questions to retrieve.
         Defaults to 20.
@@ -13,9 +228,15 @@ def get_random_questions(num_questions=20):
     Returns:
         list: A list of randomly selected QuizQuestion objects.
     """
-    # Fetch all questions from the database
-    questions = QuizQuestion.query.all()
-
-    # Select a random sample of questions, limited by the smaller of
+    # Select a random sample of IDs, limited by the smaller of
     # num_questions or total questions
-    return random.sample(questions, min(num_questions, len(questions)))
+    chosen_ids = get_random_question_ids(num_questions)
+    if not chosen_ids:
+        return []
+
+    # Fetch only the chosen rows and keep them in the sampled order
+    questions = QuizQuestion.query.filter(
+        QuizQuestion.id.in_(chosen_ids)).all()
+    questions_by_id = {question.id: question for question in questions}
+    return [questions_by_id[question_id] for question_id in chosen_ids
+            if question_id in questions_by_id]
@@ -0,0 +1,481 @@
+from app import db
+from app.models import QuizAnswer, QuizQuestion, QuizResult
+from app.services.leaderboard_service import apply_score_changes, leaderboard
+from app.services.quiz_service import invalidate_question_cache
+from app.services.result_archive import archive_lock, result_archive
+from app.services.stats_service import adjust_correct_counts
+from collections import deque
+from itertools import count
+from threading import Lock, Thread
+from time import time
+
+# NumPy is optional (batches are then graded in plain Python) and slow to
+# import, so it is loaded along with the first answer key
+np = None
+_numpy_loaded = False
+
+
+def _load_numpy():
+    """Returns NumPy, imported on first use, or None if it is missing."""
+    global np, _numpy_loaded
+    if not _numpy_loaded:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        _numpy_loaded = True
+    return np
+
+
+# Answer identifiers as small integer codes; 0 stands for unanswered (or,
+# in the answer key, for a question that no longer exists)
+ANSWER_CODES = {'A': 1, 'B': 2, 'C': 3, 'D': 4}
+# The same codes for the chosen options stored in archive segments
+ARCHIVED_CODES = {chosen.encode(): code
+                  for chosen, code in ANSWER_CODES.items()}
+
+
+def _code(column):
+    """SQL expression mapping an answer identifier column to its code."""
+    return db.case(ANSWER_CODES, value=column, else_=0)
+
+
+def load_answer_key(question_ids=None):
+    """
+    Returns the answer key as an array of codes indexed by question ID.
+
+    Args:
+        question_ids (list): Only load these questions; None loads all.
+
+    Returns:
+        The key as a NumPy ``uint8`` array, or a ``bytearray`` without
+        NumPy. IDs beyond its end, and deleted questions, map to 0 and
+        their answers are left as they were graded.
+    """
+    query = db.select(QuizQuestion.id, _code(QuizQuestion.correct_answer))
+    if question_ids is not None:
+        query = query.where(QuizQuestion.id.in_(question_ids))
+    rows = db.session.execute(query).all()
+    size = max((question_id for question_id, _ in rows), default=0) + 1
+
+    if _load_numpy() is None:
+        key = bytearray(size)
+        for question_id, code in rows:
+            key[question_id] = code
+        return key
+    key = np.zeros(size, dtype=np.uint8)
+    if rows:
+        question_ids, codes = np.array(rows, dtype=np.int64).T
+        key[question_ids] = codes
+    return key
+
+
+def grade_batch(rows, key):
+    """
+    Regrades a batch of stored answers against an answer key.
+
+    With NumPy the batch is graded as one matrix of (chosen, correct)
+    codes instead of row by row. Answers to questions missing from the
+    key (deleted since) keep their stored grade, so deleting a question
+    never rescores the history that answered it.
+
+    Args:
+        rows (list): (answer ID, result ID, question ID, chosen code,
+                     stored is_correct) rows.
+        key: The answer key from ``load_answer_key``.
+
+    Returns:
+        tuple: The answers whose grade changed as (answer ID, question
+               ID, new is_correct) tuples, and a dict mapping each result
+               ID to the change in its number of correct answers.
+    """
+    if np is None:
+        changed = []
+        deltas = {}
+        for answer_id, result_id, question_id, chosen, stored in rows:
+            if question_id >= len(key) or not key[question_id]:
+                continue
+            correct = bool(chosen) and key[question_id] == chosen
+            if correct != bool(stored):
+                changed.append((answer_id, question_id, correct))
+                deltas[result_id] = (deltas.get(result_id, 0)
+                                     + (1 if correct else -1))
+        return changed, deltas
+
+    # Row objects are converted much faster once turned into tuples
+    matrix = np.array([tuple(row) for row in rows],
+                      dtype=np.int64).reshape(-1, 5)
+    answer_ids, result_ids, question_ids, chosen, stored = matrix.T
+    known = question_ids < key.size
+    correct_codes = np.zeros(len(matrix), dtype=np.int64)
+    correct_codes[known] = key[question_ids[known]]
+    correct = (chosen != 0) & (chosen == correct_codes)
+    changed = (correct != stored.astype(bool)) & (correct_codes != 0)
+
+    results, positions = np.unique(result_ids[changed], return_inverse=True)
+    deltas = np.bincount(positions, weights=np.where(correct[changed], 1, -1),
+                         minlength=results.size).astype(np.int64)
+    return (list(zip(answer_ids[changed].tolist(),
+                     question_ids[changed].tolist(),
+                     correct[changed].tolist())),
+            dict(zip(results.tolist(), deltas.tolist())))
+
+
+def _write_batch(changed, deltas):
+    """
+    Writes a batch of regraded answers with everything derived from them.
+
+    Updates the answers, the question statistics, the scores of the
+    affected results and their leaderboard rollups.
+
+    Returns:
+        int: The number of results whose score changed.
+    """
+    answers = QuizAnswer.__table__
+    db.session.execute(
+        db.update(answers).where(answers.c.id == db.bindparam('answer_id'))
+        .values(is_correct=db.bindparam('correct')),
+        [{'answer_id': answer_id, 'correct': correct}
+         for answer_id, _, correct in changed])
+
+    correct_counts = {}
+    for _, question_id, correct in changed:
+        correct_counts[question_id] = (correct_counts.get(question_id, 0)
+                                       + (1 if correct else -1))
+    adjust_correct_counts(correct_counts)
+
+    deltas = {result_id: delta for result_id, delta in deltas.items()
+              if delta}
+    if not deltas:
+        return 0
+    results = QuizResult.__table__
+    rows = db.session.execute(
+        db.select(results.c.id, results.c.user_id, results.c.timestamp,
+                  results.c.total_questions, results.c.score).where(
+            results.c.id.in_(deltas))).all()
+    db.session.execute(
+        db.update(results).where(results.c.id == db.bindparam('result_id'))
+        .values(score=db.bindparam('new_score')),
+        [{'result_id': result_id, 'new_score': score + deltas[result_id]}
+         for result_id, _, _, _, score in rows])
+    apply_score_changes([
+        (user_id, timestamp, total_questions, score,
+         score + deltas[result_id])
+        for result_id, user_id, timestamp, total_questions, score in rows])
+    return len(rows)
+
+
+def _regrade_segment(segment, key, question_ids, batch_size):
+    """
+    Regrades the answers of one archive segment.
+
+    Returns:
+        tuple: The answers checked, the changed answers as (answer
+               position, question ID, new is_correct) tuples, and a dict
+               mapping each result position to the change in its score.
+    """
+    positions = {}
+    checked = 0
+    changed = []
+    deltas = {}
+    rows = []
+
+    def grade():
+        batch_changed, batch_deltas = grade_batch(rows, key)
+        changed.extend(batch_changed)
+        for result_id, delta in batch_deltas.items():
+            deltas[result_id] = deltas.get(result_id, 0) + delta
+        rows.clear()
+
+    for position, result in enumerate(segment.results()):
+        positions[result.id] = position
+        answers = segment.answers(result.answer_start, result.answer_count)
+        for offset, (question_id, chosen, correct) in enumerate(answers):
+            if question_ids is None or question_id in question_ids:
+                rows.append((result.answer_start + offset, result.id,
+                             question_id, ARCHIVED_CODES.get(chosen, 0),
+                             int(correct)))
+        if len(rows) >= batch_size:
+            checked += len(rows)
+            grade()
+    if rows:
+        checked += len(rows)
+        grade()
+    return checked, changed, {positions[result_id]: delta
+                              for result_id, delta in deltas.items() if delta}
+
+
+def _regrade_archive(key, question_ids, batch_size, progress):
+    """
+    Regrades the results moved to the archive, segment by segment.
+
+    A segment with changed answers is replaced by a regraded copy, and
+    then the question statistics and leaderboard rollups are adjusted in
+    one transaction. Should a run stop between the two, the rollups are
+    corrected by ``rebuild-question-stats`` and ``rebuild-leaderboard``,
+    which read the archive.
+
+    Args:
+        progress (callable): Called with the number of answers checked
+                             after each segment.
+
+    Returns:
+        tuple: The number of answers checked, answers changed and results
+               whose score changed.
+    """
+    checked = answers_changed = results_changed = 0
+    if not result_archive.segments():
+        return checked, answers_changed, results_changed
+    if question_ids is not None:
+        question_ids = set(question_ids)
+
+    with archive_lock(result_archive.directory):
+        for segment in result_archive.segments():
+            segment_checked, changed, deltas = _regrade_segment(
+                segment, key, question_ids, batch_size)
+            checked += segment_checked
+            if changed:
+                results = {position: segment.result(position)
+                           for position in deltas}
+                segment.regraded(
+                    {position: correct for position, _, correct in changed},
+                    {position: result.score + deltas[position]
+                     for position, result in results.items()})
+
+                correct_counts = {}
+                for _, question_id, correct in changed:
+                    correct_counts[question_id] = (
+                        correct_counts.get(question_id, 0)
+                        + (1 if correct else -1))
+                adjust_correct_counts(correct_counts)
+                apply_score_changes([
+                    (result.user_id, result.timestamp,
+                     result.total_questions, result.score,
+                     result.score + deltas[position])
+                    for position, result in results.items()])
+                db.session.commit()
+                answers_changed += len(changed)
+                results_changed += len(results)
+            progress(checked, results_changed)
+    return checked, answers_changed, results_changed
+
+
+def regrade_results(question_ids=None, batch_size=5000, progress=None):
+    """
+    Regrades the stored quiz results against the current answer key.
+
+    With ``question_ids`` only the answers to those questions are read;
+    without, every stored answer is. Batches are graded as arrays, and
+    only the answers whose grade flipped are written, together with the
+    question statistics, scores and leaderboard rollups they affect, in
+    one transaction per batch. The job can therefore be interrupted and
+    re-run. Results moved to the archive are regraded next, one segment
+    at a time (see ``_regrade_archive``), so they agree with the rebuilt
+    statistics and leaderboards that count them. Afterwards the bank
+    version is bumped so cached result pages and their ETags are retired.
+
+    Results from before the answer table existed are skipped; run
+    ``backfill-answers`` first.
+
+    Args:
+        question_ids (iterable): The questions whose answer key changed,
+                                 or None to regrade everything.
+        batch_size (int): The number of answers read per batch.
+        progress (callable): Optional callback receiving the number of
+                             answers checked, the number of answers to
+                             check and the number of results changed.
+                             Archived answers are added to the number to
+                             check as their segments are read.
+
+    Returns:
+        tuple: The number of answers checked, answers changed and results
+               whose score changed.
+    """
+    answers = QuizAnswer.__table__
+    columns = (answers.c.id, answers.c.result_id, answers.c.question_id,
+               _code(answers.c.chosen), answers.c.is_correct)
+    if question_ids is not None:
+        question_ids = sorted({int(question_id)
+                               for question_id in question_ids})
+        scopes = [answers.c.question_id == question_id
+                  for question_id in question_ids]
+        total = db.session.execute(
+            db.select(db.func.count()).select_from(answers).where(
+                answers.c.question_id.in_(question_ids))).scalar()
+    else:
+        scopes = [db.true()]
+        total = db.session.execute(
+            db.select(db.func.count()).select_from(answers)).scalar()
+    key = load_answer_key(question_ids)
+    checked = answers_changed = results_changed = 0
+
+    # Walk each question's answers (or all answers) in ID order
+    for scope in scopes:
+        last_id = 0
+        while True:
+            rows = db.session.execute(
+                db.select(*columns).where(scope, answers.c.id > last_id)
+                .order_by(answers.c.id).limit(batch_size)).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            changed, deltas = grade_batch(rows, key)
+            if changed:
+                results_changed += _write_batch(changed, deltas)
+                db.session.commit()
+            checked += len(rows)
+            answers_changed += len(changed)
+            if progress:
+                progress(checked, total, results_changed)
+
+    def report_archive(archive_checked, archive_results_changed):
+        if progress:
+            progress(checked + archive_checked, total + archive_checked,
+                     results_changed + archive_results_changed)
+
+    archived = _regrade_archive(key, question_ids, batch_size,
+                                report_archive)
+    checked += archived[0]
+    answers_changed += archived[1]
+    results_changed += archived[2]
+
+    if answers_changed:
+        leaderboard.clear()
+        # Everything above is committed; this commits the session again
+        invalidate_question_cache()
+    return checked, answers_changed, results_changed
+
+
+class RegradeJob:
+    """A regrade run by the background regrader.
+
+    Attributes:
+        id (int): The job number, unique within the process.
+        question_ids (list): The questions to regrade, or None for all.
+        state (str): 'queued', 'running', 'done' or 'failed'.
+        checked (int): The number of answers checked so far.
+        total (int): The number of answers to check, once known.
+        results_changed (int): The number of results rescored so far.
+        answers_changed (int): The number of answers regraded, once done.
+        queued_at (float): When the job was queued (Unix time).
+        started_at (float): When the job started, or None.
+        finished_at (float): When the job finished, or None.
+        error (str): The error that stopped a failed job.
+    """
+
+    def __init__(self, job_id, question_ids):
+        self.id = job_id
+        self.question_ids = question_ids
+        self.state = 'queued'
+        self.checked = self.total = 0
+        self.results_changed = self.answers_changed = 0
+        self.queued_at = time()
+        self.started_at = self.finished_at = None
+        self.error = None
+
+    @property
+    def active(self):
+        """Whether the job is queued or running."""
+        return self.state in ('queued', 'running')
+
+    @property
+    def percent(self):
+        """The share of answers checked, from 0 to 100."""
+        if self.state == 'done':
+            return 100
+        return int(100 * self.checked / self.total) if self.total else 0
+
+    def report(self, checked, total, results_changed):
+        """Progress callback for ``regrade_results``."""
+        self.checked = checked
+        self.total = total
+        self.results_changed = results_changed
+
+
+class Regrader:
+    """Runs regrade jobs one at a time on a background thread.
+
+    Jobs queued while another one runs are merged, so a burst of answer
+    key edits is regraded in one pass. Jobs only run (and are only
+    listed) in the process that queued them.
+
+    Attributes:
+        batch_size (int): The batch size passed to ``regrade_results``.
+    """
+
+    def __init__(self, batch_size=5000, history=20):
+        self.batch_size = batch_size
+        self._jobs = deque(maxlen=history)
+        self._queue = deque()
+        self._numbers = count(1)
+        self._thread = None
+        self._lock = Lock()
+
+    def configure(self, batch_size):
+        """Apply a new batch size to the jobs started from now on."""
+        self.batch_size = batch_size
+
+    def submit(self, app, question_ids=None):
+        """
+        Queues a regrade and starts the worker thread if it is idle.
+
+        Args:
+            app (Flask): The application whose database is regraded.
+            question_ids (iterable): The questions whose answer key
+                                     changed, or None to regrade all.
+
+        Returns:
+            RegradeJob: The queued job, possibly one queued earlier that
+                        the request was merged into.
+        """
+        if question_ids is not None:
+            question_ids = sorted({int(question_id)
+                                   for question_id in question_ids})
+        with self._lock:
+            job = self._queue[-1] if self._queue else None
+            if job is not None:
+                if job.question_ids is not None:
+                    job.question_ids = (
+                        None if question_ids is None
+                        else sorted(set(job.question_ids) | set(question_ids)))
+            else:
+                job = RegradeJob(next(self._numbers), question_ids)
+                self._queue.append(job)
+                self._jobs.append(job)
+            if self._thread is None:
+                self._thread = Thread(target=self._work, args=(app,),
+                                      name='regrader', daemon=True)
+                self._thread.start()
+        return job
+
+    def jobs(self):
+        """Return the recent jobs, newest first."""
+        with self._lock:
+            return list(reversed(self._jobs))
+
+    def _work(self, app):
+        while True:
+            with self._lock:
+                if not self._queue:
+                    self._thread = None
+                    return
+                job = self._queue.popleft()
+                job.state = 'running'
+                job.started_at = time()
+
+            with app.app_context():
+                try:
+                    job.checked, job.answers_changed, job.results_changed = \
+                        regrade_results(job.question_ids, self.batch_size,
+                                        job.report)
+                    job.state = 'done'
+                except Exception as error:
+                    db.session.rollback()
+                    app.logger.exception('Regrade job %d failed.', job.id)
+                    job.error = str(error)
+                    job.state = 'failed'
+            job.finished_at = time()
+
+
+regrader = Regrader()
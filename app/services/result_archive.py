@@ -0,0 +1,508 @@
+from app import db
+from app.models import QuizAnswer, QuizResult
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from heapq import merge
+from itertools import islice
+from threading import Lock
+import mmap
+import os
+import re
+import struct
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; archive runs are then not locked
+    fcntl = None
+
+SEGMENT_NAME = 'results-{:06d}.seg'
+SEGMENT_PATTERN = re.compile(r'results-(\d{6})\.seg$')
+LOCK_NAME = 'archive.lock'
+MAGIC = b'QZARCH01'
+# Magic, result, answer and user counts, lowest and highest result ID
+HEADER = struct.Struct('<8sQQQqq')
+# ID, user ID, timestamp (microseconds since the epoch), score, total
+# questions, position of the first answer, answer count
+RESULT = struct.Struct('<qqqiiQI4x')
+# Question ID, chosen option (a zero byte if unanswered), correctness
+ANSWER = struct.Struct('<ic?')
+# Offsets of the fields a regrade rewrites
+RESULT_SCORE = struct.Struct('<i')
+RESULT_SCORE_OFFSET = 24
+ANSWER_CORRECT_OFFSET = 5
+# User ID, position of the user's first result, result count
+USER = struct.Struct('<qQQ')
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+NO_ANSWER = b'\0'
+# Stays below the bound-parameter limit of SQLite
+DELETE_BATCH_SIZE = 5000
+
+ArchivedResult = namedtuple('ArchivedResult', [
+    'id', 'user_id', 'score', 'timestamp', 'total_questions', 'segment',
+    'answer_start', 'answer_count'])
+
+
+def _to_micros(moment):
+    return (moment - EPOCH) // ONE_MICROSECOND
+
+
+class ArchiveSegment:
+    """One archive segment file, memory-mapped read-only.
+
+    A segment holds a header, the result records sorted by user and
+    newest first within each user, the answer records of those results
+    in quiz order, and an index of the users (sorted by user ID) with the
+    position of their first result and their result count. Every record
+    has a fixed width, so each one is read straight from its offset and
+    only the pages actually touched are loaded from disk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as stream:
+            self.inode = os.fstat(stream.fileno()).st_ino
+            self._map = mmap.mmap(stream.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        (magic, self.result_count, self.answer_count, self.user_count,
+         self.min_id, self.max_id) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a result archive segment.')
+        self._results = HEADER.size
+        self._answers = self._results + self.result_count * RESULT.size
+        self._users = self._answers + self.answer_count * ANSWER.size
+
+    def find_user(self, user_id):
+        """
+        Looks a user up in the segment's user index.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            tuple: The position of the user's first result and the number
+                   of their results; (0, 0) if the segment has none.
+        """
+        low, high = 0, self.user_count
+        while low < high:
+            middle = (low + high) // 2
+            found, first, count = USER.unpack_from(
+                self._map, self._users + middle * USER.size)
+            if found < user_id:
+                low = middle + 1
+            elif found > user_id:
+                high = middle
+            else:
+                return first, count
+        return 0, 0
+
+    def result(self, position):
+        """Reads the result record at a position."""
+        (result_id, user_id, micros, score, total_questions, answer_start,
+         answer_count) = RESULT.unpack_from(
+            self._map, self._results + position * RESULT.size)
+        return ArchivedResult(result_id, user_id, score,
+                              EPOCH + timedelta(microseconds=micros),
+                              total_questions, self, answer_start,
+                              answer_count)
+
+    def user_results(self, user_id, before=None):
+        """
+        Yields the results of a user, newest first.
+
+        Args:
+            user_id (int): The ID of the user.
+            before (tuple): Only yield results older than this
+                            (timestamp, result ID) position.
+        """
+        first, count = self.find_user(user_id)
+        end = first + count
+        if before is not None:
+            # Skip the results at or after the position by binary search
+            key = (_to_micros(before[0]), before[1])
+            low, high = first, end
+            while low < high:
+                middle = (low + high) // 2
+                result_id, _, micros = struct.unpack_from(
+                    '<qqq', self._map, self._results + middle * RESULT.size)
+                if (micros, result_id) >= key:
+                    low = middle + 1
+                else:
+                    high = middle
+            first = low
+        for position in range(first, end):
+            yield self.result(position)
+
+    def answers(self, start, count):
+        """Reads ``count`` answer records from a position, in quiz order."""
+        offset = self._answers + start * ANSWER.size
+        return list(ANSWER.iter_unpack(
+            self._map[offset:offset + count * ANSWER.size]))
+
+    def results(self):
+        """Yields every result of the segment, in file order."""
+        for position in range(self.result_count):
+            yield self.result(position)
+
+    def regraded(self, correctness, scores):
+        """
+        Replaces the segment file with a copy holding regraded answers.
+
+        The copy is installed like a new segment, so readers that still
+        have the old file mapped keep reading it unchanged.
+
+        Args:
+            correctness (dict): A mapping of answer position to its new
+                                grade.
+            scores (dict): A mapping of result position to its new score.
+        """
+        data = bytearray(self._map)
+        for position, correct in correctness.items():
+            data[self._answers + position * ANSWER.size
+                 + ANSWER_CORRECT_OFFSET] = bool(correct)
+        for position, score in scores.items():
+            RESULT_SCORE.pack_into(data, self._results + position * RESULT.size
+                                   + RESULT_SCORE_OFFSET, score)
+        _install(self.path, data)
+
+    def result_ids(self):
+        """Returns the IDs of the results in the segment."""
+        return [struct.unpack_from('<q', self._map,
+                                   self._results + position * RESULT.size)[0]
+                for position in range(self.result_count)]
+
+
+class ResultArchive:
+    """Read access to the archived quiz results of every segment.
+
+    Segments are opened (and memory-mapped) once per process and picked
+    up as the archive job adds them, which is noticed by the change of
+    the directory's modification time. They are never modified in place;
+    a regrade installs a new file under the same name, which is then
+    opened again. Readers therefore need no locking beyond the list of
+    segments itself.
+
+    Attributes:
+        directory (str): The directory holding the segment files.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._segments = []
+        self._stamp = None
+        self._lock = Lock()
+
+    def configure(self, directory):
+        """Point the archive at a directory and forget opened segments."""
+        with self._lock:
+            self.directory = directory
+            self._segments = []
+            self._stamp = None
+
+    def segments(self):
+        """
+        Returns the segments of the archive, oldest first.
+
+        Returns:
+            list: The ArchiveSegment objects; empty if there is no archive.
+        """
+        try:
+            stamp = os.stat(self.directory).st_mtime_ns
+        except (FileNotFoundError, TypeError):
+            return []
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    opened = {(segment.path, segment.inode): segment
+                              for segment in self._segments}
+                    self._segments = [
+                        opened.get((path, os.stat(path).st_ino))
+                        or ArchiveSegment(path)
+                        for path in _segment_paths(self.directory)]
+                    self._stamp = stamp
+        return self._segments
+
+    def get(self, user_id, result_id):
+        """
+        Looks up an archived result of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            result_id (int): The ID of the result.
+
+        Returns:
+            ArchivedResult: The result, or None if it is not archived.
+        """
+        for segment in self.segments():
+            if segment.min_id <= result_id <= segment.max_id:
+                for result in segment.user_results(user_id):
+                    if result.id == result_id:
+                        return result
+        return None
+
+    def latest(self, user_id):
+        """
+        Returns the ID and timestamp of a user's newest archived result.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            tuple: The result ID and timestamp, or None if the user has no
+                   archived results.
+        """
+        newest = None
+        for segment in self.segments():
+            result = next(segment.user_results(user_id), None)
+            if result and (newest is None or (result.timestamp, result.id)
+                           > (newest.timestamp, newest.id)):
+                newest = result
+        return (newest.id, newest.timestamp) if newest else None
+
+    def page(self, user_id, before=None, limit=20):
+        """
+        Returns archived results of a user, newest first.
+
+        Args:
+            user_id (int): The ID of the user.
+            before (tuple): Only return results older than this
+                            (timestamp, result ID) position.
+            limit (int): The maximum number of results.
+
+        Returns:
+            list: The ArchivedResult objects.
+        """
+        streams = [segment.user_results(user_id, before)
+                   for segment in self.segments()]
+        return list(islice(merge(*streams, key=_position, reverse=True),
+                           limit))
+
+    def answers(self, result):
+        """
+        Reads the answers of an archived result.
+
+        Args:
+            result (ArchivedResult): The result to read.
+
+        Returns:
+            tuple: The list of question IDs in quiz order and a dict
+                   mapping each question ID (as a string) to the chosen
+                   answer, or 'None' if unanswered.
+        """
+        rows = result.segment.answers(result.answer_start,
+                                      result.answer_count)
+        return ([question_id for question_id, _, _ in rows],
+                {str(question_id): _decode_chosen(chosen)
+                 for question_id, chosen, _ in rows})
+
+    def results(self, user_ids=None):
+        """
+        Yields every archived result, optionally of some users only.
+
+        Args:
+            user_ids (iterable): Only yield the results of these users.
+        """
+        for segment in self.segments():
+            if user_ids is None:
+                yield from segment.results()
+            else:
+                for user_id in user_ids:
+                    yield from segment.user_results(user_id)
+
+    def submissions(self):
+        """
+        Yields the answers of every archived result.
+
+        Yields:
+            tuple: (user_answers, correctness) pairs, as taken by
+                   ``stats_service.record_submissions``.
+        """
+        for result in self.results():
+            rows = result.segment.answers(result.answer_start,
+                                          result.answer_count)
+            yield ({question_id: _decode_chosen(chosen)
+                    for question_id, chosen, _ in rows},
+                   {question_id: correct
+                    for question_id, _, correct in rows})
+
+
+def _position(result):
+    return result.timestamp, result.id
+
+
+def _decode_chosen(chosen):
+    return 'None' if chosen == NO_ANSWER else chosen.decode()
+
+
+def _segment_paths(directory):
+    return sorted(os.path.join(directory, name)
+                  for name in os.listdir(directory)
+                  if SEGMENT_PATTERN.match(name))
+
+
+@contextmanager
+def archive_lock(directory):
+    """Holds the lock of an archive directory, which serialises archive
+    runs and regrades."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_NAME), 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        yield
+
+
+def _install(path, *chunks):
+    """
+    Writes a segment file under a temporary name, flushes it to disk and
+    only then renames it, so a segment is either complete or absent.
+    """
+    with open(path + '.part', 'wb') as stream:
+        for chunk in chunks:
+            stream.write(chunk)
+        stream.flush()
+        os.fsync(stream.fileno())
+    os.replace(path + '.part', path)
+    if hasattr(os, 'O_DIRECTORY'):
+        # Make the rename durable before the database is changed
+        fd = os.open(os.path.dirname(path), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _write_segment(directory, results, answers):
+    """
+    Writes a batch of results with their answers as a new segment.
+
+    Args:
+        directory (str): The archive directory.
+        results (list): (id, user_id, timestamp, score, total_questions)
+                        rows.
+        answers (dict): A mapping of result ID to its (question_id,
+                        chosen, is_correct) rows in quiz order.
+
+    Returns:
+        str: The path of the new segment.
+    """
+    results = sorted(results, key=lambda row: (row[1], -_to_micros(row[2]),
+                                               -row[0]))
+    result_records = bytearray()
+    answer_records = bytearray()
+    users = []
+    answer_count = 0
+    for position, (result_id, user_id, timestamp, score,
+                   total_questions) in enumerate(results):
+        if not users or users[-1][0] != user_id:
+            users.append([user_id, position, 0])
+        users[-1][2] += 1
+        rows = answers.get(result_id, ())
+        result_records += RESULT.pack(result_id, user_id,
+                                      _to_micros(timestamp), score,
+                                      total_questions or 0, answer_count,
+                                      len(rows))
+        for question_id, chosen, is_correct in rows:
+            answer_records += ANSWER.pack(
+                question_id, chosen.encode() if chosen else NO_ANSWER,
+                bool(is_correct))
+        answer_count += len(rows)
+
+    paths = _segment_paths(directory)
+    number = int(SEGMENT_PATTERN.search(paths[-1]).group(1)) + 1 \
+        if paths else 1
+    path = os.path.join(directory, SEGMENT_NAME.format(number))
+    ids = [row[0] for row in results]
+    _install(path,
+             HEADER.pack(MAGIC, len(results), answer_count, len(users),
+                         min(ids), max(ids)),
+             result_records, answer_records,
+             b''.join(USER.pack(*user) for user in users))
+    return path
+
+
+def _delete_results(result_ids):
+    """Deletes results and their answers from the tables."""
+    for start in range(0, len(result_ids), DELETE_BATCH_SIZE):
+        batch = result_ids[start:start + DELETE_BATCH_SIZE]
+        db.session.execute(db.delete(QuizAnswer).where(
+            QuizAnswer.result_id.in_(batch)))
+        db.session.execute(db.delete(QuizResult).where(
+            QuizResult.id.in_(batch)))
+
+
+def archive_results(directory, older_than, segment_size=100_000,
+                    progress=None):
+    """
+    Moves quiz results older than a given age into archive segments.
+
+    Results are read in primary-key batches of ``segment_size``; each
+    batch is written to a new segment and then deleted from the tables
+    in one transaction. If a run stops between the two, the next run
+    deletes the rows of the last segment first. Question statistics and
+    leaderboard rollups are left as they are, since archived results
+    still count. Results without answer rows (run ``backfill-answers``
+    first) and the newest result, which keeps SQLite from handing out
+    archived IDs again, stay in the table.
+
+    Args:
+        directory (str): The archive directory.
+        older_than (float): Archive results taken more than this many
+                            days ago.
+        segment_size (int): The maximum number of results per segment.
+        progress (callable): Optional callback receiving the number of
+                             results and answers archived so far.
+
+    Returns:
+        tuple: The total number of results and answers archived.
+    """
+    with archive_lock(directory):
+        paths = _segment_paths(directory)
+        if paths:
+            _delete_results(ArchiveSegment(paths[-1]).result_ids())
+            db.session.commit()
+
+        cutoff = (datetime.now(timezone.utc).replace(tzinfo=None)
+                  - timedelta(days=older_than))
+        newest = db.session.scalar(db.select(db.func.max(QuizResult.id)))
+        has_answers = db.select(QuizAnswer.id).where(
+            QuizAnswer.result_id == QuizResult.id).exists()
+        last_id = 0
+        results_archived = answers_archived = 0
+        while newest is not None:
+            batch = db.session.execute(
+                db.select(QuizResult.id, QuizResult.user_id,
+                          QuizResult.timestamp, QuizResult.score,
+                          QuizResult.total_questions).where(
+                    QuizResult.timestamp < cutoff, QuizResult.id > last_id,
+                    QuizResult.id < newest, has_answers)
+                .order_by(QuizResult.id).limit(segment_size)).all()
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            result_ids = [row[0] for row in batch]
+
+            answers = {}
+            for start in range(0, len(result_ids), DELETE_BATCH_SIZE):
+                rows = db.session.execute(
+                    db.select(QuizAnswer.result_id, QuizAnswer.question_id,
+                              QuizAnswer.chosen, QuizAnswer.is_correct)
+                    .where(QuizAnswer.result_id.in_(
+                        result_ids[start:start + DELETE_BATCH_SIZE]))
+                    .order_by(QuizAnswer.result_id, QuizAnswer.id))
+                for result_id, question_id, chosen, is_correct in rows:
+                    answers.setdefault(result_id, []).append(
+                        (question_id, chosen, is_correct))
+
+            _write_segment(directory, batch, answers)
+            _delete_results(result_ids)
+            db.session.commit()
+
+            results_archived += len(batch)
+            answers_archived += sum(len(rows) for rows in answers.values())
+            if progress:
+                progress(results_archived, answers_archived)
+    return results_archived, answers_archived
+
+
+result_archive = ResultArchive()
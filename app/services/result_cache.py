@@ -0,0 +1,128 @@
+from app.services.quiz_service import get_bank_changed_at, get_bank_version
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock
+
+
+def result_etag(*parts):
+    """
+    Returns an ETag value for a view of quiz results.
+
+    The tag combines the given parts with the question bank version, so
+    it changes whenever questions (and therefore answer texts or the
+    answer key) change, or past results are regraded. The version is
+    shared by all worker processes, so their tags are interchangeable.
+
+    Args:
+        *parts: Values identifying the view, e.g. the user and result IDs.
+
+    Returns:
+        str: The unquoted ETag value.
+    """
+    return '-'.join(str(part) for part in
+                    (get_bank_version(), *parts))
+
+
+def result_last_modified(timestamp):
+    """
+    Returns the Last-Modified time of a view of quiz results.
+
+    Args:
+        timestamp (datetime): When the newest result shown was saved
+                              (naive UTC, as stored).
+
+    Returns:
+        datetime: The later of that time and the last bank change.
+    """
+    saved_at = timestamp.replace(tzinfo=timezone.utc).timestamp()
+    return datetime.fromtimestamp(
+        max(saved_at, get_bank_changed_at()), timezone.utc).replace(
+        microsecond=0)
+
+
+class FragmentCache:
+    """LRU cache of rendered HTML fragments, bounded by count and size.
+
+    Each entry records the question bank version it was rendered under;
+    entries from an older version are treated as misses.
+
+    Attributes:
+        max_entries (int): The maximum number of cached fragments.
+        max_bytes (int): The maximum total size of the cached fragments.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that had to render.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    def configure(self, max_entries, max_bytes):
+        """Resize the cache, dropping all entries."""
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._entries.clear()
+            self._size = 0
+
+    def get(self, key):
+        """Return the cached (fragment, metadata) pair for a key, or None."""
+        version = get_bank_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+            return None
+
+    def put(self, key, fragment, metadata=None):
+        """
+        Store a rendered fragment, evicting the least recently used ones.
+
+        Fragments larger than a quarter of ``max_bytes`` are not cached.
+
+        Args:
+            key (hashable): The cache key.
+            fragment (str): The rendered HTML.
+            metadata: Any extra value returned with the fragment.
+        """
+        size = len(fragment)
+        if self.max_entries <= 0 or size > self.max_bytes // 4:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old[1])
+            self._entries[key] = (get_bank_version(), fragment, metadata)
+            self._size += size
+            while (len(self._entries) > self.max_entries
+                   or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[1])
+
+    def clear(self):
+        """Drop all cached fragments."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Return the cache counters.
+
+        Returns:
+            dict: The hit and miss counts, the number of entries and their
+                  total size in characters.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._entries), 'bytes': self._size}
+
+
+result_fragments = FragmentCache()
@@ -0,0 +1,271 @@
+from app import db
+from app.models import QuizAnswer, QuizResult
+from app.services.grading_service import get_answer_key
+from app.services.result_archive import ArchivedResult, result_archive
+from datetime import datetime
+from heapq import merge
+from itertools import islice
+import json
+
+
+def _decode(value):
+    """Decodes a legacy JSON column that may hold a JSON-encoded string."""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+def answer_rows(result_id, user_answers, correctness):
+    """
+    Builds the ``quiz_answer`` rows of a quiz result.
+
+    Args:
+        result_id (int): The ID of the result the answers belong to.
+        user_answers (dict): A mapping of question ID to the selected
+                             answer identifier, or 'None' if unanswered.
+        correctness (dict): A mapping of question ID to whether it was
+                            answered correctly.
+
+    Returns:
+        list: One dict of column values per answer.
+    """
+    return [
+        {
+            'result_id': result_id,
+            'question_id': int(question_id),
+            'chosen': None if answer in (None, 'None') else answer,
+            'is_correct': bool(correctness.get(question_id)),
+        }
+        for question_id, answer in user_answers.items()
+    ]
+
+
+def save_answers(result, user_answers, correctness):
+    """
+    Bulk-inserts the per-question answers of a quiz result.
+
+    The result must already have an ID (i.e. have been flushed). The
+    caller is responsible for committing the session.
+
+    Args:
+        result (QuizResult): The result the answers belong to.
+        user_answers (dict): A mapping of question ID to the selected
+                             answer identifier, or 'None' if unanswered.
+        correctness (dict): A mapping of question ID to whether it was
+                            answered correctly.
+    """
+    rows = answer_rows(result.id, user_answers, correctness)
+    if rows:
+        db.session.execute(db.insert(QuizAnswer), rows)
+
+
+def get_result_answers(result):
+    """
+    Returns the answers of a quiz result in question order.
+
+    Reads the normalized ``quiz_answer`` rows, falling back to the legacy
+    JSON columns for results that have not been backfilled yet, or the
+    archive segment of an archived result.
+
+    Args:
+        result (QuizResult): The result to read, or an ArchivedResult.
+
+    Returns:
+        tuple: The list of question IDs in quiz order and a dict mapping
+               each question ID (as a string) to the chosen answer, or
+               'None' if unanswered.
+    """
+    if isinstance(result, ArchivedResult):
+        return result_archive.answers(result)
+
+    rows = db.session.query(QuizAnswer.question_id, QuizAnswer.chosen).filter(
+        QuizAnswer.result_id == result.id).order_by(QuizAnswer.id).all()
+    if rows:
+        question_ids = [question_id for question_id, _ in rows]
+        user_answers = {str(question_id): chosen or 'None'
+                        for question_id, chosen in rows}
+        return question_ids, user_answers
+
+    user_answers = {str(question_id): answer for question_id, answer
+                    in _decode(result.user_answers).items()}
+    return _decode(result.question_ids), user_answers
+
+
+def get_latest_result(user_id):
+    """
+    Returns the most recent quiz result of a user.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        QuizResult: The latest result, or None if the user has none.
+    """
+    return QuizResult.query.filter_by(user_id=user_id).order_by(
+        QuizResult.timestamp.desc(), QuizResult.id.desc()).first()
+
+
+def get_user_result(user_id, result_id):
+    """
+    Returns a result of a user, whether still stored or archived.
+
+    Args:
+        user_id (int): The ID of the user.
+        result_id (int): The ID of the result.
+
+    Returns:
+        QuizResult: The result (an ArchivedResult if it was archived), or
+                    None if the user has no result with that ID.
+    """
+    return QuizResult.query.filter_by(id=result_id, user_id=user_id).first() \
+        or result_archive.get(user_id, result_id)
+
+
+def get_latest_result_stamp(user_id):
+    """
+    Returns the ID and timestamp of a user's most recent quiz result.
+
+    Reads only the ``(user_id, timestamp)`` index and the primary key, so
+    it is cheap enough to run before deciding whether a cached page is
+    still current. The newest archived result is looked up as well,
+    since results left in the table are not always newer.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        tuple: The result ID and timestamp, or None if the user has none.
+    """
+    latest = db.session.query(QuizResult.id, QuizResult.timestamp).filter(
+        QuizResult.user_id == user_id).order_by(
+        QuizResult.timestamp.desc(), QuizResult.id.desc()).first()
+    archived = result_archive.latest(user_id)
+    if latest is None or archived is not None and (
+            (archived[1], archived[0]) > (latest[1], latest[0])):
+        return archived
+    return latest
+
+
+def encode_cursor(result):
+    """Encodes the position of a result as a results history cursor."""
+    return f'{result.timestamp.isoformat()}_{result.id}'
+
+
+def decode_cursor(cursor):
+    """
+    Decodes a results history cursor.
+
+    Args:
+        cursor (str): A cursor produced by ``encode_cursor``.
+
+    Returns:
+        tuple: The timestamp and ID of the last result shown, or None if
+               the cursor is missing or malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        timestamp, result_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(timestamp), int(result_id)
+    except ValueError:
+        return None
+
+
+def get_results_page(user_id, cursor=None, per_page=20):
+    """
+    Returns one page of a user's results history, newest first.
+
+    Pages are addressed by keyset (the timestamp and ID of the last row
+    shown) rather than by offset, so every page is a short range scan of
+    the ``(user_id, timestamp)`` index no matter how many attempts the
+    user has. Archived results are read from the same position in the
+    archive and merged in by (timestamp, ID), since results left in the
+    table (e.g. without answer rows) can be older than archived ones.
+
+    Args:
+        user_id (int): The ID of the user.
+        cursor (str): The cursor of the previous page, or None for the
+                      first page.
+        per_page (int): The maximum number of results per page.
+
+    Returns:
+        tuple: The list of QuizResult (and ArchivedResult) objects and the
+               cursor of the next page, or None if this is the last page.
+    """
+    query = QuizResult.query.filter_by(user_id=user_id)
+    position = decode_cursor(cursor)
+    if position:
+        query = query.filter(db.tuple_(QuizResult.timestamp, QuizResult.id)
+                             < db.tuple_(*position))
+
+    # Fetch one extra row to find out whether there is a next page
+    results = query.order_by(QuizResult.timestamp.desc(),
+                             QuizResult.id.desc()).limit(per_page + 1).all()
+    archived = result_archive.page(user_id, position, per_page + 1)
+    if archived:
+        results = list(islice(merge(results, archived,
+                                    key=lambda result: (result.timestamp,
+                                                        result.id),
+                                    reverse=True), per_page + 1))
+    if len(results) > per_page:
+        results = results[:per_page]
+        return results, encode_cursor(results[-1])
+    return results, None
+
+
+def backfill_answers(batch_size=1000, progress=None):
+    """
+    Copies the legacy JSON answers of existing results into ``quiz_answer``.
+
+    Results are streamed in primary-key order, ``batch_size`` at a time,
+    and each batch is committed on its own so the job can be interrupted
+    and resumed. Results that already have answer rows are skipped.
+
+    Args:
+        batch_size (int): The number of results to process per batch.
+        progress (callable): Optional callback receiving the number of
+                             results and answers written so far.
+
+    Returns:
+        tuple: The total number of results and answers written.
+    """
+    has_answers = db.session.query(QuizAnswer.id).filter(
+        QuizAnswer.result_id == QuizResult.id).exists()
+    last_id = 0
+    results_written = answers_written = 0
+
+    while True:
+        batch = db.session.query(
+            QuizResult.id, QuizResult.user_answers).filter(
+            QuizResult.id > last_id, ~has_answers).order_by(
+            QuizResult.id).limit(batch_size).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        decoded = [(result_id, _decode(answers))
+                   for result_id, answers in batch]
+        answer_key = get_answer_key({int(question_id)
+                                     for _, answers in decoded
+                                     for question_id in answers},
+                                    fresh=True)
+        rows = [
+            {
+                'result_id': result_id,
+                'question_id': int(question_id),
+                'chosen': None if answer in (None, 'None') else answer,
+                'is_correct': answer == answer_key.get(int(question_id)),
+            }
+            for result_id, answers in decoded
+            for question_id, answer in answers.items()
+        ]
+        if rows:
+            db.session.execute(db.insert(QuizAnswer), rows)
+        db.session.commit()
+
+        results_written += len(batch)
+        answers_written += len(rows)
+        if progress:
+            progress(results_written, answers_written)
+
+    return results_written, answers_written
@@ -0,0 +1,172 @@
+from app import db
+from app.models import QuizQuestion
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+
+# External-content FTS5 index over the question and its four answers.
+# Triggers keep it in sync with quiz_question on every insert, update
+# and delete, whichever code path changes the bank.
+FTS_TABLE = 'quiz_question_fts'
+FTS_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        question_text, answer_a, answer_b, answer_c, answer_d,
+        content='quiz_question', content_rowid='id')""",
+    f"""CREATE TRIGGER IF NOT EXISTS quiz_question_fts_ai
+        AFTER INSERT ON quiz_question BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, question_text, answer_a,
+                                     answer_b, answer_c, answer_d)
+            VALUES (new.id, new.question_text, new.answer_a,
+                    new.answer_b, new.answer_c, new.answer_d);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS quiz_question_fts_ad
+        AFTER DELETE ON quiz_question BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, question_text,
+                                     answer_a, answer_b, answer_c, answer_d)
+            VALUES ('delete', old.id, old.question_text, old.answer_a,
+                    old.answer_b, old.answer_c, old.answer_d);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS quiz_question_fts_au
+        AFTER UPDATE ON quiz_question BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, question_text,
+                                     answer_a, answer_b, answer_c, answer_d)
+            VALUES ('delete', old.id, old.question_text, old.answer_a,
+                    old.answer_b, old.answer_c, old.answer_d);
+            INSERT INTO {FTS_TABLE} (rowid, question_text, answer_a,
+                                     answer_b, answer_c, answer_d)
+            VALUES (new.id, new.question_text, new.answer_a,
+                    new.answer_b, new.answer_c, new.answer_d);
+        END""",
+]
+
+
+def init_search_index(app):
+    """
+    Creates the FTS5 search index if the database supports it.
+
+    On SQLite builds with FTS5 the virtual table and its sync triggers are
+    created (and filled from the existing bank) when missing. Other
+    databases, or SQLite builds without FTS5, fall back to ``LIKE``
+    search.
+
+    Args:
+        app (Flask): The application whose database should be indexed.
+    """
+    app.extensions['question_search_fts'] = False
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            return
+        try:
+            with db.engine.begin() as connection:
+                tables = set(connection.exec_driver_sql(
+                    "SELECT name FROM sqlite_master WHERE name IN "
+                    "('quiz_question', ?)", (FTS_TABLE,)).scalars())
+                if 'quiz_question' not in tables:
+                    return  # Schema not created yet
+                for statement in FTS_SCHEMA:
+                    connection.exec_driver_sql(statement)
+                if FTS_TABLE not in tables:
+                    connection.exec_driver_sql(
+                        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) "
+                        "VALUES ('rebuild')")
+        except OperationalError:
+            app.logger.warning('FTS5 unavailable; using LIKE search.')
+            return
+    app.extensions['question_search_fts'] = True
+
+
+def _has_search_index():
+    """
+    Whether the FTS5 index can be used, looked up on the first search.
+
+    Unless ``DB_AUTO_CREATE`` set it up at startup, the index comes from
+    the migrations; the lookup only reads from it and never changes the
+    schema on a request.
+    """
+    if 'question_search_fts' not in current_app.extensions:
+        found = False
+        if db.engine.dialect.name == 'sqlite':
+            try:
+                with db.engine.connect() as connection:
+                    connection.exec_driver_sql(
+                        f"SELECT rowid FROM {FTS_TABLE} LIMIT 0")
+                found = True
+            except OperationalError:
+                current_app.logger.warning(
+                    'No FTS5 search index (run `flask db upgrade`); '
+                    'using LIKE search.')
+        current_app.extensions['question_search_fts'] = found
+    return current_app.extensions['question_search_fts']
+
+
+def _fts_query(text):
+    """Turns free text into an FTS5 query of quoted prefix terms."""
+    terms = ['"{}"*'.format(term.replace('"', '""')) for term in text.split()]
+    return ' '.join(terms)
+
+
+def _page(query, after, per_page):
+    """Applies an ID keyset to a question query and splits off the cursor."""
+    if after:
+        query = query.filter(QuizQuestion.id > after)
+    questions = query.order_by(QuizQuestion.id).limit(per_page + 1).all()
+    if len(questions) > per_page:
+        questions = questions[:per_page]
+        return questions, questions[-1].id
+    return questions, None
+
+
+def list_questions(after=None, per_page=50):
+    """
+    Returns one page of the question bank in ID order.
+
+    Args:
+        after (int): The last question ID of the previous page, or None
+                     for the first page.
+        per_page (int): The maximum number of questions per page.
+
+    Returns:
+        tuple: The list of QuizQuestion objects and the cursor (last ID)
+               of the next page, or None if this is the last page.
+    """
+    return _page(QuizQuestion.query, after, per_page)
+
+
+def search_questions(text, after=None, per_page=50):
+    """
+    Returns one page of questions matching a full-text search.
+
+    Every word in ``text`` must appear, as a word prefix, in the question
+    or one of its answers. Uses the FTS5 index when available and a
+    ``LIKE`` scan otherwise.
+
+    Args:
+        text (str): The search text.
+        after (int): The last question ID of the previous page, or None
+                     for the first page.
+        per_page (int): The maximum number of questions per page.
+
+    Returns:
+        tuple: The list of matching QuizQuestion objects and the cursor
+               of the next page, or None if this is the last page.
+    """
+    if not text.split():
+        return list_questions(after, per_page)
+
+    if _has_search_index():
+        ids = db.session.execute(db.text(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query "
+            "AND rowid > :after ORDER BY rowid LIMIT :limit"),
+            {'query': _fts_query(text), 'after': after or 0,
+             'limit': per_page + 1}).scalars().all()
+        questions = QuizQuestion.query.filter(QuizQuestion.id.in_(ids))
+        return _page(questions, None, per_page)
+
+    query = QuizQuestion.query
+    columns = (QuizQuestion.question_text, QuizQuestion.answer_a,
+               QuizQuestion.answer_b, QuizQuestion.answer_c,
+               QuizQuestion.answer_d)
+    for term in text.lower().split():
+        query = query.filter(db.or_(*(
+            db.func.lower(column).contains(term, autoescape=True)
+            for column in columns)))
+    return _page(query, after, per_page)
@@ -0,0 +1,116 @@
+from app.models import QuizQuestion
+from app.services.quiz_service import get_bank_version
+from collections import namedtuple
+from threading import Lock
+
+# Upper bound on cached snapshots; the cache is simply reset when it
+# would grow past this size.
+SNAPSHOT_CACHE_SIZE = 50_000
+
+Option = namedtuple('Option', ['id', 'text'])
+
+
+class QuestionSnapshot:
+    """Immutable, read-only copy of a quiz question for rendering.
+
+    The answer options and the correct answer text are computed once
+    when the snapshot is built, instead of on every attribute access as
+    with the ``QuizQuestion`` properties.
+
+    Attributes:
+        id (int): The ID of the question.
+        question_text (str): The text of the question.
+        options (tuple): The answer options as (id, text) pairs.
+        correct_answer (str): The correct answer identifier.
+        correct_answer_text (str): The text of the correct answer.
+    """
+    __slots__ = ('id', 'question_text', 'options', 'correct_answer',
+                 'correct_answer_text', '_option_texts')
+
+    def __init__(self, question):
+        options = (Option('A', question.answer_a),
+                   Option('B', question.answer_b),
+                   Option('C', question.answer_c),
+                   Option('D', question.answer_d))
+        option_texts = dict(options)
+        values = {
+            'id': question.id,
+            'question_text': question.question_text,
+            'options': options,
+            'correct_answer': question.correct_answer,
+            'correct_answer_text': option_texts.get(question.correct_answer,
+                                                    'Unknown'),
+            '_option_texts': option_texts,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('QuestionSnapshot is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('QuestionSnapshot is immutable')
+
+    def user_answer_text(self, user_answer):
+        """Returns the text of the user's answer.
+
+        Args:
+            user_answer (str): The user's selected answer identifier.
+
+        Returns:
+            str: The text of the user's answer or
+                 'No answer provided' if not found.
+        """
+        return self._option_texts.get(user_answer, 'No answer provided')
+
+
+# Snapshot cache: question ID -> QuestionSnapshot, tied to the question
+# bank version it was filled under.
+_snapshots = {}
+_snapshots_version = None
+_snapshots_lock = Lock()
+
+
+def get_snapshots(question_ids):
+    """
+    Returns snapshots of the given questions, in the given order.
+
+    Cached snapshots are reused as long as the question bank version has
+    not changed; any missing questions are loaded with a single ``IN``
+    query.
+
+    Args:
+        question_ids (iterable): The IDs of the questions.
+
+    Returns:
+        list: QuestionSnapshot objects; questions that no longer exist are
+              left out.
+    """
+    global _snapshots, _snapshots_version
+    question_ids = [int(question_id) for question_id in question_ids]
+    version = get_bank_version()
+
+    with _snapshots_lock:
+        if _snapshots_version != version:
+            _snapshots = {}
+            _snapshots_version = version
+        cache = _snapshots
+
+    snapshots = {question_id: cache[question_id]
+                 for question_id in question_ids if question_id in cache}
+    missing_ids = [question_id for question_id in question_ids
+                   if question_id not in snapshots]
+    if missing_ids:
+        loaded = {question.id: QuestionSnapshot(question)
+                  for question in QuizQuestion.query.filter(
+                      QuizQuestion.id.in_(missing_ids))}
+        with _snapshots_lock:
+            # Only publish snapshots if the bank did not change meanwhile
+            if _snapshots_version == version:
+                if len(_snapshots) + len(loaded) > SNAPSHOT_CACHE_SIZE:
+                    _snapshots = {}
+                _snapshots.update(loaded)
+        snapshots.update(loaded)
+
+    return [snapshots[question_id] for question_id in question_ids
+            if question_id in snapshots]
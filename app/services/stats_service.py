@@ -0,0 +1,202 @@
+from app import db
+from app.models import QuestionStats, QuizAnswer, QuizQuestion
+from app.services.result_archive import result_archive
+
+OPTION_COLUMNS = {'A': 'count_a', 'B': 'count_b', 'C': 'count_c',
+                  'D': 'count_d'}
+
+
+def _upsert_statement(dialect_name):
+    """Builds an incrementing upsert for dialects with ON CONFLICT."""
+    if dialect_name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+
+    table = QuestionStats.__table__
+    statement = insert(table)
+    excluded = statement.excluded
+    counters = ['times_served', 'times_correct', *OPTION_COLUMNS.values()]
+    updates = {name: table.c[name] + excluded[name] for name in counters}
+    updates['correct_rate'] = (
+        (table.c.times_correct + excluded.times_correct) * 1.0
+        / (table.c.times_served + excluded.times_served))
+    return statement.on_conflict_do_update(index_elements=['question_id'],
+                                           set_=updates)
+
+
+def record_submission(user_answers, correctness):
+    """
+    Adds one quiz submission to the per-question statistics.
+
+    Runs in the caller's session, so the stats are committed (or rolled
+    back) together with the quiz result.
+
+    Args:
+        user_answers (dict): A mapping of question ID to the selected
+                             answer identifier, or 'None' if unanswered.
+        correctness (dict): A mapping of question ID to whether it was
+                            answered correctly.
+    """
+    record_submissions([(user_answers, correctness)])
+
+
+def record_submissions(submissions):
+    """
+    Adds a batch of quiz submissions to the per-question statistics.
+
+    The counts are summed per question first, so every question is
+    written once per batch however many submissions served it.
+
+    Args:
+        submissions (iterable): (user_answers, correctness) pairs, as
+                                taken by ``record_submission``.
+    """
+    totals = {}
+    for user_answers, correctness in submissions:
+        for question_id, answer in user_answers.items():
+            row = totals.get(int(question_id))
+            if row is None:
+                row = totals[int(question_id)] = {
+                    'question_id': int(question_id), 'times_served': 0,
+                    'times_correct': 0,
+                    **dict.fromkeys(OPTION_COLUMNS.values(), 0)}
+            row['times_served'] += 1
+            row['times_correct'] += int(bool(correctness.get(question_id)))
+            if answer in OPTION_COLUMNS:
+                row[OPTION_COLUMNS[answer]] += 1
+    rows = list(totals.values())
+    if not rows:
+        return
+    for row in rows:
+        row['correct_rate'] = row['times_correct'] / row['times_served']
+
+    upsert = _upsert_statement(db.session.get_bind().dialect.name)
+    if upsert is not None:
+        db.session.execute(upsert, rows)
+        return
+
+    # Portable fallback: update the existing rows, insert the new ones
+    table = QuestionStats.__table__
+    existing = set(db.session.execute(
+        db.select(table.c.question_id).where(table.c.question_id.in_(
+            [row['question_id'] for row in rows]))).scalars())
+    new_rows = [row for row in rows if row['question_id'] not in existing]
+    updated_rows = [{**row, 'id': row['question_id']} for row in rows
+                    if row['question_id'] in existing]
+    if new_rows:
+        db.session.execute(db.insert(table), new_rows)
+    if updated_rows:
+        counters = ['times_served', 'times_correct', *OPTION_COLUMNS.values()]
+        values = {name: table.c[name] + db.bindparam(name)
+                  for name in counters}
+        values['correct_rate'] = (
+            (table.c.times_correct + db.bindparam('times_correct')) * 1.0
+            / (table.c.times_served + db.bindparam('times_served')))
+        db.session.execute(
+            db.update(table).where(
+                table.c.question_id == db.bindparam('id')).values(values),
+            updated_rows)
+
+
+def adjust_correct_counts(changes):
+    """
+    Applies regraded answers to the per-question statistics.
+
+    Runs in the caller's session, so the stats are committed together
+    with the regraded answers.
+
+    Args:
+        changes (dict): A mapping of question ID to the change in its
+                        number of correct answers.
+    """
+    rows = [{'stats_id': question_id, 'delta': delta}
+            for question_id, delta in changes.items() if delta]
+    if not rows:
+        return
+    table = QuestionStats.__table__
+    delta = db.bindparam('delta')
+    db.session.execute(
+        db.update(table).where(
+            table.c.question_id == db.bindparam('stats_id')).values(
+            times_correct=table.c.times_correct + delta,
+            correct_rate=((table.c.times_correct + delta) * 1.0
+                          / table.c.times_served)),
+        rows)
+
+
+def rebuild_question_stats():
+    """
+    Recomputes all question statistics from the stored quiz answers.
+
+    Replaces the contents of ``question_stats`` with one aggregate query
+    over ``quiz_answer`` and adds the answers of archived results. Run
+    ``backfill-answers`` first so results from before the answer table
+    existed are included.
+
+    Returns:
+        int: The number of questions with statistics.
+    """
+    served = db.func.count(QuizAnswer.id)
+    correct = db.func.sum(db.case((QuizAnswer.is_correct, 1), else_=0))
+    option_counts = [
+        db.func.sum(db.case((QuizAnswer.chosen == option, 1), else_=0))
+        for option in OPTION_COLUMNS]
+    aggregate = db.select(
+        QuizAnswer.question_id, served, correct, *option_counts,
+        correct * 1.0 / served).group_by(QuizAnswer.question_id)
+
+    db.session.execute(db.delete(QuestionStats))
+    db.session.execute(db.insert(QuestionStats).from_select(
+        ['question_id', 'times_served', 'times_correct',
+         *OPTION_COLUMNS.values(), 'correct_rate'], aggregate))
+    record_submissions(result_archive.submissions())
+    db.session.commit()
+    return db.session.query(QuestionStats).count()
+
+
+def get_question_stats_page(hardest_first=True, cursor=None, per_page=50):
+    """
+    Returns one page of question statistics sorted by difficulty.
+
+    Reads straight from the ``correct_rate`` index; pages are addressed
+    by a (correct_rate, question_id) keyset cursor.
+
+    Args:
+        hardest_first (bool): Sort by ascending correct rate if True,
+                              descending otherwise.
+        cursor (str): The cursor of the previous page, or None for the
+                      first page.
+        per_page (int): The maximum number of rows per page.
+
+    Returns:
+        tuple: A list of (QuestionStats, question text) pairs and the
+               cursor of the next page, or None if this is the last page.
+    """
+    query = db.session.query(QuestionStats, QuizQuestion.question_text).join(
+        QuizQuestion, QuizQuestion.id == QuestionStats.question_id)
+    key = db.tuple_(QuestionStats.correct_rate, QuestionStats.question_id)
+
+    if cursor:
+        try:
+            rate, question_id = cursor.rsplit('_', 1)
+            position = db.tuple_(float(rate), int(question_id))
+        except ValueError:
+            position = None
+        if position is not None:
+            query = query.filter(key > position if hardest_first
+                                 else key < position)
+
+    if hardest_first:
+        order = (QuestionStats.correct_rate, QuestionStats.question_id)
+    else:
+        order = (QuestionStats.correct_rate.desc(),
+                 QuestionStats.question_id.desc())
+    rows = query.order_by(*order).limit(per_page + 1).all()
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1][0]
+        return rows, f'{last.correct_rate!r}_{last.question_id}'
+    return rows, None
@@ -0,0 +1,759 @@
+from app import db
+from app.models import IdSequence, QuizAnswer, QuizResult
+from app.services.attempt_service import get_attempt_store
+from app.services.leaderboard_service import leaderboard, record_results
+from app.services.result_archive import result_archive
+from app.services.result_service import answer_rows
+from app.services.stats_service import record_submissions
+from collections import deque
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy.exc import IntegrityError, OperationalError
+from threading import Condition, Lock, Thread
+from time import monotonic, sleep
+import atexit
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows; journals are then used unlocked
+    fcntl = None
+
+JOURNAL_NAME = 'submissions-{}.journal'
+# Submissions that cannot be stored, e.g. because their user was deleted,
+# are set aside here (one JSON object per line) instead of being retried
+DEAD_LETTER_NAME = 'submissions.dead'
+SEQUENCE_NAME = 'quiz_result'
+# A journal holding this many records moves on to a new file once a batch
+# is stored, so it never grows for long under sustained load
+JOURNAL_ROTATE_RECORDS = 10_000
+# Records replayed per transaction; keeps the ID lists of a replay below
+# the bound-parameter limit of SQLite
+REPLAY_BATCH_SIZE = 500
+# Seconds between checks for a result stored by another process
+POLL_INTERVAL = 0.01
+
+
+def _try_lock(fd):
+    """Takes the exclusive lock of a journal; False if a process holds it."""
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    return True
+
+
+class SubmissionJournal:
+    """Append-only file of buffered submissions, one JSON object per line.
+
+    Every process appends to a journal of its own, which it keeps locked
+    (``flock``) while it runs; a journal nobody holds belongs to a process
+    that stopped and can be replayed. Appends are made durable by
+    ``sync``, which shares one fsync between all the threads waiting.
+
+    Attributes:
+        records (int): The number of records appended since the journal
+            was last emptied.
+        unstored (int): The number of records handed to this journal that
+            the writer has not stored yet; kept by ``SubmissionBuffer``.
+    """
+
+    def __init__(self, path, fd):
+        self.path = path
+        self.records = self.unstored = 0
+        self._fd = fd
+        self._append_lock = Lock()
+        self._sync_lock = Lock()
+        self._written = self._synced = 0
+
+    @classmethod
+    def open(cls, path, block=True):
+        """
+        Opens and locks a journal.
+
+        Args:
+            path (str): The journal file, created if missing.
+            block (bool): If False, return None instead of waiting when
+                          another process holds the journal.
+
+        Returns:
+            SubmissionJournal: The journal, or None.
+        """
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        if fcntl is not None:
+            if block:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            elif not _try_lock(fd):
+                os.close(fd)
+                return None
+        return cls(path, fd)
+
+    @classmethod
+    def claim(cls, directory):
+        """Opens the first journal in ``directory`` no process holds."""
+        os.makedirs(directory, exist_ok=True)
+        slot = 0
+        while True:
+            journal = cls.open(os.path.join(directory,
+                                            JOURNAL_NAME.format(slot)),
+                               block=False)
+            if journal is not None:
+                return journal
+            slot += 1
+
+    def read(self):
+        """
+        Returns the submissions in the journal.
+
+        A line torn by a crash in the middle of an append is skipped.
+
+        Returns:
+            list: The submission records, oldest first.
+        """
+        records = []
+        with open(self.path, 'rb') as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                record['at'] = datetime.fromisoformat(record['at'])
+                records.append(record)
+        return records
+
+    def append(self, record):
+        """
+        Appends a submission record.
+
+        Returns:
+            int: The position to pass to ``sync``.
+        """
+        line = json.dumps({**record, 'at': record['at'].isoformat()},
+                          separators=(',', ':')).encode() + b'\n'
+        with self._append_lock:
+            os.write(self._fd, line)
+            self._written += 1
+            self.records += 1
+            return self._written
+
+    def sync(self, position):
+        """Flushes the journal to disk up to (at least) ``position``."""
+        with self._sync_lock:
+            if self._synced >= position:
+                return
+            target = self._written
+            os.fsync(self._fd)
+            self._synced = target
+
+    def truncate(self):
+        """Empties the journal once everything in it is stored."""
+        os.ftruncate(self._fd, 0)
+        self.records = self.unstored = 0
+
+    def close(self):
+        """Closes the journal, releasing its lock."""
+        os.close(self._fd)
+
+
+def _advance_serial(connection, last_id):
+    """Moves the PostgreSQL sequence of ``quiz_result.id`` on to at least
+    ``last_id``, never back."""
+    connection.execute(db.text(
+        "SELECT setval(pg_get_serial_sequence(:table, 'id'), "
+        "GREATEST(:last_id, nextval(pg_get_serial_sequence(:table, 'id'))))"),
+        {'table': QuizResult.__tablename__, 'last_id': last_id})
+
+
+def _reserve_ids(count):
+    """
+    Reserves a block of quiz result IDs.
+
+    Runs in a transaction of its own, so the block stays reserved even if
+    the caller's work is rolled back. The sequence never hands out IDs
+    below those already stored, so it can be turned on for an existing
+    database. On PostgreSQL the ``quiz_result`` serial sequence is moved
+    past the block as well, so rows inserted without the buffer (by a
+    process that has it turned off, or after it is turned off) never take
+    a reserved ID. SQLite numbers such rows after the highest stored ID
+    instead, so there only IDs still buffered can clash with them.
+
+    Args:
+        count (int): The number of IDs to reserve.
+
+    Returns:
+        range: The reserved IDs.
+    """
+    sequence = IdSequence.__table__
+    is_results = sequence.c.name == SEQUENCE_NAME
+    floor = db.select(db.func.coalesce(db.func.max(QuizResult.id), 0)
+                      + 1).scalar_subquery()
+    while True:
+        try:
+            with db.engine.begin() as connection:
+                updated = connection.execute(
+                    db.update(sequence).where(is_results).values(
+                        next_id=db.case(
+                            (sequence.c.next_id > floor, sequence.c.next_id),
+                            else_=floor) + count))
+                if not updated.rowcount:
+                    connection.execute(db.insert(sequence).values(
+                        name=SEQUENCE_NAME, next_id=floor + count))
+                next_id = connection.execute(
+                    db.select(sequence.c.next_id).where(is_results)).scalar()
+                if connection.dialect.name == 'postgresql':
+                    _advance_serial(connection, next_id - 1)
+            return range(next_id - count, next_id)
+        except IntegrityError:  # Another process created the sequence
+            continue
+
+
+def store_submissions(records, skip_stored=False):
+    """
+    Writes a batch of buffered submissions in the caller's session.
+
+    Inserts the results and their answers as multi-row inserts and adds
+    them to the question statistics and leaderboard rollups in one go,
+    then removes their attempts. The caller commits.
+
+    Args:
+        records (list): Submission records made by ``SubmissionBuffer``.
+        skip_stored (bool): Leave out records whose result ID is already
+                            stored, e.g. when replaying a journal.
+
+    Returns:
+        int: The number of results written.
+    """
+    if skip_stored and records:
+        stored = set(db.session.execute(db.select(QuizResult.id).where(
+            QuizResult.id.in_([record['id'] for record in records])))
+            .scalars())
+        records = [record for record in records if record['id'] not in stored]
+    if not records:
+        return 0
+
+    results = []
+    answers = []
+    submissions = []
+    for record in records:
+        user_answers = {question_id: chosen or 'None'
+                        for question_id, chosen, _ in record['answers']}
+        correctness = {question_id: correct
+                       for question_id, _, correct in record['answers']}
+        results.append({
+            'id': record['id'], 'user_id': record['user_id'],
+            'score': record['score'], 'total_questions': record['total'],
+            'timestamp': record['at'],
+            'user_answers': json.dumps(user_answers),
+            'question_ids': json.dumps(list(user_answers))})
+        answers.extend(answer_rows(record['id'], user_answers, correctness))
+        submissions.append((user_answers, correctness))
+
+    db.session.execute(db.insert(QuizResult), results)
+    if answers:
+        db.session.execute(db.insert(QuizAnswer), answers)
+    record_submissions(submissions)
+    record_results([(record['user_id'], record['score'], record['total'],
+                     record['at']) for record in records])
+    get_attempt_store().delete_many(
+        [record['attempt_id'] for record in records])
+    return len(records)
+
+
+def _set_aside(record, directory, error):
+    """Appends a submission that cannot be stored to the dead-letter
+    file."""
+    path = os.path.join(directory, DEAD_LETTER_NAME)
+    with open(path, 'a', encoding='utf-8') as dead_letters:
+        dead_letters.write(json.dumps(
+            {**record, 'at': record['at'].isoformat(), 'error': repr(error)},
+            separators=(',', ':')) + '\n')
+        dead_letters.flush()
+        os.fsync(dead_letters.fileno())
+
+
+def _store_each(records, directory):
+    """
+    Stores submissions one at a time after their batch failed.
+
+    Every record is committed on its own, leaving out those already
+    stored. A record failing with anything but an ``OperationalError`` is
+    logged and set aside in the dead-letter file in ``directory``, so one
+    bad record cannot hold up the others. An ``OperationalError`` (e.g. a
+    locked or unreachable database) is taken as transient and raised.
+
+    Args:
+        records (list): The submission records. Each is taken off the
+                        front once handled, so after an error the list
+                        holds the records still to store.
+        directory (str): The journal directory.
+
+    Returns:
+        int: The number of results stored.
+    """
+    stored = 0
+    while records:
+        record = records[0]
+        try:
+            stored += store_submissions([record], skip_stored=True)
+            db.session.commit()
+        except OperationalError:
+            db.session.rollback()
+            raise
+        except Exception as error:
+            db.session.rollback()
+            current_app.logger.exception(
+                'Buffered quiz result %d cannot be stored; setting it aside '
+                'in %s.', record['id'], DEAD_LETTER_NAME)
+            _set_aside(record, directory, error)
+        del records[0]
+    return stored
+
+
+def replay_journal(journal):
+    """
+    Stores the submissions left in a journal, then empties it.
+
+    Records are stored (and committed) ``REPLAY_BATCH_SIZE`` at a time,
+    leaving out those that reached the database before. A batch that
+    fails for anything but an ``OperationalError`` is stored record by
+    record, setting aside those that cannot be stored.
+
+    Args:
+        journal (SubmissionJournal): A journal held by this process.
+
+    Returns:
+        int: The number of results stored.
+    """
+    records = journal.read()
+    stored = 0
+    for start in range(0, len(records), REPLAY_BATCH_SIZE):
+        batch = records[start:start + REPLAY_BATCH_SIZE]
+        try:
+            stored += store_submissions(batch, skip_stored=True)
+            db.session.commit()
+        except OperationalError:
+            db.session.rollback()
+            raise
+        except Exception:
+            db.session.rollback()
+            stored += _store_each(batch, os.path.dirname(journal.path))
+    if records:
+        leaderboard.clear()
+    journal.truncate()
+    return stored
+
+
+def _is_pending(user_id, result_id):
+    """
+    Whether a result ID was handed out for a buffered submission of a
+    user that is not stored yet, by this or any other process.
+
+    Reads through a connection of its own, so every call sees the latest
+    commits.
+    """
+    sequence = IdSequence.__table__
+    results = QuizResult.__table__
+    with db.engine.connect() as connection:
+        reserved = connection.execute(db.select(sequence.c.next_id).where(
+            sequence.c.name == SEQUENCE_NAME)).scalar()
+        if reserved is None or result_id >= reserved:
+            return False
+        if connection.execute(db.select(results.c.id).where(
+                results.c.id == result_id)).first() is not None:
+            return False
+    return result_archive.get(user_id, result_id) is None
+
+
+def recover_journals(directory):
+    """
+    Stores the submissions left in the journals of stopped processes.
+
+    Journals held by running processes are skipped. Replaying is
+    idempotent: submissions that reached the database before the process
+    stopped are not stored twice.
+
+    Args:
+        directory (str): The journal directory.
+
+    Returns:
+        int: The number of results recovered.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    recovered = 0
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('submissions-') and name.endswith('.journal')):
+            continue
+        journal = SubmissionJournal.open(os.path.join(directory, name),
+                                         block=False)
+        if journal is None:
+            continue
+        try:
+            recovered += replay_journal(journal)
+        finally:
+            journal.close()
+    return recovered
+
+
+class SubmissionBuffer:
+    """Write-behind buffer for graded quiz submissions.
+
+    ``submit`` appends the graded result to this process's journal and
+    returns at once, with the result ID taken from a block reserved in
+    ``id_sequence``; the writer reserves the next block before this one
+    runs out, so submissions rarely wait for the database. The buffer's
+    lock only guards its in-memory state: journal appends, ID
+    reservations and the start-up replay happen outside it. A background
+    writer stores the buffered results every ``interval`` seconds (or as
+    soon as ``flush_size`` are waiting) in one transaction per batch, so a
+    burst of submissions takes a few write transactions instead of one
+    each. Batches failing with an ``OperationalError`` are retried; a
+    submission that cannot be stored at all is set aside in the
+    dead-letter file ``DEAD_LETTER_NAME``. Whatever the writer has not
+    stored when a process dies is replayed from its journal on the next
+    start.
+
+    On SQLite every process writing quiz results must use the buffer
+    while it is enabled, since rows inserted without it could take an ID
+    reserved but not stored yet; on PostgreSQL ``_reserve_ids`` keeps the
+    table's own sequence past every reserved block.
+
+    A journal is emptied once everything in it is stored; under sustained
+    load, where that rarely happens, the writer moves on to a new journal
+    after ``JOURNAL_ROTATE_RECORDS`` records and empties the old one as
+    soon as its last record is stored.
+
+    Attributes:
+        directory (str): Where the journals are kept.
+        interval (float): Seconds the writer waits for a batch to fill.
+        flush_size (int): The maximum number of results per batch.
+        id_block (int): The number of result IDs reserved at a time.
+        fsync (bool): Whether ``submit`` waits for the journal to reach
+            the disk.
+        wait_timeout (float): Seconds ``wait`` blocks at most.
+    """
+
+    def __init__(self, app, directory, interval=0.005, flush_size=500,
+                 id_block=1000, fsync=True, wait_timeout=2.0):
+        self.directory = directory
+        self.interval = interval
+        self.flush_size = flush_size
+        self.id_block = id_block
+        self.fsync = fsync
+        self.wait_timeout = wait_timeout
+        self._app = app
+        self._lock = Lock()
+        self._has_work = Condition(self._lock)
+        self._stored = Condition(self._lock)
+        self._pending = []          # Records the writer has not taken yet
+        self._attempts = {}         # Attempt ID -> (record, journal), until
+                                    # stored
+        self._users = {}            # User ID -> number of records unstored
+        self._ids = deque()         # Reserved result IDs not handed out
+        self._refill_lock = Lock()  # Held while a block of IDs is reserved
+        self._start_lock = Lock()
+        self._journal = None
+        self._retired = []          # Rotated journals with unstored records
+        self._thread = None
+        self._pid = None
+        self._closing = False
+
+    def submit(self, attempt, user, score, user_answers, correctness):
+        """
+        Buffers a graded attempt.
+
+        Submitting an attempt again before it is stored returns the
+        result buffered the first time.
+
+        Args:
+            attempt (Attempt): The attempt being submitted.
+            user (CachedUser): The user who took the quiz.
+            score (int): The number of correct answers.
+            user_answers (dict): A mapping of question ID to the selected
+                                 answer identifier, or 'None'.
+            correctness (dict): A mapping of question ID to whether it was
+                                answered correctly.
+
+        Returns:
+            QuizResult: The result, not attached to any session; it can be
+                        read back once ``wait`` returns.
+        """
+        self._start()
+        new_record = {
+            'id': None, 'user_id': user.id, 'attempt_id': attempt.id,
+            'score': score, 'total': len(attempt.question_ids),
+            'answers': [[question_id,
+                         None if user_answers[question_id] == 'None'
+                         else user_answers[question_id],
+                         bool(correctness.get(question_id))]
+                        for question_id in attempt.question_ids],
+            'at': datetime.now(timezone.utc).replace(tzinfo=None,
+                                                     microsecond=0)}
+        journal = None
+        while True:
+            with self._lock:
+                record, _ = self._attempts.get(attempt.id, (None, None))
+                if record is not None:
+                    break
+                if self._ids:
+                    record = new_record
+                    record['id'] = self._ids.popleft()
+                    # Counted before the append, so the journal is not
+                    # emptied under it
+                    journal = self._journal
+                    journal.unstored += 1
+                    self._attempts[attempt.id] = (record, journal)
+                    break
+            self._refill()  # The writer fell behind reserving IDs
+
+        if journal is not None:
+            position = journal.append(record)
+            with self._lock:
+                self._pending.append(record)
+                self._users[user.id] = self._users.get(user.id, 0) + 1
+                self._has_work.notify()
+            if self.fsync:
+                journal.sync(position)
+
+        return QuizResult(
+            id=record['id'], user_id=record['user_id'],
+            score=record['score'], total_questions=record['total'],
+            timestamp=record['at'],
+            user_answers=json.dumps({question_id: chosen or 'None'
+                                     for question_id, chosen, _
+                                     in record['answers']}),
+            question_ids=json.dumps(attempt.question_ids))
+
+    def wait(self, user_id, result_id=None, timeout=None):
+        """
+        Waits until the buffered results of a user are stored.
+
+        Only submissions buffered by this process are known here. Pass
+        the ID of a result returned by ``submit`` to also wait for it in
+        the database, in case another worker process buffered it.
+
+        Args:
+            user_id (int): The ID of the user.
+            result_id (int): A result of the user to wait for as well.
+            timeout (float): Seconds to wait at most; defaults to
+                             ``wait_timeout``.
+
+        Returns:
+            bool: False if the timeout expired first.
+        """
+        timeout = self.wait_timeout if timeout is None else timeout
+        deadline = monotonic() + timeout
+        with self._lock:
+            if not self._stored.wait_for(
+                    lambda: not self._users.get(user_id), timeout):
+                return False
+        if result_id is None:
+            return True
+        while _is_pending(user_id, result_id):
+            if monotonic() >= deadline:
+                return False
+            sleep(POLL_INTERVAL)
+        return True
+
+    def close(self):
+        """Stores what is still buffered and stops the writer."""
+        with self._lock:
+            self._closing = True
+            self._has_work.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None and self._pid == os.getpid():
+            thread.join()
+            for journal in (*self._retired, self._journal):
+                journal.close()
+            self._retired = []
+            self._pid = None
+
+    def _refill(self, low=0):
+        """Reserves another block of result IDs if ``low`` or fewer are
+        left."""
+        with self._refill_lock:
+            with self._lock:
+                if len(self._ids) > low:
+                    return
+            block = _reserve_ids(self.id_block)
+            with self._lock:
+                self._ids.extend(block)
+
+    def _start(self):
+        """Claims a journal and starts the writer in a new process."""
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # Fresh state after a fork: the parent's journal, IDs and
+            # writer thread stay with the parent
+            journal = SubmissionJournal.claim(self.directory)
+            replay_journal(journal)
+            ids = _reserve_ids(self.id_block)
+            with self._lock:
+                self._pending, self._attempts, self._users = [], {}, {}
+                self._ids = deque(ids)
+                self._journal = journal
+                self._retired = []
+                self._thread = Thread(target=self._run,
+                                      name='submission-writer', daemon=True)
+                self._pid = os.getpid()
+            self._thread.start()
+
+    def _run(self):
+        with self._app.app_context():
+            while True:
+                with self._lock:
+                    while not self._pending and not self._closing:
+                        self._has_work.wait()
+                    if not self._pending:
+                        return
+                    full = len(self._pending) >= self.flush_size
+                if not full and not self._closing:
+                    sleep(self.interval)    # Let the batch fill up
+                with self._lock:
+                    batch = self._pending[:self.flush_size]
+                    del self._pending[:len(batch)]
+                if not self._write(batch) and self._closing:
+                    return  # Left in the journal for the next start
+                if not self._closing:
+                    self._reserve_ahead()
+
+    def _reserve_ahead(self):
+        """Reserves the next block of IDs once half of this one is used."""
+        try:
+            self._refill(self.id_block // 2)
+        except Exception:
+            self._app.logger.exception('Reserving result IDs failed; '
+                                       'submissions will reserve them.')
+
+    def _write(self, batch):
+        """
+        Stores a batch; returns False if (part of) it was queued for a
+        retry.
+
+        Only an ``OperationalError`` (e.g. a locked or unreachable
+        database) is retried. Any other error is taken as permanent: the
+        batch is then stored record by record and the records that still
+        fail are set aside in the dead-letter file, so they cannot hold up
+        later submissions.
+        """
+        left = list(batch)
+        try:
+            store_submissions(batch)
+            db.session.commit()
+            left = []
+        except OperationalError:
+            db.session.rollback()
+            self._app.logger.exception(
+                'Storing %d buffered submissions failed; retrying.',
+                len(batch))
+        except Exception:
+            db.session.rollback()
+            self._app.logger.exception(
+                'Storing %d buffered submissions failed; storing them one '
+                'by one.', len(batch))
+            try:
+                _store_each(left, self.directory)
+            except OperationalError:
+                self._app.logger.exception(
+                    'Storing %d buffered submissions failed; retrying.',
+                    len(left))
+        finally:
+            db.session.close()
+        done = batch[:len(batch) - len(left)]
+        rotate = self._finish(done) if done else False
+
+        if left:
+            with self._lock:
+                self._pending[:0] = left
+            if not self._closing:
+                sleep(1)
+            return False
+        if rotate:
+            self._rotate()
+        return True
+
+    def _finish(self, records):
+        """
+        Forgets stored (or set aside) records and empties the journals
+        they were all in.
+
+        Returns:
+            bool: Whether the current journal is due to be rotated.
+        """
+        leaderboard.clear()
+        with self._lock:
+            for record in records:
+                _, journal = self._attempts.pop(record['attempt_id'])
+                journal.unstored -= 1
+                left = self._users[record['user_id']] - 1
+                if left:
+                    self._users[record['user_id']] = left
+                else:
+                    del self._users[record['user_id']]
+            # Start every journal whose records are all stored over
+            if not self._journal.unstored:
+                self._journal.truncate()
+            for journal in [journal for journal in self._retired
+                            if not journal.unstored]:
+                journal.truncate()
+                journal.close()
+                self._retired.remove(journal)
+            self._stored.notify_all()
+            return (self._journal.records >= JOURNAL_ROTATE_RECORDS
+                    and fcntl is not None)
+
+    def _rotate(self):
+        """Moves new submissions on to another journal."""
+        try:
+            journal = SubmissionJournal.claim(self.directory)
+            # A journal left by a stopped process is replayed first
+            replay_journal(journal)
+        except Exception:
+            db.session.rollback()
+            self._app.logger.exception('Rotating the submission journal '
+                                       'failed; keeping the current one.')
+            return
+        finally:
+            db.session.close()
+        with self._lock:
+            self._retired.append(self._journal)
+            self._journal = journal
+
+
+def init_submission_buffer(app):
+    """
+    Recovers left-over journals and sets up the buffer if it is enabled.
+
+    Journals are replayed even with the buffer turned off, so turning it
+    off after a crash loses nothing.
+
+    Args:
+        app (Flask): The application to attach the buffer to.
+    """
+    directory = app.config['SUBMISSION_JOURNAL_DIR'] or os.path.join(
+        app.instance_path, 'journal')
+    if os.path.isdir(directory):
+        with app.app_context():
+            recovered = recover_journals(directory)
+        if recovered:
+            app.logger.warning('Recovered %d buffered quiz results.',
+                               recovered)
+
+    if app.config['SUBMISSION_BUFFER_ENABLED']:
+        buffer = SubmissionBuffer(
+            app, directory, app.config['SUBMISSION_FLUSH_INTERVAL'],
+            app.config['SUBMISSION_FLUSH_SIZE'],
+            app.config['SUBMISSION_ID_BLOCK'],
+            app.config['SUBMISSION_JOURNAL_FSYNC'],
+            app.config['SUBMISSION_WAIT_TIMEOUT'])
+        app.extensions['submission_buffer'] = buffer
+        atexit.register(buffer.close)
+
+
+def get_submission_buffer():
+    """Returns the submission buffer, or None if it is turned off."""
+    return current_app.extensions.get('submission_buffer')
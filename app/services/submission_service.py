@@ -0,0 +1,75 @@
+from app import db
+from app.models import QuizResult
+from app.services.attempt_service import get_attempt_store
+from app.services.grading_service import grade_answers
+from app.services.leaderboard_service import leaderboard, record_result
+from app.services.result_service import save_answers
+from app.services.stats_service import record_submission
+from app.services.submission_buffer import get_submission_buffer
+import json
+
+
+def submit_attempt(attempt, user, answers):
+    """
+    Grades a finished attempt and stores its result.
+
+    Saves the result with its per-question answers, updates the question
+    statistics and leaderboard rollups, removes the attempt and commits.
+    With the submission buffer enabled the graded result is buffered
+    instead, and stored in the background shortly after.
+
+    Args:
+        attempt (Attempt): The attempt being submitted.
+        user (CachedUser): The user who took the quiz.
+        answers (dict): A mapping of question ID to the selected answer
+                        identifier; questions missing from it are stored
+                        as unanswered ('None').
+
+    Returns:
+        QuizResult: The stored (or buffered) result.
+    """
+    user_answers = {question_id: answers.get(question_id) or 'None'
+                    for question_id in attempt.question_ids}
+
+    # Calculate the score against the answer key in one lookup
+    score, correctness = grade_answers(user_answers)
+
+    buffer = get_submission_buffer()
+    if buffer is not None:
+        return buffer.submit(attempt, user, score, user_answers, correctness)
+
+    quiz_result = QuizResult(
+        user_id=user.id,
+        score=score,
+        total_questions=len(attempt.question_ids),
+        user_answers=json.dumps(user_answers),
+        question_ids=json.dumps(attempt.question_ids)
+    )
+    db.session.add(quiz_result)
+    db.session.flush()  # Assign the result ID for the answer rows
+    save_answers(quiz_result, user_answers, correctness)
+    record_submission(user_answers, correctness)
+    record_result(user.id, score, len(attempt.question_ids))
+    get_attempt_store().delete(attempt.id)
+    db.session.commit()
+    leaderboard.record(user.id, user.username)
+    return quiz_result
+
+
+def wait_for_submissions(user_id, result_id=None):
+    """
+    Waits until the buffered results of a user are stored.
+
+    Called before reading a user's results back, so a result shows up
+    right after it was submitted. Results buffered by another worker
+    process are only waited for by ID, e.g. the one the submission
+    redirected to. Returns at once when the submission buffer is turned
+    off.
+
+    Args:
+        user_id (int): The ID of the user.
+        result_id (int): A result of the user about to be read, if any.
+    """
+    buffer = get_submission_buffer()
+    if buffer is not None:
+        buffer.wait(user_id, result_id)
@@ -0,0 +1,131 @@
+from app import db
+from app.models import User
+from collections import OrderedDict
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from threading import Lock
+from time import monotonic
+
+
+class CachedUser(UserMixin):
+    """Lightweight, detached snapshot of a User for request handling.
+
+    Attributes:
+        id (int): The primary key of the user.
+        username (str): The username of the user.
+        role (str): The role of the user (either 'user' or 'admin').
+    """
+
+    def __init__(self, id, username, role):
+        self.id = id
+        self.username = username
+        self.role = role
+
+    @property
+    def is_admin(self):
+        """Check if the user has admin privileges."""
+        return self.role == 'admin'
+
+
+class UserCache:
+    """Bounded LRU cache of user snapshots with a per-entry TTL.
+
+    Attributes:
+        maxsize (int): The maximum number of cached users.
+        ttl (float): The number of seconds an entry stays valid.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that went to the database.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def configure(self, maxsize, ttl):
+        """Resize the cache and change the TTL, dropping all entries."""
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            self._entries.clear()
+
+    def get(self, user_id):
+        """Return the snapshot for a user, loading it on a miss.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            CachedUser: The user snapshot, or None if no such user exists.
+        """
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        row = db.session.query(User.id, User.username, User.role).filter(
+            User.id == user_id).first()
+        if row is None:
+            return None
+
+        user = CachedUser(*row)
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, user)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id):
+        """Drop the cached snapshot of a user, if any."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def stats(self):
+        """Return the cache counters.
+
+        Returns:
+            dict: The hit and miss counts and the current number of entries.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'size': len(self._entries)}
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _mark_user_changed(mapper, connection, target):
+    """Remember a user whose role, password or other columns changed.
+
+    Their snapshot is dropped once the change is committed; dropping it
+    at flush time would let a concurrent request cache the old row again
+    before the commit.
+    """
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_users', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    """Drop the snapshots of the users changed by a committed transaction."""
+    for user_id in session.info.pop('changed_users', ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_changed_users(session):
+    """Keep the snapshots of users whose changes were rolled back."""
+    session.info.pop('changed_users', None)
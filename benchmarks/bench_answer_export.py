@@ -0,0 +1,104 @@
+"""Benchmark the analytics export of answered questions.
+
+Fills a throwaway SQLite database with synthetic results (see
+datagen.py), then times the row-at-a-time pull the data team used to
+run (load every QuizResult, decode its ``user_answers`` and
+``question_ids`` JSON and write a CSV row per question) against
+``export_answers`` writing each format whose optional dependency is
+installed. Rows are answered questions.
+
+Usage:
+    python benchmarks/bench_answer_export.py [--results N] [--chunk-size N]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import generate  # noqa: E402
+
+DEFAULT_RESULTS = 200_000
+DEFAULT_CHUNK_SIZE = 2_500
+USERS = 5_000
+QUESTIONS = 2_000
+
+
+def legacy_pull(db, path):
+    """Decode every result's JSON columns one row at a time into a CSV."""
+    from app.models import QuizResult
+
+    rows = 0
+    with open(path, 'w', newline='') as stream:
+        writer = csv.writer(stream)
+        for result in QuizResult.query.yield_per(1000):
+            answers = result.user_answers
+            question_ids = result.question_ids
+            if isinstance(answers, str):
+                answers = json.loads(answers)
+            if isinstance(question_ids, str):
+                question_ids = json.loads(question_ids)
+            for position, question_id in enumerate(question_ids, 1):
+                writer.writerow((result.id, result.user_id,
+                                 result.timestamp.isoformat(), position,
+                                 question_id, answers.get(str(question_id)),
+                                 result.score, result.total_questions))
+                rows += 1
+    db.session.remove()
+    return rows
+
+
+def report(label, rows, elapsed, size=None):
+    size = f'{size / 1024 / 1024:9.1f} MiB' if size is not None else ''
+    print(f'{label:<10} {rows:>12,} rows {rows / elapsed:>12,.0f} rows/s '
+          f'{elapsed:8.2f} s {size}')
+
+
+def run(results, chunk_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+        os.environ['DB_AUTO_CREATE'] = '1'
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+            tmp, 'bench.db')
+        from app import create_app, db
+        from app.services.export_service import (available_formats,
+                                                 export_answers)
+
+        app = create_app()
+        with app.app_context():
+            started = time.perf_counter()
+            generate(db, USERS, QUESTIONS, results, seed=0)
+            print(f'{results:,} results generated in '
+                  f'{time.perf_counter() - started:.1f} s')
+
+            path = os.path.join(tmp, 'legacy.csv')
+            started = time.perf_counter()
+            rows = legacy_pull(db, path)
+            report('legacy', rows, time.perf_counter() - started,
+                   os.path.getsize(path))
+
+            for file_format in available_formats():
+                started = time.perf_counter()
+                path, _, rows = export_answers(
+                    os.path.join(tmp, file_format), file_format,
+                    incremental=False, lag=0, chunk_size=chunk_size)
+                report(file_format, rows, time.perf_counter() - started,
+                       os.path.getsize(path))
+                db.session.remove()
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--results', type=int, default=DEFAULT_RESULTS,
+                        help='synthetic quiz results to generate')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='results read and written at a time by the '
+                             'export')
+    args = parser.parse_args()
+    run(args.results, args.chunk_size)
@@ -0,0 +1,159 @@
+"""Benchmark concurrent quiz submissions with and without engine tuning.
+
+Runs the database work of a quiz submission (result row, answer rows,
+question statistics, leaderboard rollups) from several threads at once,
+each with its own connection, while the same threads also read back
+their latest result as the results page does. The workload runs twice
+against fresh SQLite databases: once with SQLite's defaults (rollback
+journal, synchronous=FULL) as before the engine was tunable, and once
+with the configured pragmas (WAL, synchronous=NORMAL, busy_timeout,
+page cache and mmap).
+
+Usage:
+    python benchmarks/bench_concurrent_submits.py [--threads N] [--submits N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+DEFAULT_THREADS = 8
+DEFAULT_SUBMITS = 100
+QUESTIONS = 2_000
+USERS = 200
+
+
+class UntunedConfig(Config):
+    """SQLite's defaults, as before the engine options were applied."""
+    SQLITE_JOURNAL_MODE = 'DELETE'
+    SQLITE_SYNCHRONOUS = 'FULL'
+    SQLITE_BUSY_TIMEOUT = None
+    SQLITE_CACHE_SIZE = None
+    SQLITE_MMAP_SIZE = None
+    SQLITE_STATEMENT_CACHE = 128
+    PASSWORD_HASH_WORKERS = 0
+    DB_AUTO_CREATE = True
+
+
+class TunedConfig(Config):
+    """The configured engine options and pragmas."""
+    PASSWORD_HASH_WORKERS = 0
+    DB_AUTO_CREATE = True
+
+
+def fill(db):
+    """Insert synthetic users and questions using batched executemany."""
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.executemany(
+            "INSERT INTO user (id, username, password, role) "
+            "VALUES (?, ?, 'x', 'user')",
+            ((i, f'user{i}') for i in range(1, USERS + 1)))
+        cursor.executemany(
+            "INSERT INTO quiz_question (id, question_text, answer_a, "
+            "answer_b, answer_c, answer_d, correct_answer) "
+            "VALUES (?, ?, 'a', 'b', 'c', 'd', 'A')",
+            ((i, f'Question {i}?') for i in range(1, QUESTIONS + 1)))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def worker(app, submits, seed, stats):
+    """Submit ``submits`` quizzes and read each result back."""
+    import json
+    from app import db
+    from app.models import QuizResult
+    from app.services.grading_service import grade_answers
+    from app.services.leaderboard_service import record_result
+    from app.services.result_service import (get_latest_result,
+                                             get_result_answers, save_answers)
+    from app.services.stats_service import record_submission
+
+    rng = random.Random(seed)
+    done = errors = 0
+    with app.app_context():
+        for _ in range(submits):
+            user_id = rng.randint(1, USERS)
+            question_ids = rng.sample(range(1, QUESTIONS + 1), 20)
+            user_answers = {str(question_id): rng.choice('ABCD')
+                            for question_id in question_ids}
+            try:
+                score, correctness = grade_answers(user_answers)
+                result = QuizResult(user_id=user_id, score=score,
+                                    total_questions=len(question_ids),
+                                    user_answers=json.dumps(user_answers),
+                                    question_ids=json.dumps(question_ids))
+                db.session.add(result)
+                db.session.flush()
+                save_answers(result, user_answers, correctness)
+                record_submission(user_answers, correctness)
+                record_result(user_id, score, len(question_ids))
+                db.session.commit()
+                get_result_answers(get_latest_result(user_id))
+                db.session.rollback()
+                done += 1
+            except Exception as error:  # "database is locked" and friends
+                db.session.rollback()
+                errors += 1
+                stats.setdefault('first_error', str(error).splitlines()[0])
+        db.session.remove()
+    with stats['lock']:
+        stats['done'] += done
+        stats['errors'] += errors
+
+
+def run_profile(label, config_class, threads, submits, tmp):
+    from app import create_app, db
+
+    config_class.SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(
+        tmp, f'{label}.db')
+    app = create_app(config_class)
+    with app.app_context():
+        fill(db)
+        db.engine.dispose()
+
+    stats = {'lock': threading.Lock(), 'done': 0, 'errors': 0}
+    pool = [threading.Thread(target=worker, args=(app, submits, seed, stats))
+            for seed in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f'{label:<10} {stats["done"] / elapsed:10.1f} submits/s '
+          f'{stats["done"]:8,} ok {stats["errors"]:6,} failed '
+          f'{elapsed:8.2f} s')
+    if 'first_error' in stats:
+        print(f'{"":<10} first error: {stats["first_error"]}')
+
+
+def run(threads, submits):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config reads DATABASE_URL at import time
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+            tmp, 'unused.db')
+        print(f'{threads} threads x {submits} submits')
+        run_profile('untuned', UntunedConfig, threads, submits, tmp)
+        run_profile('tuned', TunedConfig, threads, submits, tmp)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help='threads submitting at once')
+    parser.add_argument('--submits', type=int, default=DEFAULT_SUBMITS,
+                        help='submissions per thread')
+    args = parser.parse_args()
+    run(args.threads, args.submits)
@@ -0,0 +1,129 @@
+"""Benchmark quiz starts during an exam against regular quiz starts.
+
+Fills a throwaway SQLite database with a question bank and logged-in
+users, then times GET /quiz through the test client from several
+threads at once, like the rush when a scheduled exam opens: first as
+regular starts (random draw, snapshot lookup, full render), then with an
+open exam whose papers were generated beforehand (round-robin lookup and
+a render of the page around the pre-rendered paper). Both include
+storing the attempt.
+
+Usage:
+    python benchmarks/bench_exam_start.py [--threads N] [--starts N]
+        [--papers N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_THREADS = 8
+DEFAULT_STARTS = 200
+DEFAULT_PAPERS = 50
+QUESTIONS = 20_000
+
+
+def fill(db, users):
+    """Insert synthetic users and questions using batched executemany."""
+    from werkzeug.security import generate_password_hash
+
+    password = generate_password_hash('benchmark', method='pbkdf2:sha256:1')
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.executemany(
+            "INSERT INTO user (id, username, password, role) "
+            "VALUES (?, ?, ?, 'user')",
+            ((i, f'user{i}', password) for i in range(1, users + 1)))
+        cursor.executemany(
+            "INSERT INTO quiz_question (id, question_text, answer_a, "
+            "answer_b, answer_c, answer_d, correct_answer) "
+            "VALUES (?, ?, 'Answer A', 'Answer B', 'Answer C', 'Answer D', "
+            "'A')",
+            ((i, f'Question {i}?') for i in range(1, QUESTIONS + 1)))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def worker(client, starts, stats):
+    """Start ``starts`` quizzes one after another."""
+    failed = 0
+    for _ in range(starts):
+        if client.get('/quiz').status_code != 200:
+            failed += 1
+    with stats['lock']:
+        stats['failed'] += failed
+
+
+def timed_starts(label, clients, starts):
+    stats = {'lock': threading.Lock(), 'failed': 0}
+    pool = [threading.Thread(target=worker, args=(client, starts, stats))
+            for client in clients]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    total = len(clients) * starts
+    print(f'{label:<10} {total / elapsed:10.1f} starts/s '
+          f'{elapsed / total * 1000:8.2f} ms/start {stats["failed"]:6,} failed')
+
+
+def run(threads, starts, papers):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+        os.environ['DB_AUTO_CREATE'] = '1'
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+            tmp, 'bench.db')
+        os.environ['PASSWORD_HASH_WORKERS'] = '0'
+        from app import create_app, db
+        from app.services.exam_service import schedule_exam
+
+        app = create_app()
+        app.config['WTF_CSRF_ENABLED'] = False
+        with app.app_context():
+            fill(db, threads)
+
+        clients = []
+        for number in range(1, threads + 1):
+            client = app.test_client()
+            client.post('/login', data={'username': f'user{number}',
+                                        'password': 'benchmark'})
+            client.get('/quiz')     # Warm up caches and templates
+            clients.append(client)
+
+        print(f'{threads} threads x {starts} starts, '
+              f'{QUESTIONS:,} questions')
+        timed_starts('regular', clients, starts)
+
+        with app.test_request_context():
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            started = time.perf_counter()
+            schedule_exam('Benchmark', now - timedelta(minutes=1),
+                          now + timedelta(hours=1), 1200, 20, papers)
+            print(f'{papers} papers generated in '
+                  f'{time.perf_counter() - started:.2f} s')
+        timed_starts('exam', clients, starts)
+
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help='threads starting quizzes at once')
+    parser.add_argument('--starts', type=int, default=DEFAULT_STARTS,
+                        help='quiz starts per thread')
+    parser.add_argument('--papers', type=int, default=DEFAULT_PAPERS,
+                        help='pre-generated papers of the exam')
+    args = parser.parse_args()
+    run(args.threads, args.starts, args.papers)
@@ -0,0 +1,107 @@
+"""Benchmark the leaderboard against a large results table.
+
+Fills a throwaway SQLite database with synthetic users and quiz results,
+rebuilds the rollups once, then times the operations that run on page
+views and submissions: loading a top-K board, serving it from memory,
+rank lookups for users outside the top K, and recording a submission.
+
+Usage:
+    python benchmarks/bench_leaderboard.py [--results N] [--users N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_RESULTS = 1_000_000
+DEFAULT_USERS = 50_000
+REPEATS = 200
+
+
+def fill(db, results, users, batch_size=50_000):
+    """Insert synthetic users and results using batched executemany."""
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1)
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.executemany(
+            "INSERT INTO user (id, username, password, role) "
+            "VALUES (?, ?, 'x', 'user')",
+            ((i, f'user{i}') for i in range(1, users + 1)))
+        for offset in range(0, results, batch_size):
+            count = min(batch_size, results - offset)
+            cursor.executemany(
+                "INSERT INTO quiz_result (user_id, score, timestamp, "
+                "total_questions, user_answers, question_ids) "
+                "VALUES (?, ?, ?, 20, '{}', '[]')",
+                ((rng.randint(1, users), rng.randint(0, 20),
+                  start + timedelta(minutes=rng.randint(0, 400_000)))
+                 for _ in range(count)))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def timed(label, func, repeats=1):
+    """Print the mean time of ``repeats`` calls of ``func``."""
+    started = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    elapsed = (time.perf_counter() - started) / repeats
+    print(f'{label:<36} {elapsed * 1000:10.3f} ms')
+
+
+def run(results, users):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+        os.environ['DB_AUTO_CREATE'] = '1'
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+            tmp, 'bench.db')
+        from app import create_app, db
+        from app.services.leaderboard_service import (leaderboard, period_keys,
+                                                      rebuild_leaderboard,
+                                                      record_result)
+
+        app = create_app()
+        with app.app_context():
+            fill(db, results, users)
+            print(f'{results:,} results, {users:,} users')
+            timed('rebuild rollups', rebuild_leaderboard)
+
+            period = period_keys(datetime(2026, 3, 15))['month']
+            rng = random.Random(1)
+            timed('top-K load (cold)',
+                  lambda: (leaderboard.clear(), leaderboard.top('all')),
+                  REPEATS // 10)
+            timed('top-K from memory', lambda: leaderboard.top('all'),
+                  REPEATS)
+            timed('rank lookup (all time)',
+                  lambda: leaderboard.rank('all', rng.randint(1, users)),
+                  REPEATS)
+            timed('rank lookup (month)',
+                  lambda: leaderboard.rank(period, rng.randint(1, users)),
+                  REPEATS)
+
+            def submit():
+                user_id = rng.randint(1, users)
+                record_result(user_id, rng.randint(0, 20), 20)
+                db.session.commit()
+                leaderboard.record(user_id, f'user{user_id}')
+            timed('record submission', submit, REPEATS)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--results', type=int, default=DEFAULT_RESULTS,
+                        help='synthetic quiz results to generate')
+    parser.add_argument('--users', type=int, default=DEFAULT_USERS,
+                        help='users the results are spread over')
+    args = parser.parse_args()
+    run(args.results, args.users)
@@ -0,0 +1,59 @@
+"""Benchmark login throughput of the password hashing pool by pool size.
+
+Simulates a login burst: a fixed number of request threads verify a
+password through PasswordHasher concurrently, and the number of logins
+per second is reported for each pool size. Rejected (503) logins are
+counted separately.
+
+Usage:
+    python benchmarks/bench_password_pool.py [--pool-sizes N [N ...]]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.password_service import (HashingPoolSaturated,  # noqa: E402
+                                           PasswordHasher)
+
+DEFAULT_POOL_SIZES = [0, 1, 2, 4, 8]
+REQUEST_THREADS = 32
+LOGINS = 64
+
+
+def run(pool_size):
+    """Time LOGINS concurrent verifications with ``pool_size`` workers."""
+    hasher = PasswordHasher(workers=pool_size, queue_size=REQUEST_THREADS)
+    password_hash = hasher.hash_password('correct horse')
+
+    def login(_):
+        try:
+            return hasher.verify_password(password_hash, 'correct horse')
+        except HashingPoolSaturated:
+            return None
+
+    with ThreadPoolExecutor(REQUEST_THREADS) as request_threads:
+        started = time.perf_counter()
+        outcomes = list(request_threads.map(login, range(LOGINS)))
+        elapsed = time.perf_counter() - started
+    hasher.shutdown()
+
+    succeeded = sum(1 for outcome in outcomes if outcome)
+    rejected = outcomes.count(None)
+    label = 'inline' if pool_size == 0 else f'{pool_size} workers'
+    print(f'{label:>10}  {succeeded / elapsed:8.1f} logins/s  '
+          f'{rejected} rejected  ({elapsed:.2f} s)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pool-sizes', type=int, nargs='+',
+                        default=DEFAULT_POOL_SIZES,
+                        help='hashing worker processes to time; 0 hashes '
+                             'on the request threads')
+    for size in parser.parse_args().pool_sizes:
+        run(size)
@@ -0,0 +1,82 @@
+"""Benchmark admin question search latency against bank size.
+
+Builds a throwaway SQLite database for each bank size, fills it with
+synthetic questions (the FTS5 triggers index them as they are inserted)
+and times search_questions for a few representative queries.
+
+Usage:
+    python benchmarks/bench_question_search.py [--sizes N [N ...]]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+QUERIES = ['capital', 'river europe', 'planet', 'zebra 42', 'qu']
+REPEATS = 50
+WORDS = ['capital', 'river', 'planet', 'element', 'author', 'europe',
+         'asia', 'ocean', 'mountain', 'zebra', 'history', 'science']
+
+
+def fill_questions(db, count, batch_size=50_000):
+    """Insert ``count`` synthetic questions using batched executemany."""
+    rng = random.Random(0)
+    insert = ("INSERT INTO quiz_question (question_text, answer_a, answer_b, "
+              "answer_c, answer_d, correct_answer) VALUES (?, ?, ?, ?, ?, ?)")
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for start in range(0, count, batch_size):
+            stop = min(start + batch_size, count)
+            cursor.executemany(insert, (
+                (' '.join(rng.choices(WORDS, k=6)) + f' {i}?',
+                 rng.choice(WORDS), rng.choice(WORDS), rng.choice(WORDS),
+                 str(i % 100), 'ABCD'[i % 4])
+                for i in range(start, stop)))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def run(size):
+    """Time search_questions on a bank of ``size`` questions."""
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+        os.environ['DB_AUTO_CREATE'] = '1'
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+            tmp, 'bench.db')
+        from app import create_app, db
+        from app.services.search_service import search_questions
+        from config import Config
+        Config.SQLALCHEMY_DATABASE_URI = os.environ['DATABASE_URL']
+        Config.DB_AUTO_CREATE = True
+
+        app = create_app()
+        fts = app.extensions['question_search_fts']
+        with app.test_request_context():
+            fill_questions(db, size)
+            for query in QUERIES:
+                started = time.perf_counter()
+                for _ in range(REPEATS):
+                    questions, _ = search_questions(query)
+                    db.session.remove()
+                elapsed = (time.perf_counter() - started) / REPEATS
+                print(f'{size:>10,} questions  fts={fts!s:5}  '
+                      f'{query!r:16} {len(questions):3} hits  '
+                      f'{elapsed * 1000:7.2f} ms')
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='question bank sizes to search, one database '
+                             'each')
+    for size in parser.parse_args().sizes:
+        run(size)
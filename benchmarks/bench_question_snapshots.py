@@ -0,0 +1,102 @@
+"""Compare ORM questions with cached snapshots for a 100-question quiz.
+
+Reports the memory held by 100 loaded QuizQuestion objects versus 100
+QuestionSnapshot objects, and the time to render quiz.html and
+results.html from each.
+
+Usage:
+    python benchmarks/bench_question_snapshots.py [--questions N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_QUESTIONS = 100
+REPEATS = 200
+
+
+def measure_memory(load):
+    """Return the objects built by ``load`` and the bytes they hold."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = load()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'lineno'))
+    return objects, size
+
+
+def timed(func):
+    """Return the mean time of REPEATS calls of ``func`` in ms."""
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        func()
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+def run(count):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+        os.environ['DB_AUTO_CREATE'] = '1'
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+            tmp, 'bench.db')
+        from app import create_app, db
+        from app.models import QuizQuestion
+        from app.services.snapshot_service import get_snapshots
+        from flask import render_template
+        from markupsafe import Markup
+
+        app = create_app()
+        with app.test_request_context():
+            db.session.add_all(QuizQuestion(
+                question_text=f'Question number {i}?',
+                answer_a=f'Answer A{i}', answer_b=f'Answer B{i}',
+                answer_c=f'Answer C{i}', answer_d=f'Answer D{i}',
+                correct_answer='ABCD'[i % 4]) for i in range(count))
+            db.session.commit()
+            db.session.expunge_all()
+            ids = [question.id for question in QuizQuestion.query]
+            db.session.expunge_all()
+
+            questions, orm_bytes = measure_memory(
+                lambda: QuizQuestion.query.filter(
+                    QuizQuestion.id.in_(ids)).all())
+            snapshots, snapshot_bytes = measure_memory(
+                lambda: get_snapshots(ids))
+
+            result = SimpleNamespace(timestamp=datetime.now(), score=0)
+            user_answers = {str(question_id): 'B' for question_id in ids}
+
+            def render(items):
+                render_template('quiz_questions.html', questions=items)
+                detail = render_template('result_detail.html', result=result,
+                                         questions_count=count,
+                                         user_answers=user_answers,
+                                         questions=items)
+                render_template('results.html', detail=Markup(detail))
+
+            render(questions)  # Warm up the template cache
+            orm_ms = timed(lambda: render(questions))
+            snapshot_ms = timed(lambda: render(snapshots))
+            db.engine.dispose()
+
+    print(f'{count} questions')
+    print(f'{"":12} {"memory":>12} {"render quiz+results":>22}')
+    print(f'{"ORM":12} {orm_bytes / 1024:9.1f} KiB {orm_ms:19.3f} ms')
+    print(f'{"snapshots":12} {snapshot_bytes / 1024:9.1f} KiB '
+          f'{snapshot_ms:19.3f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--questions', type=int, default=DEFAULT_QUESTIONS,
+                        help='questions in the quiz that is rendered')
+    run(parser.parse_args().questions)
@@ -0,0 +1,81 @@
+"""Benchmark quiz-start latency of get_random_questions against bank size.
+
+Builds a throwaway SQLite database for each bank size, fills it with
+synthetic questions and times repeated calls to get_random_questions.
+The per-call time should stay flat as the bank grows.
+
+Usage:
+    python benchmarks/bench_random_questions.py [--sizes N [N ...]]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+REPEATS = 200
+
+
+def fill_questions(db, count, batch_size=50_000):
+    """Insert ``count`` synthetic questions using batched executemany."""
+    insert = ("INSERT INTO quiz_question (question_text, answer_a, answer_b, "
+              "answer_c, answer_d, correct_answer) VALUES (?, ?, ?, ?, ?, ?)")
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for start in range(0, count, batch_size):
+            stop = min(start + batch_size, count)
+            cursor.executemany(insert, (
+                (f'Question {i}?', 'A', 'B', 'C', 'D', 'ABCD'[i % 4])
+                for i in range(start, stop)))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def run(size):
+    """Time get_random_questions on a bank of ``size`` questions."""
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+        os.environ['DB_AUTO_CREATE'] = '1'
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+            tmp, 'bench.db')
+        from app import create_app, db
+        from app.services import quiz_service
+        from config import Config
+        Config.SQLALCHEMY_DATABASE_URI = os.environ['DATABASE_URL']
+        Config.DB_AUTO_CREATE = True
+
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            fill_questions(db, size)
+            quiz_service.invalidate_question_cache()
+
+            # First call pays the one-off ID cache load
+            started = time.perf_counter()
+            quiz_service.get_random_questions()
+            cold = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for _ in range(REPEATS):
+                quiz_service.get_random_questions()
+                db.session.remove()
+            warm = (time.perf_counter() - started) / REPEATS
+            db.engine.dispose()
+
+    print(f'{size:>10,} questions  cold {cold * 1000:8.2f} ms  '
+          f'warm {warm * 1000:6.3f} ms/quiz')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='question bank sizes to time, one database '
+                             'each')
+    for size in parser.parse_args().sizes:
+        run(size)
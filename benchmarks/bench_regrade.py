@@ -0,0 +1,89 @@
+"""Benchmark regrading stored results after an answer key change.
+
+Fills a throwaway SQLite database with synthetic results (see
+datagen.py), then, with NumPy (if installed) and in plain Python, flips
+the correct answer of one question and times the regrade of its
+answers, and flips another one and times a full regrade of every stored
+answer. The times include updating the affected question statistics and
+leaderboard rollups.
+
+Usage:
+    python benchmarks/bench_regrade.py [--results N] [--questions N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import generate  # noqa: E402
+
+DEFAULT_RESULTS = 200_000
+DEFAULT_QUESTIONS = 500
+USERS = 5_000
+NEXT_ANSWER = {'A': 'B', 'B': 'C', 'C': 'D', 'D': 'A'}
+
+
+def change_key(db, question_id):
+    """Move the correct answer of a question to the next option."""
+    from app.models import QuizQuestion
+    from app.services.quiz_service import invalidate_question_cache
+
+    question = db.session.get(QuizQuestion, question_id)
+    question.correct_answer = NEXT_ANSWER[question.correct_answer]
+    db.session.commit()
+    invalidate_question_cache()
+
+
+def timed(label, function, *args):
+    started = time.perf_counter()
+    checked, answers_changed, results_changed = function(*args)
+    elapsed = time.perf_counter() - started
+    print(f'{label:<24} {checked:>12,} answers {answers_changed:>10,} '
+          f'regraded {results_changed:>10,} rescored {elapsed:8.2f} s')
+
+
+def run(results, questions):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+        os.environ['DB_AUTO_CREATE'] = '1'
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+            tmp, 'bench.db')
+        from app import create_app, db
+        from app.services import regrade_service
+
+        app = create_app()
+        with app.app_context():
+            started = time.perf_counter()
+            generate(db, USERS, questions, results, seed=0)
+            print(f'{results:,} results over {questions:,} questions '
+                  f'generated in {time.perf_counter() - started:.1f} s')
+
+            numpy = regrade_service._load_numpy()
+            backends = [('numpy', numpy)] if numpy is not None else []
+            backends.append(('python', None))
+            question_id = 0
+            for name, module in backends:
+                regrade_service.np = module
+                question_id += 1
+                change_key(db, question_id)
+                timed(f'{name} one question', regrade_service.regrade_results,
+                      [question_id])
+                question_id += 1
+                change_key(db, question_id)
+                timed(f'{name} full', regrade_service.regrade_results)
+            regrade_service.np = numpy
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--results', type=int, default=DEFAULT_RESULTS,
+                        help='synthetic quiz results to generate')
+    parser.add_argument('--questions', type=int, default=DEFAULT_QUESTIONS,
+                        help='questions in the bank')
+    args = parser.parse_args()
+    run(args.results, args.questions)
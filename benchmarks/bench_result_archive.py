@@ -0,0 +1,117 @@
+"""Benchmark reading results history before and after archiving.
+
+Fills a throwaway SQLite database with synthetic results (see
+datagen.py), then times, for random users, the first results history
+page, a page deep into the history and loading an old result with its
+answers, all through ``result_service`` as the results pages do. The
+archive job then moves everything older than AGE days to archive
+segments, its throughput is shown, and the same reads are timed again
+with the old results served from the memory-mapped segments.
+
+Usage:
+    python benchmarks/bench_result_archive.py [--results N] [--age DAYS]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import generate  # noqa: E402
+
+DEFAULT_RESULTS = 500_000
+DEFAULT_AGE = 30
+USERS = 2_000
+QUESTIONS = 5_000
+READS = 2_000
+DEPTH = 5
+
+
+def timed(label, function, users):
+    started = time.perf_counter()
+    for user_id in users:
+        function(user_id)
+    elapsed = time.perf_counter() - started
+    print(f'{label:<24} {len(users) / elapsed:10,.0f} reads/s '
+          f'{elapsed / len(users) * 1000:8.3f} ms/read')
+
+
+def run_reads(label, db, users, old_results):
+    from app.services.result_service import (get_result_answers,
+                                             get_results_page,
+                                             get_user_result)
+
+    def first_page(user_id):
+        get_results_page(user_id)
+
+    def deep_page(user_id):
+        cursor = None
+        for _ in range(DEPTH):
+            _, cursor = get_results_page(user_id, cursor)
+
+    def old_result(user_id):
+        get_result_answers(get_user_result(user_id, old_results[user_id]))
+
+    print(f'-- {label}')
+    timed('first history page', first_page, users)
+    timed(f'history page {DEPTH}', deep_page, users)
+    timed('old result details', old_result, users)
+    db.session.remove()
+
+
+def run(results, age):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+        os.environ['DB_AUTO_CREATE'] = '1'
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+            tmp, 'bench.db')
+        os.environ['RESULT_ARCHIVE_DIR'] = os.path.join(tmp, 'archive')
+        from app import create_app, db
+        from app.models import QuizResult
+        from app.services.result_archive import (archive_results,
+                                                 result_archive)
+
+        app = create_app()
+        with app.app_context():
+            started = time.perf_counter()
+            generate(db, USERS, QUESTIONS, results, seed=0)
+            print(f'{results:,} results generated in '
+                  f'{time.perf_counter() - started:.1f} s')
+
+            rng = random.Random(0)
+            users = [rng.randint(1, USERS) for _ in range(READS)]
+            old_results = dict(db.session.execute(
+                db.select(QuizResult.user_id, db.func.min(QuizResult.id))
+                .group_by(QuizResult.user_id)).all())
+            users = [user_id for user_id in users if user_id in old_results]
+            run_reads('all results in the table', db, users, old_results)
+
+            started = time.perf_counter()
+            archived, answers = archive_results(result_archive.directory,
+                                                age)
+            elapsed = time.perf_counter() - started
+            size = sum(os.path.getsize(segment.path)
+                       for segment in result_archive.segments())
+            print(f'archived {archived:,} results ({answers:,} answers) in '
+                  f'{elapsed:.1f} s, {archived / elapsed:,.0f} results/s, '
+                  f'{size / 1024 / 1024:.1f} MiB in '
+                  f'{len(result_archive.segments())} segments; '
+                  f'{db.session.query(QuizResult).count():,} left in the '
+                  f'table')
+            db.session.execute(db.text('VACUUM'))
+            run_reads('old results archived', db, users, old_results)
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--results', type=int, default=DEFAULT_RESULTS,
+                        help='synthetic quiz results to generate')
+    parser.add_argument('--age', type=int, default=DEFAULT_AGE,
+                        help='archive results older than this many days')
+    args = parser.parse_args()
+    run(args.results, args.age)
@@ -0,0 +1,111 @@
+"""Benchmark cold start: importing the app package and create_app().
+
+Every run starts a fresh interpreter, so nothing is shared between runs
+and the times include the imports a worker pays when it boots. The
+median and best of the import and create_app() times are reported,
+followed by an import-time report of the slowest modules (from
+``python -X importtime``) for the first run.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs N] [--top N] [--auto-create]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside each fresh interpreter and prints its timings as JSON
+STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+created = time.perf_counter()
+print(json.dumps({'import': imported - started, 'create': created - imported}))
+"""
+
+
+def parse_importtime(output):
+    """
+    Parses the ``-X importtime`` report written to stderr.
+
+    Args:
+        output (str): The interpreter's stderr.
+
+    Returns:
+        list: (module, self seconds, cumulative seconds) tuples.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|', 2)
+        modules.append((name.strip(), int(own) / 1e6, int(cumulative) / 1e6))
+    return modules
+
+
+def start_once(database_url, auto_create, importtime=False):
+    """Start the app in a fresh interpreter and return its timings."""
+    env = dict(os.environ, DATABASE_URL=database_url,
+               DB_AUTO_CREATE='1' if auto_create else '0')
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    completed = subprocess.run(command + ['-c', STARTUP_SCRIPT], cwd=ROOT,
+                               env=env, capture_output=True, text=True,
+                               check=True)
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(completed.stderr) if importtime else []
+
+
+def report(label, values):
+    values = sorted(values)
+    print(f'{label:<12} median {values[len(values) // 2] * 1000:8.1f} ms   '
+          f'best {values[0] * 1000:8.1f} ms')
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = 'sqlite:///' + os.path.join(tmp, 'startup.db')
+        runs = []
+        modules = []
+        for number in range(args.runs):
+            # The first run pays for writing bytecode caches; it is only
+            # used for the import-time report
+            timings, found = start_once(database_url, args.auto_create,
+                                        importtime=number == 0)
+            if found:
+                modules = found
+            else:
+                runs.append(timings)
+
+    mode = 'with' if args.auto_create else 'without'
+    print(f'{len(runs)} cold starts {mode} DB_AUTO_CREATE')
+    report('import', [timings['import'] for timings in runs])
+    report('create_app', [timings['create'] for timings in runs])
+    report('total', [timings['import'] + timings['create']
+                     for timings in runs])
+
+    print('\nSlowest imports (first run, by own time):')
+    print(f'{"module":<48} {"self ms":>9} {"cumul. ms":>10}')
+    for name, own, cumulative in sorted(modules, key=lambda module: module[1],
+                                        reverse=True)[:args.top]:
+        print(f'{name:<48} {own * 1000:9.1f} {cumulative * 1000:10.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=6,
+                        help='fresh interpreters to start (the first only '
+                             'feeds the import-time report)')
+    parser.add_argument('--top', type=int, default=15,
+                        help='modules listed in the import-time report')
+    parser.add_argument('--auto-create', action='store_true',
+                        help='start with DB_AUTO_CREATE=1, as in development')
+    run(parser.parse_args())
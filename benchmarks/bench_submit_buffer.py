@@ -0,0 +1,173 @@
+"""Benchmark sustained quiz submissions with and without the submit buffer.
+
+Several threads submit pre-started attempts through ``submit_attempt``
+as fast as they can, like the burst of auto-submits when a timed exam
+ends. The workload runs against fresh SQLite databases: once storing
+every submission in its own transaction, and with the write-behind
+submission buffer, both with and without an fsync of the journal per
+submission. For the buffer, submits/s counts the submissions answered,
+and the time until the background writer stored the last one is shown
+separately.
+
+Usage:
+    python benchmarks/bench_submit_buffer.py [--threads N] [--submits N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+
+DEFAULT_THREADS = 8
+DEFAULT_SUBMITS = 500
+QUESTIONS = 2_000
+USERS = 200
+
+
+class DirectConfig(Config):
+    """Every submission stored in its own transaction."""
+    PASSWORD_HASH_WORKERS = 0
+    DB_AUTO_CREATE = True
+
+
+class BufferedConfig(DirectConfig):
+    """Submissions journaled and stored in batches."""
+    SUBMISSION_BUFFER_ENABLED = True
+
+
+class BufferedNoSyncConfig(BufferedConfig):
+    """As above, without waiting for the journal to reach the disk."""
+    SUBMISSION_JOURNAL_FSYNC = False
+
+
+class BenchUser:
+    """Stands in for the logged-in user."""
+
+    def __init__(self, user_id):
+        self.id = user_id
+        self.username = f'user{user_id}'
+
+
+def fill(db):
+    """Insert synthetic users and questions using batched executemany."""
+    connection = db.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.executemany(
+            "INSERT INTO user (id, username, password, role) "
+            "VALUES (?, ?, 'x', 'user')",
+            ((i, f'user{i}') for i in range(1, USERS + 1)))
+        cursor.executemany(
+            "INSERT INTO quiz_question (id, question_text, answer_a, "
+            "answer_b, answer_c, answer_d, correct_answer) "
+            "VALUES (?, ?, 'a', 'b', 'c', 'd', 'A')",
+            ((i, f'Question {i}?') for i in range(1, QUESTIONS + 1)))
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def start_attempts(count, seed):
+    """Start ``count`` attempts for random users, as GET /quiz does."""
+    from app import db
+    from app.services.attempt_service import get_attempt_store
+
+    rng = random.Random(seed)
+    attempts = [get_attempt_store().create(
+        rng.randint(1, USERS), rng.sample(range(1, QUESTIONS + 1), 20), 1200)
+        for _ in range(count)]
+    db.session.commit()
+    return attempts
+
+
+def worker(app, attempts, seed, stats):
+    """Submit the given attempts one after another."""
+    from app import db
+    from app.services.submission_service import submit_attempt
+
+    rng = random.Random(seed)
+    done = errors = 0
+    with app.app_context():
+        for attempt in attempts:
+            answers = {question_id: rng.choice('ABCD')
+                       for question_id in attempt.question_ids}
+            try:
+                submit_attempt(attempt, BenchUser(attempt.user_id), answers)
+                done += 1
+            except Exception as error:  # "database is locked" and friends
+                db.session.rollback()
+                errors += 1
+                stats.setdefault('first_error', str(error).splitlines()[0])
+            finally:
+                db.session.remove()
+    with stats['lock']:
+        stats['done'] += done
+        stats['errors'] += errors
+
+
+def run_profile(label, config_class, threads, submits, tmp):
+    from app import create_app, db
+    from app.models import QuizResult
+
+    config_class.SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(
+        tmp, f'{label}.db')
+    config_class.SUBMISSION_JOURNAL_DIR = os.path.join(tmp, f'{label}-journal')
+    app = create_app(config_class)
+    with app.app_context():
+        fill(db)
+        attempts = [start_attempts(submits, seed) for seed in range(threads)]
+        db.engine.dispose()
+
+    stats = {'lock': threading.Lock(), 'done': 0, 'errors': 0}
+    pool = [threading.Thread(target=worker,
+                             args=(app, attempts[seed], seed, stats))
+            for seed in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    answered = time.perf_counter() - started
+
+    buffer = app.extensions.get('submission_buffer')
+    if buffer is not None:
+        buffer.close()
+    stored_in = time.perf_counter() - started
+    with app.app_context():
+        stored = db.session.query(QuizResult).count()
+        db.engine.dispose()
+
+    print(f'{label:<18} {stats["done"] / answered:10.1f} submits/s '
+          f'{stats["done"]:8,} ok {stats["errors"]:6,} failed '
+          f'{answered:8.2f} s   {stored:8,} stored in {stored_in:6.2f} s')
+    if 'first_error' in stats:
+        print(f'{"":<18} first error: {stats["first_error"]}')
+
+
+def run(threads, submits):
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config reads DATABASE_URL at import time
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+            tmp, 'unused.db')
+        print(f'{threads} threads x {submits} submits')
+        run_profile('direct', DirectConfig, threads, submits, tmp)
+        run_profile('buffered', BufferedConfig, threads, submits, tmp)
+        run_profile('buffered-nosync', BufferedNoSyncConfig, threads,
+                    submits, tmp)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=DEFAULT_THREADS,
+                        help='threads submitting at once')
+    parser.add_argument('--submits', type=int, default=DEFAULT_SUBMITS,
+                        help='submissions per thread')
+    args = parser.parse_args()
+    run(args.threads, args.submits)
@@ -0,0 +1,199 @@
+"""Seeded synthetic data generator for benchmarks.
+
+Fills an empty database with users, questions and quiz results (with
+their per-question answer rows), reproducibly for a given seed. Rows are
+generated lazily and inserted in batches, so millions of results can be
+written without holding them in memory.
+
+All users share the password ``benchmark`` (hashed once) and are named
+``user1``, ``user2``, ...; the first user is an admin.
+
+Usage:
+    python benchmarks/datagen.py --database-url sqlite:////tmp/bench.db
+        [--users 1000] [--questions 5000] [--results 100000] [--seed 0]
+        [--rollups]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = 'benchmark'
+QUESTIONS_PER_QUIZ = 20
+# Results are spread over the year before this moment
+EPOCH = datetime(2026, 1, 1)
+
+
+def batched(rows, size):
+    """Yield lists of up to ``size`` rows from an iterable."""
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def user_rows(count, password_hash):
+    for user_id in range(1, count + 1):
+        yield {'id': user_id, 'username': f'user{user_id}',
+               'password': password_hash,
+               'role': 'admin' if user_id == 1 else 'user'}
+
+
+def question_rows(count, rng):
+    for question_id in range(1, count + 1):
+        yield {'id': question_id,
+               'question_text': f'Synthetic question {question_id}: which '
+                                f'option is number {rng.randint(1, 4)}?',
+               'answer_a': f'Option A{question_id}',
+               'answer_b': f'Option B{question_id}',
+               'answer_c': f'Option C{question_id}',
+               'answer_d': f'Option D{question_id}',
+               'correct_answer': rng.choice('ABCD')}
+
+
+def result_rows(count, users, answer_key, rng):
+    """Yield (result row, answer rows) pairs for ``count`` quiz results.
+
+    Each user answers correctly with a fixed per-user skill, so scores
+    and leaderboards have a realistic spread.
+    """
+    skills = [rng.uniform(0.2, 0.95) for _ in range(users + 1)]
+    question_ids = range(1, len(answer_key))
+    per_quiz = min(QUESTIONS_PER_QUIZ, len(question_ids))
+    for result_id in range(1, count + 1):
+        user_id = rng.randint(1, users)
+        quiz = rng.sample(question_ids, per_quiz)
+        answers = {}
+        rows = []
+        for question_id in quiz:
+            correct = answer_key[question_id]
+            chosen = correct if rng.random() < skills[user_id] \
+                else rng.choice('ABCD')
+            answers[str(question_id)] = chosen
+            rows.append({'result_id': result_id, 'question_id': question_id,
+                         'chosen': chosen, 'is_correct': chosen == correct})
+        score = sum(row['is_correct'] for row in rows)
+        moment = EPOCH - timedelta(seconds=rng.randint(0, 365 * 86400))
+        yield ({'id': result_id, 'user_id': user_id, 'score': score,
+                'timestamp': moment, 'total_questions': per_quiz,
+                # Stored JSON-encoded, as the quiz route does
+                'user_answers': json.dumps(answers),
+                'question_ids': json.dumps(quiz)}, rows)
+
+
+def generate(db, users, questions, results, seed=0, batch_size=10_000,
+             progress=None):
+    """
+    Fills the database with synthetic users, questions and results.
+
+    Must run inside an application context, against empty tables.
+
+    Args:
+        db (SQLAlchemy): The Flask-SQLAlchemy extension.
+        users (int): The number of users to create.
+        questions (int): The number of questions to create.
+        results (int): The number of quiz results to create.
+        seed (int): Seed for the random generator; the same seed and
+            counts always produce the same data.
+        batch_size (int): Rows inserted per statement.
+        progress (callable): Optional callback receiving
+            (table name, rows inserted so far).
+
+    Raises:
+        ValueError: If the tables already hold data, or results are
+            requested without users or questions.
+    """
+    from app.models import QuizAnswer, QuizQuestion, QuizResult, User
+    from app.services.quiz_service import invalidate_question_cache
+    from werkzeug.security import generate_password_hash
+
+    if results and (not users or not questions):
+        raise ValueError('Results need at least one user and one question.')
+    for model in (User, QuizQuestion, QuizResult):
+        if db.session.query(model.id).first() is not None:
+            raise ValueError(f'Table {model.__tablename__} is not empty.')
+
+    rng = random.Random(seed)
+    answer_key = [None]
+
+    def insert(model, rows):
+        inserted = 0
+        for batch in batched(rows, batch_size):
+            db.session.execute(db.insert(model.__table__), batch)
+            db.session.commit()
+            inserted += len(batch)
+            if progress:
+                progress(model.__tablename__, inserted)
+
+    insert(User, user_rows(users, generate_password_hash(PASSWORD)))
+
+    def questions_with_key():
+        for row in question_rows(questions, rng):
+            answer_key.append(row['correct_answer'])
+            yield row
+    insert(QuizQuestion, questions_with_key())
+
+    inserted = 0
+    per_batch = max(1, batch_size // QUESTIONS_PER_QUIZ)
+    for batch in batched(result_rows(results, users, answer_key, rng),
+                         per_batch):
+        db.session.execute(db.insert(QuizResult.__table__),
+                           [result for result, _ in batch])
+        db.session.execute(db.insert(QuizAnswer.__table__),
+                           [row for _, rows in batch for row in rows])
+        db.session.commit()
+        inserted += len(batch)
+        if progress:
+            progress(QuizResult.__tablename__, inserted)
+
+    invalidate_question_cache()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', required=True,
+                        help='database to fill, e.g. sqlite:////tmp/bench.db')
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--questions', type=int, default=5_000)
+    parser.add_argument('--results', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--rollups', action='store_true',
+                        help='also rebuild question statistics and '
+                             'leaderboards')
+    args = parser.parse_args(argv)
+
+    # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+    os.environ['DB_AUTO_CREATE'] = '1'
+    os.environ['DATABASE_URL'] = args.database_url
+    from app import create_app, db
+
+    app = create_app()
+    started = time.perf_counter()
+
+    def progress(table, count):
+        print(f'\r{table:<14} {count:>12,}', end='', flush=True)
+
+    with app.app_context():
+        try:
+            generate(db, args.users, args.questions, args.results, args.seed,
+                     args.batch_size, progress)
+        except ValueError as error:
+            parser.exit(1, f'{error}\n')
+        print()
+        if args.rollups:
+            from app.services.leaderboard_service import rebuild_leaderboard
+            from app.services.stats_service import rebuild_question_stats
+            rebuild_question_stats()
+            rebuild_leaderboard()
+    print(f'Done in {time.perf_counter() - started:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
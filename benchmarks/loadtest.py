@@ -0,0 +1,350 @@
+"""End-to-end load test of the quiz flow.
+
+Simulates virtual users that each register, log in and then repeatedly
+take a quiz: GET /quiz, POST /quiz with the CSRF token and an answer for
+every question, GET /results and GET /results_history. Users are started
+along a linear ramp and pause for a random think time between requests.
+
+The app is driven either in-process through Flask test clients (the
+default, against a throwaway SQLite database seeded with questions) or
+over HTTP against a running server such as ``python run.py``, which
+must already have questions in its bank.
+
+Per-route p50/p95/p99 latency, throughput and error rate are written as
+JSON, so runs can be compared between versions.
+
+Usage:
+    python benchmarks/loadtest.py [--users 20] [--ramp 10] [--duration 30]
+        [--think 0.5 2.0] [--url http://127.0.0.1:5000] [--output run.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import secrets
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.cookiejar import CookieJar
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CSRF_PATTERN = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+ANSWER_PATTERN = re.compile(r'name="answer_(\d+)"')
+PASSWORD = 'loadtest-password'
+
+
+class Response:
+    """The parts of a response the virtual users look at."""
+
+    def __init__(self, status, location, text):
+        self.status = status
+        self.location = location or ''
+        self.text = text
+
+
+class InProcessClient:
+    """Drives the app through a Flask test client, without redirects."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        return Response(response.status_code, response.headers.get('Location'),
+                        response.get_data(as_text=True))
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HTTPClient:
+    """Drives a running server over HTTP, keeping cookies per user."""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data else None
+        request = urllib.request.Request(self.base_url + path, data=body,
+                                         method=method)
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                return Response(response.status,
+                                response.headers.get('Location'),
+                                response.read().decode())
+        except urllib.error.HTTPError as error:
+            return Response(error.code, error.headers.get('Location'),
+                            error.read().decode(errors='replace'))
+
+
+class Recorder:
+    """Collects per-route latencies and errors from all virtual users."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.error_samples = {}
+
+    def record(self, route, elapsed, error=None):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(elapsed)
+            if error is not None:
+                self.errors[route] = self.errors.get(route, 0) + 1
+                self.error_samples.setdefault(route, error)
+
+    def report(self, wall_time):
+        """Summarise the run as a JSON-serialisable dict."""
+        routes = {}
+        all_latencies = []
+        for route, latencies in sorted(self.latencies.items()):
+            all_latencies.extend(latencies)
+            routes[route] = summarise(latencies, self.errors.get(route, 0),
+                                      wall_time)
+            if route in self.error_samples:
+                routes[route]['first_error'] = self.error_samples[route]
+        return {
+            'wall_time_s': round(wall_time, 3),
+            'routes': routes,
+            'total': summarise(all_latencies, sum(self.errors.values()),
+                               wall_time),
+        }
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarise(latencies, errors, wall_time):
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        'requests': count,
+        'errors': errors,
+        'error_rate': round(errors / count, 4) if count else 0.0,
+        'throughput_rps': round(count / wall_time, 2) if wall_time else 0.0,
+        'mean_ms': round(sum(ordered) / count * 1000, 2) if count else 0.0,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2) if count else 0.0,
+    }
+
+
+class VirtualUser:
+    """One simulated user walking through the quiz flow."""
+
+    def __init__(self, client, username, recorder, think, rng):
+        self.client = client
+        self.username = username
+        self.recorder = recorder
+        self.think = think
+        self.rng = rng
+
+    def step(self, route, path, data=None, expect=200, location=None):
+        """Issue one request and record it; returns the response or None.
+
+        A response counts as an error if its status differs from
+        ``expect`` or, for redirects, if it does not point at
+        ``location``.
+        """
+        method = 'POST' if data is not None else 'GET'
+        started = time.perf_counter()
+        try:
+            response = self.client.request(method, path, data)
+        except Exception as error:
+            self.recorder.record(route, time.perf_counter() - started,
+                                 f'{type(error).__name__}: {error}')
+            return None
+        elapsed = time.perf_counter() - started
+
+        error = None
+        if response.status != expect:
+            error = f'status {response.status}'
+        elif location and not response.location.endswith(location):
+            error = f'redirected to {response.location}'
+        self.recorder.record(route, elapsed, error)
+        return response if error is None else None
+
+    def pause(self):
+        low, high = self.think
+        if high > 0:
+            time.sleep(self.rng.uniform(low, high))
+
+    def csrf_token(self, route, path):
+        response = self.step(route, path)
+        match = response and CSRF_PATTERN.search(response.text)
+        return match.group(1) if match else None
+
+    def sign_in(self):
+        """Register and log in; returns whether the user is logged in."""
+        token = self.csrf_token('GET /register', '/register')
+        if token is None:
+            return False
+        if not self.step('POST /register', '/register',
+                         {'csrf_token': token, 'username': self.username,
+                          'password': PASSWORD, 'password2': PASSWORD,
+                          'role': 'user'}, expect=302, location='/login'):
+            return False
+        self.pause()
+
+        token = self.csrf_token('GET /login', '/login')
+        if token is None:
+            return False
+        return self.step('POST /login', '/login',
+                         {'csrf_token': token, 'username': self.username,
+                          'password': PASSWORD},
+                         expect=302, location='/dashboard') is not None
+
+    def take_quiz(self):
+        """Run one quiz iteration; returns whether it completed."""
+        response = self.step('GET /quiz', '/quiz')
+        if response is None:
+            return False
+        token = CSRF_PATTERN.search(response.text)
+        question_ids = dict.fromkeys(ANSWER_PATTERN.findall(response.text))
+        if token is None or not question_ids:
+            self.recorder.record('GET /quiz', 0.0, 'no quiz form')
+            return False
+        self.pause()
+
+        answers = {f'answer_{question_id}': self.rng.choice('ABCD')
+                   for question_id in question_ids}
+        answers.update(csrf_token=token.group(1), timeout='0')
+        if not self.step('POST /quiz', '/quiz', answers, expect=302,
+                         location='/results'):
+            return False
+        self.step('GET /results', '/results')
+        self.pause()
+        self.step('GET /results_history', '/results_history')
+        self.pause()
+        return True
+
+    def run(self, start_at, stop_at, iterations):
+        time.sleep(max(0.0, start_at - time.monotonic()))
+        if not self.sign_in():
+            return
+        done = 0
+        while time.monotonic() < stop_at and (not iterations
+                                              or done < iterations):
+            self.take_quiz()
+            done += 1
+
+
+def seed_questions(app, count):
+    """Add synthetic questions if the bank has fewer than ``count``."""
+    from app import db
+    from app.models import QuizQuestion
+    from app.services.quiz_service import invalidate_question_cache
+
+    with app.app_context():
+        existing = QuizQuestion.query.count()
+        if existing >= count:
+            return
+        db.session.execute(db.insert(QuizQuestion), [
+            {'question_text': f'Load test question {i}?',
+             'answer_a': 'Alpha', 'answer_b': 'Bravo', 'answer_c': 'Charlie',
+             'answer_d': 'Delta', 'correct_answer': 'ABCD'[i % 4]}
+            for i in range(existing, count)])
+        db.session.commit()
+        invalidate_question_cache()
+
+
+def run(args):
+    if args.url:
+        make_client = lambda: HTTPClient(args.url)  # noqa: E731
+        target = args.url
+    else:
+        # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+        os.environ['DB_AUTO_CREATE'] = '1'
+        if not args.database_url:
+            tmp = tempfile.mkdtemp(prefix='quiz-loadtest-')
+            os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(
+                tmp, 'loadtest.db')
+        else:
+            os.environ['DATABASE_URL'] = args.database_url
+        from app import create_app
+
+        app = create_app()
+        seed_questions(app, args.questions)
+        make_client = lambda: InProcessClient(app)  # noqa: E731
+        target = 'in-process'
+
+    recorder = Recorder()
+    run_id = secrets.token_hex(3)
+    started = time.monotonic()
+    stop_at = started + args.ramp + args.duration
+    users = []
+    for number in range(args.users):
+        user = VirtualUser(make_client(), f'lt{run_id}_{number}', recorder,
+                           tuple(args.think), random.Random(number))
+        start_at = started + args.ramp * number / max(1, args.users)
+        users.append(threading.Thread(
+            target=user.run, args=(start_at, stop_at, args.iterations),
+            daemon=True))
+    for thread in users:
+        thread.start()
+    for thread in users:
+        thread.join()
+
+    report = recorder.report(time.monotonic() - started)
+    report['config'] = {
+        'target': target,
+        'users': args.users,
+        'ramp_s': args.ramp,
+        'duration_s': args.duration,
+        'iterations': args.iterations,
+        'think_s': list(args.think),
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + '\n')
+    print(output)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20,
+                        help='number of virtual users')
+    parser.add_argument('--ramp', type=float, default=10.0,
+                        help='seconds over which users are started')
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help='seconds to keep running after the ramp')
+    parser.add_argument('--iterations', type=int, default=0,
+                        help='stop each user after this many quizzes '
+                             '(0 runs until the duration ends)')
+    parser.add_argument('--think', type=float, nargs=2, default=[0.5, 2.0],
+                        metavar=('MIN', 'MAX'),
+                        help='random pause between requests, in seconds')
+    parser.add_argument('--url',
+                        help='base URL of a running server; runs in-process '
+                             'when omitted')
+    parser.add_argument('--database-url',
+                        help='database for in-process runs (default: a '
+                             'throwaway SQLite file)')
+    parser.add_argument('--questions', type=int, default=200,
+                        help='questions to seed for in-process runs')
+    parser.add_argument('--output', help='also write the JSON report here')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    run(parse_args())
@@ -0,0 +1,244 @@
+"""Micro-benchmark suite for the quiz hot paths, with regression checks.
+
+Builds (or reuses) a database filled by ``datagen.py`` and times each
+hot path with ``timeit``: question selection, grading, decoding of the
+stored answers, question option lookups and rendering of ``quiz.html``
+and ``results.html``. The best time per call of every case is stored in
+``benchmarks/results/<commit>.json`` and compared with the stored run of
+another commit (``HEAD~1`` by default); cases slower than the threshold
+are flagged and the exit status is 1.
+
+Usage:
+    python benchmarks/suite.py [--scale small|medium|large] [--only CASE]
+        [--against REV] [--threshold 0.15] [--database-url URL]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'results')
+
+# (users, questions, results) generated for each scale
+SCALES = {
+    'small': (200, 2_000, 5_000),
+    'medium': (2_000, 20_000, 100_000),
+    'large': (50_000, 200_000, 2_000_000),
+}
+QUIZ_SIZE = 20
+ROUNDS = 7
+MIN_ROUND_TIME = 0.2
+
+
+def git(*args):
+    """Run a git command in the repository; returns its output or None."""
+    try:
+        return subprocess.run(
+            ['git', *args], cwd=os.path.dirname(RESULTS_DIR), check=True,
+            capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_cases(db):
+    """Return the benchmark cases as a dict of name -> callable.
+
+    Must run inside a request context; every case works on the same
+    seeded sample of questions and results.
+    """
+    from flask import render_template
+    from markupsafe import Markup
+    from app.models import QuizQuestion, QuizResult
+    from app.services.grading_service import grade_answers
+    from app.services.quiz_service import (get_random_question_ids,
+                                           get_random_questions)
+    from app.services.result_service import (get_result_answers,
+                                             get_results_page)
+    from app.services.snapshot_service import get_snapshots
+
+    rng = random.Random(0)
+    result = db.session.get(QuizResult, rng.randint(
+        1, db.session.query(db.func.max(QuizResult.id)).scalar()))
+    question_ids, user_answers = get_result_answers(result)
+    questions = QuizQuestion.query.filter(
+        QuizQuestion.id.in_(question_ids)).all()
+    snapshots = get_snapshots(question_ids)
+    # The JSON column holds the JSON-encoded answers the quiz route stores
+    stored_answers = result.user_answers
+
+    def question_options():
+        for question in questions:
+            question.options
+            question.correct_answer_text
+            question.user_answer_text(user_answers[str(question.id)])
+
+    def snapshot_options():
+        for snapshot in snapshots:
+            snapshot.options
+            snapshot.correct_answer_text
+            snapshot.user_answer_text(user_answers[str(snapshot.id)])
+
+    def render_quiz():
+        body = render_template('quiz_questions.html', questions=snapshots)
+        render_template('quiz.html', body=Markup(body), time_limit=1200)
+
+    def render_results():
+        # As the results page does on a fragment cache miss
+        detail = render_template('result_detail.html', result=result,
+                                 questions_count=result.total_questions,
+                                 user_answers=user_answers,
+                                 questions=snapshots)
+        render_template('results.html', detail=Markup(detail))
+
+    return {
+        'random_questions': lambda: get_random_questions(QUIZ_SIZE),
+        'random_snapshots': lambda: get_snapshots(
+            get_random_question_ids(QUIZ_SIZE)),
+        'grade_answers': lambda: grade_answers(user_answers),
+        'decode_user_answers': lambda: json.loads(stored_answers),
+        'result_answers': lambda: get_result_answers(result),
+        'results_page': lambda: get_results_page(result.user_id, None, 20),
+        'question_options': question_options,
+        'snapshot_options': snapshot_options,
+        'render_quiz': render_quiz,
+        'render_results': render_results,
+    }
+
+
+def time_case(func):
+    """Return the best and median seconds per call over ROUNDS rounds."""
+    timer = timeit.Timer(func)
+    loops, elapsed = timer.autorange()
+    if elapsed < MIN_ROUND_TIME:
+        loops = max(1, int(loops * MIN_ROUND_TIME / max(elapsed, 1e-9)))
+    times = sorted(total / loops for total in timer.repeat(ROUNDS, loops))
+    return {'best_us': round(times[0] * 1e6, 3),
+            'median_us': round(times[len(times) // 2] * 1e6, 3),
+            'loops': loops}
+
+
+def prepare_database(args, tmp):
+    """Point the app at the benchmark database, generating it if needed."""
+    url = args.database_url or 'sqlite:///' + os.path.join(tmp, 'suite.db')
+    # Config reads DATABASE_URL and DB_AUTO_CREATE at import time
+    os.environ['DB_AUTO_CREATE'] = '1'
+    os.environ['DATABASE_URL'] = url
+    from app import create_app, db
+    from app.models import QuizResult
+    from datagen import generate
+
+    app = create_app()
+    with app.app_context():
+        if db.session.query(QuizResult.id).first() is None:
+            users, questions, results = SCALES[args.scale]
+            print(f'Generating {args.scale} data set '
+                  f'({users:,} users, {questions:,} questions, '
+                  f'{results:,} results)...', file=sys.stderr)
+            generate(db, users, questions, results, seed=args.seed)
+    return app, db
+
+
+def load_run(revision):
+    """Load the stored run of a git revision, or None."""
+    commit = git('rev-parse', '--verify', '--quiet', revision + '^{commit}')
+    path = commit and os.path.join(RESULTS_DIR, commit + '.json')
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(run, baseline, threshold):
+    """Print the cases side by side; returns the regressed case names."""
+    regressions = []
+    print(f'{"case":<22} {"best us":>12} {"baseline":>12} {"change":>9}')
+    for name, timing in run['cases'].items():
+        base = baseline and baseline['cases'].get(name)
+        line = f'{name:<22} {timing["best_us"]:12.2f}'
+        if base:
+            change = timing['best_us'] / base['best_us'] - 1
+            line += f' {base["best_us"]:12.2f} {change:+8.1%}'
+            if change > threshold:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='small',
+                        help='size of the generated data set')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database-url',
+                        help='reuse a database filled by datagen.py instead '
+                             'of generating a throwaway one')
+    parser.add_argument('--only', action='append',
+                        help='run only this case (repeatable)')
+    parser.add_argument('--against', default='HEAD~1',
+                        help='git revision whose stored run is the baseline')
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help='relative slowdown flagged as a regression')
+    parser.add_argument('--no-save', action='store_true',
+                        help='do not store the results of this run')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, db = prepare_database(args, tmp)
+        with app.test_request_context():
+            cases = build_cases(db)
+            names = args.only or list(cases)
+            timings = {}
+            for name in names:
+                timings[name] = time_case(cases[name])
+            db.session.remove()
+            db.engine.dispose()
+
+    commit = git('rev-parse', 'HEAD')
+    dirty = bool(git('status', '--porcelain', '--untracked-files=no'))
+    run = {
+        'commit': commit,
+        'dirty': dirty,
+        'scale': args.scale if not args.database_url else 'custom',
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'cases': timings,
+    }
+
+    baseline = load_run(args.against)
+    if baseline and baseline['scale'] != run['scale']:
+        print(f'Baseline ran at scale {baseline["scale"]}; not comparing.',
+              file=sys.stderr)
+        baseline = None
+    regressions = compare(run, baseline, args.threshold)
+
+    if commit and not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        # Only clean trees are stored under the commit they measure
+        name = commit + ('-dirty' if dirty else '') + '.json'
+        with open(os.path.join(RESULTS_DIR, name), 'w') as file:
+            json.dump(run, file, indent=2)
+            file.write('\n')
+
+    if regressions:
+        print(f'{len(regressions)} case(s) regressed more than '
+              f'{args.threshold:.0%} against {args.against}: '
+              + ', '.join(regressions), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,10 +10,108 @@ class Config:
         SQLALCHEMY_DATABASE_URI (str): Database URI for SQLAlchemy.
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Flag for tracking modifications
         in SQLAlchemy.
+        DB_AUTO_CREATE (bool): Creates missing tables on startup, for
+        development; otherwise the schema is managed by `flask db upgrade`.
+        DB_POOL_SIZE (int): Connections kept open per process (server
+        databases only).
+        DB_MAX_OVERFLOW (int): Extra connections opened under load beyond
+        the pool size (server databases only).
+        DB_POOL_RECYCLE (int): Seconds after which a pooled connection is
+        replaced, to stay under server-side idle timeouts.
+        DB_POOL_TIMEOUT (int): Seconds to wait for a free pooled connection.
+        DB_QUERY_CACHE_SIZE (int): Number of compiled SQL statements cached
+        by SQLAlchemy per engine.
+        SQLITE_STATEMENT_CACHE (int): Number of prepared statements cached
+        per SQLite connection.
+        SQLITE_JOURNAL_MODE (str): SQLite journal mode; WAL lets readers
+        run alongside the single writer.
+        SQLITE_SYNCHRONOUS (str): SQLite fsync level; NORMAL is safe with
+        WAL and avoids an fsync per commit.
+        SQLITE_BUSY_TIMEOUT (int): Milliseconds a connection waits for a
+        lock before failing with "database is locked".
+        SQLITE_CACHE_SIZE (int): SQLite page cache per connection; negative
+        values are in KiB.
+        SQLITE_MMAP_SIZE (int): Bytes of the database file read through
+        memory-mapped I/O (0 disables it).
         SESSION_TYPE (str): Specifies the type of session storage.
+        PROFILING_ENABLED (bool): Turns on the cProfile request profiler.
+        PROFILE_SAMPLE_RATE (float): Fraction of requests profiled at
+        random (0 profiles only requests carrying PROFILE_HEADER).
+        PROFILE_HEADER (str): Request header with which admins ask for a
+        profile of a single request.
+        PROFILE_DIR (str): Where profiles are written (defaults to
+        instance/profiles).
+        PROFILE_KEEP (int): Number of newest profiles kept on disk.
+        METRICS_ENABLED (bool): Records per-request latency, SQL and
+        template metrics, served to admins at /metrics.
+        METRICS_SLOW_REQUEST (float): Requests taking at least this many
+        seconds are logged with their SQL breakdown (0 disables the log).
         CSRF_ENABLED (bool): Enables CSRF protection in the application.
+        API_TOKEN_TTL (int): Seconds a JSON API bearer token stays valid.
         QUIZ_TIME_LIMIT (int): Time limit for quizzes, in seconds
         (default is 20 minutes).
+        QUIZ_ATTEMPT_STORE (str): Where in-progress quiz attempts are kept:
+        'database' (the quiz_attempt table) or 'memory' (single node only).
+        QUIZ_ATTEMPT_GRACE (int): Seconds past the deadline an attempt is
+        kept before it is reaped.
+        QUIZ_ATTEMPT_REAP_INTERVAL (int): Minimum seconds between bulk
+        reaps of expired attempts.
+        RESULTS_PER_PAGE (int): Number of attempts shown per results
+        history page.
+        RESULT_CACHE_SIZE (int): Maximum number of rendered result pages
+        kept in the per-process fragment cache (0 disables it).
+        RESULT_CACHE_BYTES (int): Maximum total size of the cached result
+        pages, in characters.
+        QUESTION_BANK_VERSION_TTL (float): Seconds a worker process trusts
+        the question bank version it read before checking it again, which
+        bounds how long its caches can lag a change made elsewhere.
+        QUESTIONS_PER_PAGE (int): Number of questions shown per page of the
+        admin question browser.
+        IMPORT_BATCH_SIZE (int): Number of rows inserted per transaction
+        by the question bulk import.
+        REGRADE_BATCH_SIZE (int): Number of answers regraded per
+        transaction after an answer key change.
+        EXAM_PAPER_COUNT (int): Default number of papers generated for a
+        scheduled exam.
+        EXAM_SCHEDULE_TTL (int): Seconds the list of scheduled exams is
+        served from memory before it is reloaded.
+        SUBMISSION_BUFFER_ENABLED (bool): Buffers graded quiz submissions
+        in a local journal and stores them in batches from a background
+        writer. Every process writing results must have it turned on.
+        SUBMISSION_JOURNAL_DIR (str): Where the submission journals are
+        kept (defaults to instance/journal).
+        SUBMISSION_JOURNAL_FSYNC (bool): Waits for each buffered
+        submission to reach the disk before answering the request.
+        SUBMISSION_FLUSH_INTERVAL (float): Seconds the writer waits for a
+        batch of buffered submissions to fill.
+        SUBMISSION_FLUSH_SIZE (int): Maximum number of buffered
+        submissions stored per transaction.
+        SUBMISSION_ID_BLOCK (int): Number of quiz result IDs a process
+        reserves at a time for buffered submissions.
+        SUBMISSION_WAIT_TIMEOUT (float): Seconds a results page waits for
+        the user's buffered submissions to be stored.
+        EXPORT_CHUNK_SIZE (int): Number of results (with their answers)
+        read and written at a time by the analytics export.
+        EXPORT_WATERMARK_LAG (int): Seconds of the newest results an
+        incremental analytics export leaves for its next run.
+        RESULT_ARCHIVE_DIR (str): Where the archive segments of old quiz
+        results are kept (defaults to instance/archive).
+        RESULT_ARCHIVE_AGE (float): Days after which ``flask
+        archive-results`` moves a quiz result to the archive.
+        USER_CACHE_SIZE (int): Maximum number of users kept in the
+        per-process user loader cache (0 disables it).
+        USER_CACHE_TTL (int): Seconds a cached user stays valid.
+        LEADERBOARD_SIZE (int): Number of users shown on each leaderboard.
+        LEADERBOARD_TTL (int): Seconds an in-memory leaderboard is served
+        before it is reloaded from the rollup table.
+        PASSWORD_HASH_WORKERS (int): Number of processes hashing passwords
+        (0 hashes inline on the request thread).
+        PASSWORD_HASH_QUEUE_SIZE (int): Number of hashing jobs allowed to
+        wait for a worker before requests are rejected with a 503.
+        PASSWORD_HASH_TIMEOUT (int): Seconds to wait for a hashing job
+        before answering 503.
+        PASSWORD_HASH_METHOD (str): Werkzeug hash method for new hashes;
+        stored hashes using other parameters are rehashed on login.
     """
 
     # Secret key for securing user sessions
@@ -26,11 +124,153 @@ class Config:
     # Disable modification tracking to save resources
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Create missing tables on startup instead of running the migrations
+    DB_AUTO_CREATE = os.getenv('DB_AUTO_CREATE', '0') == '1'
+
+    # Connection pool for server databases (PostgreSQL, MySQL); ignored
+    # for SQLite
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+
+    # Statement caching: compiled SQL in SQLAlchemy and prepared
+    # statements in each SQLite connection
+    DB_QUERY_CACHE_SIZE = int(os.getenv('DB_QUERY_CACHE_SIZE', 500))
+    SQLITE_STATEMENT_CACHE = int(os.getenv('SQLITE_STATEMENT_CACHE', 256))
+
+    # Pragmas run on every new SQLite connection; set one to None to keep
+    # SQLite's default
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000))
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -16000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 64 * 1024 * 1024))
+
     # Configure session type (filesystem for local storage)
     SESSION_TYPE = 'filesystem'
 
+    # Per-process request metrics exposed at /metrics, and the threshold
+    # above which a request is logged as slow
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+    METRICS_SLOW_REQUEST = float(os.getenv('METRICS_SLOW_REQUEST', 0.5))
+
+    # Opt-in cProfile sampling of requests; profiles rotate under
+    # instance/profiles unless PROFILE_DIR is set
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', '0') == '1'
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0.0))
+    PROFILE_HEADER = os.getenv('PROFILE_HEADER', 'X-Profile')
+    PROFILE_DIR = os.getenv('PROFILE_DIR')
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 200))
+
     # Enable CSRF protection across the app
     CSRF_ENABLED = True
 
+    # Lifetime of the bearer tokens of the JSON API (here it's one day)
+    API_TOKEN_TTL = int(os.getenv('API_TOKEN_TTL', 24 * 60 * 60))
+
     # Set a time limit for quizzes (in seconds, here it's 20 minutes)
     QUIZ_TIME_LIMIT = 20 * 60
+
+    # Server-side storage of in-progress quiz attempts; only the attempt
+    # ID is kept in the session cookie
+    QUIZ_ATTEMPT_STORE = os.getenv('QUIZ_ATTEMPT_STORE', 'database')
+    QUIZ_ATTEMPT_GRACE = 60
+    QUIZ_ATTEMPT_REAP_INTERVAL = 60
+
+    # Number of attempts shown per page of the results history
+    RESULTS_PER_PAGE = 20
+
+    # Per-process LRU cache of rendered result details, bounded by count
+    # and total size
+    RESULT_CACHE_SIZE = int(os.getenv('RESULT_CACHE_SIZE', 1000))
+    RESULT_CACHE_BYTES = int(os.getenv('RESULT_CACHE_BYTES',
+                                       16 * 1024 * 1024))
+
+    # Per-process caches of the question bank follow a version stored in
+    # the database; the TTL bounds how long another process's (or a CLI
+    # command's) change takes to reach them
+    QUESTION_BANK_VERSION_TTL = float(os.getenv('QUESTION_BANK_VERSION_TTL',
+                                                2))
+
+    # Number of questions shown per page of the admin question browser
+    QUESTIONS_PER_PAGE = 50
+
+    # Number of rows inserted per transaction by the question bulk import
+    IMPORT_BATCH_SIZE = 1000
+
+    # Rows regraded per transaction when past results are rescored
+    REGRADE_BATCH_SIZE = int(os.getenv('REGRADE_BATCH_SIZE', 5000))
+
+    # Scheduled exams serve pre-generated papers; the TTL bounds how long
+    # other worker processes take to see a newly scheduled exam
+    EXAM_PAPER_COUNT = int(os.getenv('EXAM_PAPER_COUNT', 50))
+    EXAM_SCHEDULE_TTL = int(os.getenv('EXAM_SCHEDULE_TTL', 10))
+
+    # Optional write-behind buffer for quiz submissions: graded results are
+    # journaled under instance/journal and stored in batches every few
+    # milliseconds; single-node only, like the journal it writes
+    SUBMISSION_BUFFER_ENABLED = os.getenv('SUBMISSION_BUFFER_ENABLED',
+                                          '0') == '1'
+    SUBMISSION_JOURNAL_DIR = os.getenv('SUBMISSION_JOURNAL_DIR')
+    SUBMISSION_JOURNAL_FSYNC = os.getenv('SUBMISSION_JOURNAL_FSYNC',
+                                         '1') == '1'
+    SUBMISSION_FLUSH_INTERVAL = float(os.getenv('SUBMISSION_FLUSH_INTERVAL',
+                                                0.005))
+    SUBMISSION_FLUSH_SIZE = int(os.getenv('SUBMISSION_FLUSH_SIZE', 500))
+    SUBMISSION_ID_BLOCK = int(os.getenv('SUBMISSION_ID_BLOCK', 1000))
+    SUBMISSION_WAIT_TIMEOUT = float(os.getenv('SUBMISSION_WAIT_TIMEOUT', 2))
+
+    # Analytics export of answered questions (flask export-answers); the
+    # lag keeps results still being committed out of incremental exports
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2500))
+    EXPORT_WATERMARK_LAG = int(os.getenv('EXPORT_WATERMARK_LAG', 60))
+
+    # Cold storage of old quiz results (flask archive-results): results
+    # move to read-only segment files that results pages read through mmap
+    RESULT_ARCHIVE_DIR = os.getenv('RESULT_ARCHIVE_DIR')
+    RESULT_ARCHIVE_AGE = float(os.getenv('RESULT_ARCHIVE_AGE', 365))
+
+    # Per-process cache of logged-in users; the TTL bounds how long other
+    # worker processes can serve a stale role after it changes
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))
+
+    # In-memory top-K leaderboards; the TTL bounds how long results
+    # recorded by other worker processes take to show up
+    LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', 10))
+    LEADERBOARD_TTL = int(os.getenv('LEADERBOARD_TTL', 30))
+
+    # Password hashing runs in a bounded process pool off the request
+    # threads; unset PASSWORD_HASH_METHOD uses Werkzeug's default
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 32))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD')
+
+
+class ProductionConfig(Config):
+    """
+    Production profile, selected with ``APP_PROFILE=production``.
+
+    Sized for a few multi-threaded worker processes in front of a server
+    database; on SQLite the pool settings are ignored and the larger page
+    cache and mmap window apply instead. Every value can still be
+    overridden through the environment.
+    """
+
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 900))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 10))
+    DB_QUERY_CACHE_SIZE = int(os.getenv('DB_QUERY_CACHE_SIZE', 1000))
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -64000))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
+
+
+# Configuration profiles selectable with the APP_PROFILE variable
+PROFILES = {
+    'default': Config,
+    'production': ProductionConfig,
+}
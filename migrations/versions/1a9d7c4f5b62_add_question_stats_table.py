@@ -0,0 +1,40 @@
+"""Add question_stats table.
+
+Revision ID: 1a9d7c4f5b62
+Revises: e5a0b3c8d217
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1a9d7c4f5b62'
+down_revision = 'e5a0b3c8d217'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('question_stats',
+    sa.Column('question_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('times_served', sa.Integer(), nullable=False),
+    sa.Column('times_correct', sa.Integer(), nullable=False),
+    sa.Column('count_a', sa.Integer(), nullable=False),
+    sa.Column('count_b', sa.Integer(), nullable=False),
+    sa.Column('count_c', sa.Integer(), nullable=False),
+    sa.Column('count_d', sa.Integer(), nullable=False),
+    sa.Column('correct_rate', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('question_id')
+    )
+    with op.batch_alter_table('question_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_question_stats_correct_rate'),
+                              ['correct_rate'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('question_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_question_stats_correct_rate'))
+
+    op.drop_table('question_stats')
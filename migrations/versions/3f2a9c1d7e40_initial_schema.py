@@ -0,0 +1,54 @@
+"""Initial schema.
+
+Revision ID: 3f2a9c1d7e40
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7e40'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('username', sa.String(length=150), nullable=False),
+    sa.Column('password', sa.String(length=150), nullable=False),
+    sa.Column('role', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('username')
+    )
+    op.create_table('quiz_question',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('question_text', sa.String(length=500), nullable=False),
+    sa.Column('answer_a', sa.String(length=100), nullable=False),
+    sa.Column('answer_b', sa.String(length=100), nullable=False),
+    sa.Column('answer_c', sa.String(length=100), nullable=False),
+    sa.Column('answer_d', sa.String(length=100), nullable=False),
+    sa.Column('correct_answer', sa.String(length=1), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('quiz_result',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.Column('timestamp', sa.DateTime(), nullable=True),
+    sa.Column('total_questions', sa.Integer(), nullable=True),
+    sa.Column('user_answers', sa.JSON(), nullable=False),
+    sa.Column('question_ids', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('quiz_result')
+    op.drop_table('quiz_question')
+    op.drop_table('user')
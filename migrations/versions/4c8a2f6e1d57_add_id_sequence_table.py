@@ -0,0 +1,28 @@
+"""Add id_sequence table.
+
+Revision ID: 4c8a2f6e1d57
+Revises: 9e2c4a7b3d18
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8a2f6e1d57'
+down_revision = '9e2c4a7b3d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('id_sequence',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('next_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('id_sequence')
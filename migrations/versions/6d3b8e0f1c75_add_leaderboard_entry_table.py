@@ -0,0 +1,40 @@
+"""Add leaderboard_entry table.
+
+Revision ID: 6d3b8e0f1c75
+Revises: 1a9d7c4f5b62
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d3b8e0f1c75'
+down_revision = '1a9d7c4f5b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('leaderboard_entry',
+    sa.Column('period', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('total_score', sa.Integer(), nullable=False),
+    sa.Column('total_questions', sa.Integer(), nullable=False),
+    sa.Column('best_pct', sa.Float(), nullable=False),
+    sa.Column('avg_pct', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('period', 'user_id')
+    )
+    with op.batch_alter_table('leaderboard_entry', schema=None) as batch_op:
+        batch_op.create_index('ix_leaderboard_entry_period_rank',
+                              ['period', 'best_pct', 'avg_pct'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('leaderboard_entry', schema=None) as batch_op:
+        batch_op.drop_index('ix_leaderboard_entry_period_rank')
+
+    op.drop_table('leaderboard_entry')
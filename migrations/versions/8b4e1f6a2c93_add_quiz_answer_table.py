@@ -0,0 +1,41 @@
+"""Add quiz_answer table.
+
+Revision ID: 8b4e1f6a2c93
+Revises: 3f2a9c1d7e40
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4e1f6a2c93'
+down_revision = '3f2a9c1d7e40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('quiz_answer',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('result_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('chosen', sa.String(length=1), nullable=True),
+    sa.Column('is_correct', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['result_id'], ['quiz_result.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('quiz_answer', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_quiz_answer_question_id'),
+                              ['question_id'], unique=False)
+        batch_op.create_index('ix_quiz_answer_result_id_question_id',
+                              ['result_id', 'question_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_answer', schema=None) as batch_op:
+        batch_op.drop_index('ix_quiz_answer_result_id_question_id')
+        batch_op.drop_index(batch_op.f('ix_quiz_answer_question_id'))
+
+    op.drop_table('quiz_answer')
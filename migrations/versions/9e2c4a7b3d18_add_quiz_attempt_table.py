@@ -0,0 +1,38 @@
+"""Add quiz_attempt table.
+
+Revision ID: 9e2c4a7b3d18
+Revises: 6d3b8e0f1c75
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e2c4a7b3d18'
+down_revision = '6d3b8e0f1c75'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('quiz_attempt',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('question_ids', sa.LargeBinary(), nullable=False),
+    sa.Column('started_at', sa.Float(), nullable=False),
+    sa.Column('deadline', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('quiz_attempt', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_quiz_attempt_deadline'),
+                              ['deadline'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_attempt', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_quiz_attempt_deadline'))
+
+    op.drop_table('quiz_attempt')
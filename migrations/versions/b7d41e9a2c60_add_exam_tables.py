@@ -0,0 +1,53 @@
+"""Add exam and exam_paper tables.
+
+Revision ID: b7d41e9a2c60
+Revises: 4c8a2f6e1d57
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d41e9a2c60'
+down_revision = '4c8a2f6e1d57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('exam',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('opens_at', sa.DateTime(), nullable=False),
+    sa.Column('closes_at', sa.DateTime(), nullable=False),
+    sa.Column('time_limit', sa.Integer(), nullable=False),
+    sa.Column('num_questions', sa.Integer(), nullable=False),
+    sa.Column('paper_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('exam', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_exam_closes_at'),
+                              ['closes_at'], unique=False)
+
+    op.create_table('exam_paper',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('exam_id', sa.Integer(), nullable=False),
+    sa.Column('number', sa.Integer(), nullable=False),
+    sa.Column('question_ids', sa.LargeBinary(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('built_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['exam_id'], ['exam.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('exam_id', 'number',
+                        name='uq_exam_paper_exam_id_number')
+    )
+
+
+def downgrade():
+    op.drop_table('exam_paper')
+    with op.batch_alter_table('exam', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_exam_closes_at'))
+
+    op.drop_table('exam')
@@ -0,0 +1,27 @@
+"""Add (user_id, timestamp) index on quiz_result.
+
+Revision ID: c71d5e2b9a04
+Revises: 8b4e1f6a2c93
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71d5e2b9a04'
+down_revision = '8b4e1f6a2c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz_result', schema=None) as batch_op:
+        batch_op.create_index('ix_quiz_result_user_id_timestamp',
+                              ['user_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_result', schema=None) as batch_op:
+        batch_op.drop_index('ix_quiz_result_user_id_timestamp')
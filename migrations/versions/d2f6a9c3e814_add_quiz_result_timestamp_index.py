@@ -0,0 +1,27 @@
+"""Add timestamp index on quiz_result.
+
+Revision ID: d2f6a9c3e814
+Revises: b7d41e9a2c60
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6a9c3e814'
+down_revision = 'b7d41e9a2c60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz_result', schema=None) as batch_op:
+        batch_op.create_index('ix_quiz_result_timestamp', ['timestamp'],
+                              unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_result', schema=None) as batch_op:
+        batch_op.drop_index('ix_quiz_result_timestamp')
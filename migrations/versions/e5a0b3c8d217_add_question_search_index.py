@@ -0,0 +1,73 @@
+"""Add FTS5 search index over quiz questions (SQLite only).
+
+Revision ID: e5a0b3c8d217
+Revises: c71d5e2b9a04
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a0b3c8d217'
+down_revision = 'c71d5e2b9a04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Other databases use the LIKE fallback and need no index
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS quiz_question_fts USING fts5(
+            question_text, answer_a, answer_b, answer_c, answer_d,
+            content='quiz_question', content_rowid='id')
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS quiz_question_fts_ai
+        AFTER INSERT ON quiz_question BEGIN
+            INSERT INTO quiz_question_fts (rowid, question_text, answer_a,
+                                           answer_b, answer_c, answer_d)
+            VALUES (new.id, new.question_text, new.answer_a,
+                    new.answer_b, new.answer_c, new.answer_d);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS quiz_question_fts_ad
+        AFTER DELETE ON quiz_question BEGIN
+            INSERT INTO quiz_question_fts (quiz_question_fts, rowid,
+                                           question_text, answer_a, answer_b,
+                                           answer_c, answer_d)
+            VALUES ('delete', old.id, old.question_text, old.answer_a,
+                    old.answer_b, old.answer_c, old.answer_d);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS quiz_question_fts_au
+        AFTER UPDATE ON quiz_question BEGIN
+            INSERT INTO quiz_question_fts (quiz_question_fts, rowid,
+                                           question_text, answer_a, answer_b,
+                                           answer_c, answer_d)
+            VALUES ('delete', old.id, old.question_text, old.answer_a,
+                    old.answer_b, old.answer_c, old.answer_d);
+            INSERT INTO quiz_question_fts (rowid, question_text, answer_a,
+                                           answer_b, answer_c, answer_d)
+            VALUES (new.id, new.question_text, new.answer_a,
+                    new.answer_b, new.answer_c, new.answer_d);
+        END
+    """)
+    op.execute("INSERT INTO quiz_question_fts (quiz_question_fts) "
+               "VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS quiz_question_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS quiz_question_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS quiz_question_fts_ai")
+    op.execute("DROP TABLE IF EXISTS quiz_question_fts")
@@ -0,0 +1,29 @@
+"""Add cache_version table.
+
+Revision ID: f3b8c1e5a920
+Revises: d2f6a9c3e814
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8c1e5a920'
+down_revision = 'd2f6a9c3e814'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_version',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('changed_at', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_version')
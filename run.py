@@ -7,8 +7,10 @@ application factory pattern, allowing the app to be run as a standalone script.
 
 from app import create_app
 
-# Create the Flask application instance
-app = create_app()
+# Create the Flask application instance; the password hashing workers
+# import this module as __mp_main__ and need no application of their own
+if __name__ != '__mp_main__':
+    app = create_app()
 
 if __name__ == '__main__':
     # Run the app in debug mode
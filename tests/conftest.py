@@ -0,0 +1,20 @@
+import pytest
+
+from app import create_app, db
+from config import Config
+
+
+@pytest.fixture
+def app(tmp_path):
+    """An application on a fresh SQLite database, inside an app context."""
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'test.db')
+        DB_AUTO_CREATE = True
+        PASSWORD_HASH_WORKERS = 0
+        RESULT_ARCHIVE_DIR = str(tmp_path / 'archive')
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.api import issue_token
+from app.models import ExamPaper, QuizQuestion, QuizResult, User
+from app.services.attempt_service import unpack_question_ids
+from app.services.exam_service import schedule_exam
+
+
+@pytest.mark.parametrize('limit, returned', [
+    ('5', 5), ('500', 100), ('-5', 1), ('-1', 1), ('0', 20)])
+def test_results_limit_is_clamped(app, limit, returned):
+    user = User(username='student', password='x')
+    db.session.add(user)
+    db.session.commit()
+    db.session.add_all(QuizResult(user_id=user.id, score=1,
+                                  total_questions=1, user_answers='{}',
+                                  question_ids='[]')
+                       for _ in range(150))
+    db.session.commit()
+
+    response = app.test_client().get(
+        f'/api/v1/results?limit={limit}',
+        headers={'Authorization': f'Bearer {issue_token(user.id)}'})
+    assert response.status_code == 200
+    assert len(response.get_json()['results']) == returned
+    assert response.get_json()['next'] is not None
+
+
+def test_attempt_gets_an_exam_paper_while_an_exam_is_open(app):
+    user = User(username='student', password='x')
+    db.session.add(user)
+    db.session.add_all(QuizQuestion(question_text=f'Q{number}?',
+                                    answer_a='a', answer_b='b', answer_c='c',
+                                    answer_d='d', correct_answer='A')
+                       for number in range(30))
+    db.session.commit()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    exam = schedule_exam('Midterm', now - timedelta(minutes=5),
+                         now + timedelta(minutes=10), 3600, 5, 2)
+    papers = {tuple(unpack_question_ids(paper.question_ids))
+              for paper in ExamPaper.query.filter_by(exam_id=exam.id)}
+
+    response = app.test_client().post(
+        '/api/v1/attempts',
+        headers={'Authorization': f'Bearer {issue_token(user.id)}'})
+    assert response.status_code == 201
+    attempt = response.get_json()
+    assert tuple(question['id'] for question in attempt['questions']) \
+        in papers
+    # The time limit ends when the exam closes
+    assert attempt['deadline'] <= (now + timedelta(minutes=10)).replace(
+        tzinfo=timezone.utc).timestamp() + 1
+
+
+def test_token_request_answers_503_when_hashing_times_out(app):
+    from app.services.password_service import password_hasher
+
+    # Checking this hash takes far longer than the timeout
+    db.session.add(User(username='student',
+                        password='pbkdf2:sha256:5000000$salt$hash'))
+    db.session.commit()
+    password_hasher.configure(1, 0, 0.01, None)
+    try:
+        response = app.test_client().post(
+            '/api/v1/tokens', json={'username': 'student', 'password': 'pw'})
+    finally:
+        password_hasher.configure(0, 0, 10, None)
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,57 @@
+import pytest
+
+from app import db
+from app.models import User
+from app.services import attempt_service
+from app.services.attempt_service import (DatabaseAttemptStore,
+                                          MemoryAttemptStore,
+                                          pack_question_ids,
+                                          unpack_question_ids)
+
+
+@pytest.mark.parametrize('question_ids', [
+    [], [1], [3, 1, 2], [2 ** 40, 0, 2 ** 63 - 1]])
+def test_question_ids_round_trip(question_ids):
+    packed = pack_question_ids(question_ids)
+    assert len(packed) == 8 * len(question_ids)
+    assert unpack_question_ids(packed) == question_ids
+
+
+@pytest.fixture(params=[DatabaseAttemptStore, MemoryAttemptStore],
+                ids=['database', 'memory'])
+def store(app, request):
+    return request.param(grace=60, reap_interval=60)
+
+
+def test_attempts_belong_to_their_user(store):
+    user = User(username='student', password='x')
+    db.session.add(user)
+    db.session.commit()
+
+    attempt = store.create(user.id, [5, 3, 9], 600)
+    db.session.commit()
+    loaded = store.get(attempt.id, user.id)
+    assert loaded == attempt
+    assert loaded.deadline == pytest.approx(attempt.started_at + 600)
+    assert store.get(attempt.id, user.id + 1) is None
+    assert store.get(None, user.id) is None
+
+    store.delete_many([attempt.id, None])
+    db.session.commit()
+    assert store.get(attempt.id, user.id) is None
+
+
+def test_expired_attempts_are_reaped_after_the_grace(store, monkeypatch):
+    user = User(username='student', password='x')
+    db.session.add(user)
+    db.session.commit()
+    attempt = store.create(user.id, [1], 10)
+    db.session.commit()
+
+    now = attempt.started_at
+    monkeypatch.setattr(attempt_service, 'time', lambda: now + 10 + 59)
+    assert store.reap() == 0
+    monkeypatch.setattr(attempt_service, 'time', lambda: now + 10 + 61)
+    assert store.reap() == 1
+    db.session.commit()
+    assert store.get(attempt.id, user.id) is None
@@ -0,0 +1,54 @@
+from flask import Flask
+
+from app import db
+from app.engine import configure_engine, engine_options, sqlite_pragmas
+from config import Config
+
+
+def _config(**overrides):
+    config = {name: getattr(Config, name) for name in dir(Config)
+              if name.isupper()}
+    config.update(overrides)
+    return config
+
+
+def test_server_databases_get_a_sized_pool():
+    options = engine_options(_config(
+        SQLALCHEMY_DATABASE_URI='postgresql://quiz@localhost/quiz',
+        DB_POOL_SIZE=7))
+    assert options['pool_size'] == 7
+    assert options['pool_pre_ping'] is True
+    assert 'connect_args' not in options
+
+
+def test_sqlite_gets_a_statement_cache_and_no_pool_settings():
+    options = engine_options(_config(SQLALCHEMY_DATABASE_URI='sqlite://',
+                                     SQLITE_STATEMENT_CACHE=64))
+    assert options['connect_args'] == {'cached_statements': 64}
+    assert 'pool_size' not in options
+
+
+def test_explicit_engine_options_win():
+    app = Flask(__name__)
+    app.config.update(_config(
+        SQLALCHEMY_DATABASE_URI='postgresql://quiz@localhost/quiz',
+        SQLALCHEMY_ENGINE_OPTIONS={'pool_size': 2}))
+    configure_engine(app)
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['pool_size'] == 2
+    assert app.config['SQLALCHEMY_ENGINE_OPTIONS']['max_overflow'] == 10
+
+
+def test_unset_pragmas_are_skipped():
+    pragmas = sqlite_pragmas(_config(SQLITE_MMAP_SIZE=None,
+                                     SQLITE_CACHE_SIZE=None))
+    assert pragmas == ['PRAGMA journal_mode=WAL', 'PRAGMA synchronous=NORMAL',
+                       'PRAGMA busy_timeout=5000']
+
+
+def test_pragmas_run_on_every_connection(app):
+    with db.engine.connect() as connection:
+        pragma = connection.exec_driver_sql
+        assert pragma('PRAGMA journal_mode').scalar() == 'wal'
+        assert pragma('PRAGMA synchronous').scalar() == 1  # NORMAL
+        assert pragma('PRAGMA busy_timeout').scalar() == 5000
+        assert pragma('PRAGMA cache_size').scalar() == -16000
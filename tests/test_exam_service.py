@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+from app import db
+from app.models import ExamPaper, QuizQuestion
+from app.services.attempt_service import unpack_question_ids
+from app.services.exam_service import (delete_exam, draw_questions,
+                                       refresh_exam_papers, schedule_exam)
+from app.services.quiz_service import invalidate_question_cache
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _questions(count):
+    questions = [QuizQuestion(question_text=f'Question {number}?',
+                              answer_a='a', answer_b='b', answer_c='c',
+                              answer_d='d', correct_answer='A')
+                 for number in range(count)]
+    db.session.add_all(questions)
+    db.session.commit()
+    invalidate_question_cache()
+    return questions
+
+
+def _papers(exam):
+    return [unpack_question_ids(paper.question_ids) for paper in
+            ExamPaper.query.filter_by(exam_id=exam.id).order_by(
+                ExamPaper.number)]
+
+
+def test_scheduled_papers_are_distinct_draws(app):
+    _questions(10)
+    exam = schedule_exam('Quiz', _now() + timedelta(days=1),
+                         _now() + timedelta(days=2), 600, 4, 3)
+
+    papers = _papers(exam)
+    assert len(papers) == 3
+    assert all(len(set(paper)) == 4 for paper in papers)
+    body = ExamPaper.query.filter_by(exam_id=exam.id).first().body
+    assert 'Question' in body
+
+
+def test_open_exam_deals_papers_round_robin(app):
+    _questions(10)
+    now = _now()
+    assert draw_questions(900, 3)[1:] == (None, 900)
+
+    exam = schedule_exam('Open', now - timedelta(minutes=1),
+                         now + timedelta(minutes=5), 3600, 3, 2)
+    papers = _papers(exam)
+    drawn = [draw_questions(900, 3) for _ in range(4)]
+    assert [question_ids for question_ids, _, _ in drawn] == papers * 2
+    assert all(body for _, body, _ in drawn)
+    # The time limit ends when the exam closes
+    assert all(limit <= 300 for _, _, limit in drawn)
+
+    delete_exam(exam)
+    assert ExamPaper.query.count() == 0
+    assert draw_questions(900, 3)[1] is None
+
+
+def test_only_upcoming_papers_follow_question_changes(app):
+    questions = _questions(6)
+    now = _now()
+    upcoming = schedule_exam('Upcoming', now + timedelta(days=1),
+                             now + timedelta(days=2), 600, 5, 1)
+    running = schedule_exam('Running', now - timedelta(minutes=1),
+                            now + timedelta(days=1), 600, 5, 1)
+    running_papers = _papers(running)
+    edited = _papers(upcoming)[0][0]
+
+    question = db.session.get(QuizQuestion, edited)
+    question.question_text = 'Edited question?'
+    db.session.commit()
+    invalidate_question_cache()
+    assert refresh_exam_papers([edited]) == 1
+    body = ExamPaper.query.filter_by(exam_id=upcoming.id).one().body
+    assert 'Edited question?' in body
+
+    db.session.delete(question)
+    db.session.commit()
+    invalidate_question_cache()
+    assert refresh_exam_papers([edited], deleted=True) == 1
+    paper = _papers(upcoming)[0]
+    assert edited not in paper and len(paper) == 5
+    assert set(paper) <= {question.id for question in questions}
+    assert _papers(running) == running_papers
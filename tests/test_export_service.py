@@ -0,0 +1,103 @@
+import csv
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from app import db
+from app.models import QuizAnswer, QuizResult, User
+from app.services.export_service import (WATERMARK_FILE, export_answers,
+                                         read_watermark)
+from app.services.result_archive import archive_results, result_archive
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _user(username='student'):
+    user = User(username=username, password='x')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _result(user, taken_at, chosen=('A', None)):
+    result = QuizResult(user_id=user.id, score=1, total_questions=2,
+                        timestamp=taken_at, user_answers='{}',
+                        question_ids=json.dumps([1, 2]))
+    db.session.add(result)
+    db.session.flush()
+    db.session.add_all(QuizAnswer(result_id=result.id, question_id=number,
+                                  chosen=answer, is_correct=answer == 'A')
+                       for number, answer in enumerate(chosen, 1))
+    db.session.commit()
+    return result.id
+
+
+def _rewind(directory):
+    """Moves the watermark a minute back, as if exported a minute ago."""
+    watermark = read_watermark(directory) - timedelta(minutes=1)
+    with open(os.path.join(directory, WATERMARK_FILE), 'w') as stream:
+        json.dump({'until': watermark.isoformat()}, stream)
+    return watermark
+
+
+def _rows(path):
+    with gzip.open(path, 'rt', newline='') as stream:
+        return list(csv.DictReader(stream))
+
+
+def test_incremental_exports_continue_after_the_watermark(app, tmp_path):
+    user = _user()
+    first = _result(user, _now() - timedelta(hours=2))
+    directory = str(tmp_path / 'exports')
+
+    path, results, rows = export_answers(directory, 'csv', lag=0)
+    assert (results, rows) == (1, 2)
+    assert [(row['result_id'], row['position'], row['chosen'])
+            for row in _rows(path)] == [(str(first), '1', 'A'),
+                                        (str(first), '2', '')]
+    assert read_watermark(directory) is not None
+
+    watermark = _rewind(directory)
+    second = _result(user, watermark + timedelta(seconds=1))
+    path, results, _ = export_answers(directory, 'csv', lag=0)
+    assert results == 1
+    assert {row['result_id'] for row in _rows(path)} == {str(second)}
+    assert read_watermark(directory) > watermark
+
+
+def test_since_accepts_aware_datetimes(app, tmp_path):
+    user = _user()
+    _result(user, _now() - timedelta(hours=3))
+    recent = _result(user, _now() - timedelta(hours=1))
+    # Two hours ago, given in UTC+02:00
+    since = (datetime.now(timezone(timedelta(hours=2)))
+             - timedelta(hours=2))
+
+    path, results, _ = export_answers(str(tmp_path / 'exports'), 'csv',
+                                      incremental=False, since=since, lag=0)
+    assert results == 1
+    assert {row['result_id'] for row in _rows(path)} == {str(recent)}
+
+
+def test_full_export_includes_archived_results(app, tmp_path):
+    user = _user()
+    archived = _result(user, _now() - timedelta(days=400), ('B', 'A'))
+    stored = _result(user, _now() - timedelta(minutes=5))
+    assert archive_results(result_archive.directory, 365) == (1, 2)
+
+    path, results, rows = export_answers(str(tmp_path / 'full'), 'csv',
+                                         incremental=False, lag=0)
+    assert (results, rows) == (2, 4)
+    exported = [(row['result_id'], row['chosen'], row['is_correct'])
+                for row in _rows(path)]
+    assert exported == [(str(archived), 'B', '0'), (str(archived), 'A', '1'),
+                        (str(stored), 'A', '1'), (str(stored), '', '0')]
+
+    # Later incremental runs read the tables only
+    directory = str(tmp_path / 'exports')
+    assert export_answers(directory, 'csv', lag=0)[1] == 2
+    _result(user, _rewind(directory) + timedelta(seconds=1))
+    assert export_answers(directory, 'csv', lag=0)[1] == 1
@@ -0,0 +1,44 @@
+from app import db
+from app.models import CacheVersion, QuizQuestion
+from app.services.grading_service import get_answer_key, grade_answers
+from app.services.quiz_service import (BANK_VERSION,
+                                       invalidate_question_cache)
+
+
+def _questions(*answers):
+    questions = [QuizQuestion(question_text=f'Q{number}?', answer_a='a',
+                              answer_b='b', answer_c='c', answer_d='d',
+                              correct_answer=answer)
+                 for number, answer in enumerate(answers)]
+    db.session.add_all(questions)
+    db.session.commit()
+    invalidate_question_cache()
+    return [question.id for question in questions]
+
+
+def test_grades_against_the_answer_key(app):
+    first, second = _questions('A', 'C')
+
+    assert get_answer_key([first, str(second), 999]) == {first: 'A',
+                                                         second: 'C'}
+    score, correctness = grade_answers({str(first): 'A', str(second): 'B',
+                                        '999': 'A'})
+    assert score == 1
+    assert correctness == {str(first): True, str(second): False,
+                           '999': False}
+
+
+def test_key_changed_elsewhere_is_never_graded_stale(app):
+    first, = _questions('A')
+    assert grade_answers({str(first): 'A'})[0] == 1
+
+    # Another process edits the key and bumps the shared version, while
+    # the version this process read last is still within its TTL
+    db.session.execute(db.update(QuizQuestion).where(
+        QuizQuestion.id == first).values(correct_answer='B'))
+    db.session.execute(db.update(CacheVersion).where(
+        CacheVersion.name == BANK_VERSION).values(
+        version=CacheVersion.version + 1))
+    db.session.commit()
+    assert grade_answers({str(first): 'A'})[0] == 0
+    assert grade_answers({str(first): 'B'})[0] == 1
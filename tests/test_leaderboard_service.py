@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import LeaderboardEntry, QuizResult, User
+from app.services import leaderboard_service
+from app.services.leaderboard_service import (leaderboard, period_keys,
+                                              rebuild_leaderboard,
+                                              record_results)
+
+
+@pytest.mark.parametrize('moment, week, month', [
+    (datetime(2026, 10, 18, 23, 59), 'week:2026-W42', 'month:2026-10'),
+    (datetime(2027, 1, 1), 'week:2026-W53', 'month:2027-01'),
+    (datetime(2024, 12, 30), 'week:2025-W01', 'month:2024-12')])
+def test_periods_follow_iso_weeks_and_calendar_months(moment, week, month):
+    assert period_keys(moment) == {'all': 'all', 'week': week,
+                                   'month': month}
+
+
+def _users(*names):
+    users = [User(username=name, password='x') for name in names]
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.id for user in users]
+
+
+def _rollups():
+    return {(row.period, row.user_id): (row.attempts, row.total_score,
+                                        row.total_questions, row.best_pct,
+                                        pytest.approx(row.avg_pct))
+            for row in LeaderboardEntry.query}
+
+
+@pytest.mark.parametrize('upsert', [True, False],
+                         ids=['on_conflict', 'portable'])
+def test_results_roll_up_per_period(app, monkeypatch, upsert):
+    if not upsert:
+        monkeypatch.setattr(leaderboard_service, '_upsert_statement',
+                            lambda dialect_name: None)
+    alice, = _users('alice')
+    record_results([(alice, 5, 10, datetime(2026, 9, 30)),
+                    (alice, 9, 10, datetime(2026, 10, 1))])
+    db.session.commit()
+    record_results([(alice, 6, 10, datetime(2026, 10, 2)),
+                    (alice, 0, 0, datetime(2026, 10, 2))])
+    db.session.commit()
+
+    assert _rollups() == {
+        ('all', alice): (3, 20, 30, 0.9, 20 / 30),
+        ('month:2026-09', alice): (1, 5, 10, 0.5, 0.5),
+        ('month:2026-10', alice): (2, 15, 20, 0.9, 0.75),
+        ('week:2026-W40', alice): (3, 20, 30, 0.9, 20 / 30)}
+
+
+def test_rebuild_matches_recorded_rollups(app):
+    alice, bob = _users('alice', 'bob')
+    results = [(alice, 5, 10, datetime(2026, 9, 30)),
+               (bob, 3, 4, datetime(2026, 10, 1)),
+               (alice, 9, 10, datetime(2026, 10, 8))]
+    record_results(results)
+    db.session.add_all(QuizResult(user_id=user_id, score=score,
+                                  total_questions=total, timestamp=moment,
+                                  user_answers='{}', question_ids='[]')
+                       for user_id, score, total, moment in results)
+    db.session.commit()
+    recorded = _rollups()
+
+    assert rebuild_leaderboard(batch_size=2) == len(recorded)
+    assert _rollups() == recorded
+
+
+def test_top_and_rank_share_ties(app):
+    alice, bob, carol = _users('alice', 'bob', 'carol')
+    moment = datetime(2026, 10, 18)
+    record_results([(alice, 8, 10, moment), (bob, 9, 10, moment),
+                    (carol, 9, 10, moment)])
+    db.session.commit()
+    leaderboard.configure(2, 30)
+
+    top = leaderboard.top('all')
+    assert [entry['username'] for entry in top] == ['bob', 'carol']
+    assert leaderboard.rank('all', carol)[0] == 1
+    # Outside the loaded top K, ranked with a count query
+    assert leaderboard.rank('all', alice)[0] == 3
+    assert leaderboard.rank('week:2020-W01', alice) is None
+
+    # A new result moves alice up without reloading the board
+    record_results([(alice, 10, 10, moment)])
+    db.session.commit()
+    leaderboard.record(alice, 'alice', moment)
+    assert [entry['username'] for entry in leaderboard.top('all')] == [
+        'alice', 'bob']
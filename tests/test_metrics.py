@@ -0,0 +1,26 @@
+import pytest
+
+from app.metrics import metrics
+
+
+@pytest.mark.parametrize('propagate', [False, True])
+def test_unhandled_errors_are_counted_as_500(app, propagate):
+    app.config['PROPAGATE_EXCEPTIONS'] = propagate
+
+    @app.route('/broken')
+    def broken():
+        raise RuntimeError('broken')
+
+    metrics.clear()
+    client = app.test_client()
+    if propagate:
+        with pytest.raises(RuntimeError):
+            client.get('/broken')
+    else:
+        assert client.get('/broken').status_code == 500
+
+    exposed = metrics.render()
+    assert ('quiz_http_requests_total{endpoint="broken",method="GET",'
+            'status="500"} 1') in exposed
+    assert ('quiz_http_request_duration_seconds_count{endpoint="broken"} 1'
+            in exposed)
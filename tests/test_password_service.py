@@ -0,0 +1,36 @@
+import pytest
+
+from app.services.password_service import (HashingPoolSaturated,
+                                           HashingTimedOut, PasswordHasher)
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher()
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hashes_in_worker_process(hasher):
+    hasher.configure(1, 0, 30, 'pbkdf2:sha256:1000')
+    password_hash = hasher.hash_password('secret')
+    assert hasher.verify_password(password_hash, 'secret')
+    assert hasher._executor._mp_context.get_start_method() != 'fork'
+
+
+def test_timeout_is_reported_as_busy(hasher):
+    hasher.configure(1, 0, 0.01, 'pbkdf2:sha256:5000000')
+    with pytest.raises(HashingTimedOut):
+        hasher.hash_password('secret')
+    assert issubclass(HashingTimedOut, HashingPoolSaturated)
+
+
+@pytest.mark.parametrize('method', [
+    None, 'scrypt', 'scrypt:16384:8:1', 'pbkdf2', 'pbkdf2:sha512',
+    'pbkdf2:sha256:1000'])
+def test_needs_rehash_matches_new_hashes(hasher, method):
+    hasher.configure(0, 0, 30, method)
+    password_hash = hasher.hash_password('secret')
+    assert not hasher.needs_rehash(password_hash)
+    hasher.configure(0, 0, 30, 'pbkdf2:sha256:2000')
+    assert hasher.needs_rehash(password_hash)
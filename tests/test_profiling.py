@@ -0,0 +1,44 @@
+import os
+import threading
+
+from flask import Flask
+
+from app.profiling import PROFILE_SUFFIX, init_profiling
+
+
+def test_overlapping_requests_are_profiled_one_at_a_time(tmp_path):
+    app = Flask(__name__)
+    app.config.update(PROFILING_ENABLED=True, PROFILE_SAMPLE_RATE=1.0,
+                      PROFILE_HEADER='', PROFILE_DIR=str(tmp_path),
+                      PROFILE_KEEP=10)
+    init_profiling(app)
+    started, release = threading.Event(), threading.Event()
+
+    @app.route('/slow')
+    def slow():
+        started.set()
+        release.wait(10)
+        return 'slow'
+
+    @app.route('/fast')
+    def fast():
+        return 'fast'
+
+    responses = {}
+    slow_request = threading.Thread(target=lambda: responses.update(
+        slow=app.test_client().get('/slow').status_code))
+    slow_request.start()
+    assert started.wait(10)
+    # Sampled too, but runs unprofiled while /slow holds the profiler
+    responses['fast'] = app.test_client().get('/fast').status_code
+    release.set()
+    slow_request.join(10)
+
+    assert responses == {'slow': 200, 'fast': 200}
+    profiles = [name for _, _, files in os.walk(tmp_path)
+                for name in files if name.endswith(PROFILE_SUFFIX)]
+    assert len(profiles) == 1
+    assert os.listdir(tmp_path) == ['slow']
+    # The profiler is free again afterwards
+    assert app.test_client().get('/fast').status_code == 200
+    assert sorted(os.listdir(tmp_path)) == ['fast', 'slow']
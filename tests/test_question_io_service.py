@@ -0,0 +1,88 @@
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.models import ExamPaper, QuizQuestion
+from app.services.attempt_service import unpack_question_ids
+from app.services.exam_service import schedule_exam
+from app.services.question_io_service import (export_questions,
+                                              import_questions)
+from app.services.quiz_service import get_question_ids
+
+HEADER = 'question_text,answer_a,answer_b,answer_c,answer_d,correct_answer\n'
+
+
+def _rows(count, start=0):
+    return ''.join(f'Question {number}?,a,b,c,d,A\n'
+                   for number in range(start, start + count))
+
+
+def test_invalid_rows_are_rejected_and_reported(app):
+    errors = io.StringIO()
+    stream = io.StringIO(HEADER + 'Valid question?,a,b,c,d,B\n'
+                         ',a,b,c,d,A\n'
+                         'Bad answer?,a,b,c,d,E\n')
+    assert import_questions(stream, errors=errors) == (1, 2)
+
+    report = list(csv.reader(io.StringIO(errors.getvalue())))
+    assert report[0] == ['line', 'error', 'row']
+    assert [line for line, _, _ in report[1:]] == ['3', '4']
+    assert 'question_text' in report[1][1]
+    assert 'correct_answer' in report[2][1]
+    assert QuizQuestion.query.one().correct_answer == 'B'
+
+
+def test_jsonl_rejects_unparsable_lines(app):
+    stream = io.StringIO(
+        '{"question_text": "Q?", "answer_a": "a", "answer_b": "b", '
+        '"answer_c": "c", "answer_d": "d", "correct_answer": "C"}\n'
+        '\n'
+        'not json\n'
+        '[1, 2]\n')
+    assert import_questions(stream, 'jsonl') == (1, 2)
+
+
+def test_export_round_trips(app):
+    import_questions(io.StringIO(HEADER + _rows(3)), batch_size=2)
+    exported = ''.join(export_questions('csv', batch_size=2))
+    assert exported.replace('\r\n', '\n') == HEADER + _rows(3)
+
+
+class _FailingStream:
+    """Lines of a CSV file that fails to read after ``good`` rows."""
+
+    def __init__(self, good):
+        self._lines = iter([HEADER, *_rows(good).splitlines(True)])
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self._lines, None)
+        if line is None:
+            raise OSError('connection reset')
+        return line
+
+
+def test_failed_import_still_serves_committed_batches(app):
+    import_questions(io.StringIO(HEADER + _rows(5)))
+    assert len(get_question_ids()) == 5
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    exam = schedule_exam('Final', now + timedelta(days=1),
+                         now + timedelta(days=2), 3600, 5, 1)
+    paper = ExamPaper.query.filter_by(exam_id=exam.id).one()
+    assert set(unpack_question_ids(paper.question_ids)) == set(range(1, 6))
+
+    db.session.execute(db.delete(QuizQuestion).where(QuizQuestion.id <= 5))
+    db.session.commit()
+    with pytest.raises(OSError):
+        import_questions(_FailingStream(2), batch_size=1)
+
+    assert len(get_question_ids()) == 2
+    db.session.refresh(paper)
+    # The upcoming exam drew its paper again from the imported questions
+    assert set(unpack_question_ids(paper.question_ids)) == set(
+        get_question_ids())
@@ -0,0 +1,15 @@
+from app import db
+from app.models import CacheVersion
+from app.services.quiz_service import BANK_VERSION, bank_version
+
+
+def test_bump_creates_then_increments_the_version(app):
+    assert db.session.get(CacheVersion, BANK_VERSION) is None
+    start = bank_version.current(fresh=True)
+
+    bank_version.bump()
+    assert db.session.get(CacheVersion, BANK_VERSION).version == 1
+    bank_version.bump()
+    db.session.expire_all()
+    assert db.session.get(CacheVersion, BANK_VERSION).version == 2
+    assert bank_version.current() == start + 2
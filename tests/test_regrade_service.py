@@ -0,0 +1,102 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import QuizAnswer, QuizQuestion, QuizResult, User
+from app.services import regrade_service
+from app.services.result_archive import archive_results, result_archive
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def grading(request, monkeypatch):
+    """Runs a test with NumPy grading and with the plain Python fallback."""
+    numpy = regrade_service._load_numpy()
+    if request.param == 'python':
+        monkeypatch.setattr(regrade_service, 'np', None)
+    elif numpy is None:
+        pytest.skip('NumPy is not installed')
+    return request.param
+
+
+def _submit_all_correct(user, questions):
+    result = QuizResult(
+        user_id=user.id, score=len(questions), timestamp=datetime(2024, 1, 1),
+        total_questions=len(questions),
+        user_answers=json.dumps({str(question.id): question.correct_answer
+                                 for question in questions}),
+        question_ids=json.dumps([question.id for question in questions]))
+    db.session.add(result)
+    db.session.flush()
+    db.session.add_all(QuizAnswer(result_id=result.id,
+                                  question_id=question.id,
+                                  chosen=question.correct_answer,
+                                  is_correct=True)
+                       for question in questions)
+    db.session.commit()
+    return result
+
+
+def test_deleted_question_keeps_its_grade(app, grading):
+    user = User(username='student', password='x')
+    questions = [QuizQuestion(question_text=f'Q{number}?', answer_a='a',
+                              answer_b='b', answer_c='c', answer_d='d',
+                              correct_answer='A')
+                 for number in range(5)]
+    db.session.add_all([user, *questions])
+    db.session.commit()
+    result = _submit_all_correct(user, questions)
+
+    db.session.delete(questions[0])
+    db.session.commit()
+    checked, answers_changed, results_changed = \
+        regrade_service.regrade_results()
+
+    assert (checked, answers_changed, results_changed) == (5, 0, 0)
+    assert db.session.get(QuizResult, result.id).score == 5
+    assert QuizAnswer.query.filter_by(is_correct=False).count() == 0
+
+
+def test_changed_key_still_regrades(app, grading):
+    user = User(username='student', password='x')
+    questions = [QuizQuestion(question_text=f'Q{number}?', answer_a='a',
+                              answer_b='b', answer_c='c', answer_d='d',
+                              correct_answer='A')
+                 for number in range(3)]
+    db.session.add_all([user, *questions])
+    db.session.commit()
+    result = _submit_all_correct(user, questions)
+
+    questions[1].correct_answer = 'B'
+    db.session.delete(questions[2])
+    db.session.commit()
+    assert regrade_service.regrade_results() == (3, 1, 1)
+    assert db.session.get(QuizResult, result.id).score == 2
+
+
+def test_archived_results_are_regraded(app, grading):
+    user = User(username='student', password='x')
+    questions = [QuizQuestion(question_text=f'Q{number}?', answer_a='a',
+                              answer_b='b', answer_c='c', answer_d='d',
+                              correct_answer='A')
+                 for number in range(3)]
+    db.session.add_all([user, *questions])
+    db.session.commit()
+    archived = _submit_all_correct(user, questions)
+    archived.timestamp = datetime(2020, 1, 1)
+    db.session.commit()
+    archived_id = archived.id
+    _submit_all_correct(user, questions)
+    assert archive_results(result_archive.directory, 365) == (1, 3)
+
+    questions[1].correct_answer = 'B'
+    db.session.commit()
+    assert regrade_service.regrade_results([questions[1].id]) == (2, 2, 2)
+
+    result = result_archive.get(user.id, archived_id)
+    assert result.score == 2
+    assert [correct for _, _, correct in result.segment.answers(
+        result.answer_start, result.answer_count)] == [True, False, True]
+    # Nothing is left to regrade
+    assert regrade_service.regrade_results() == (6, 0, 0)
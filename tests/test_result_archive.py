@@ -0,0 +1,61 @@
+import json
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import QuizAnswer, QuizResult, User
+from app.services.result_archive import archive_results, result_archive
+from app.services.result_service import (get_latest_result_stamp,
+                                         get_results_page)
+
+
+def _result(user, days_ago, answered=True):
+    result = QuizResult(user_id=user.id, score=1, total_questions=1,
+                        timestamp=datetime.now() - timedelta(days=days_ago),
+                        user_answers=json.dumps({'1': 'A'}),
+                        question_ids=json.dumps([1]))
+    db.session.add(result)
+    db.session.flush()
+    if answered:
+        db.session.add(QuizAnswer(result_id=result.id, question_id=1,
+                                  chosen='A', is_correct=True))
+    db.session.commit()
+    return result.id
+
+
+def _history(user_id, per_page):
+    ids, cursor = [], None
+    while True:
+        page, cursor = get_results_page(user_id, cursor, per_page)
+        ids += [result.id for result in page]
+        if cursor is None:
+            return ids
+
+
+def test_history_merges_archive_with_older_stored_results(app):
+    user = User(username='student', password='x')
+    db.session.add(user)
+    db.session.commit()
+    unanswered = _result(user, 500, answered=False)
+    old = _result(user, 400)
+    new = _result(user, 0)
+
+    assert archive_results(result_archive.directory, 365) == (1, 1)
+    assert QuizResult.query.count() == 2
+    for per_page in (1, 2, 10):
+        assert _history(user.id, per_page) == [new, old, unanswered]
+
+
+def test_latest_stamp_prefers_newer_archived_result(app):
+    user = User(username='student', password='x')
+    db.session.add(user)
+    db.session.commit()
+    _result(user, 500, answered=False)
+    old = _result(user, 400)
+    # Someone else's newer result keeps the user's results archivable
+    other = User(username='other', password='x')
+    db.session.add(other)
+    db.session.commit()
+    _result(other, 0)
+
+    archive_results(result_archive.directory, 365)
+    assert get_latest_result_stamp(user.id)[0] == old
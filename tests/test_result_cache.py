@@ -0,0 +1,65 @@
+import json
+from datetime import datetime
+
+from app import db
+from app.models import QuizQuestion, QuizResult, User
+from app.services.quiz_service import invalidate_question_cache
+from app.services.result_cache import FragmentCache
+from app.services.result_service import save_answers
+
+
+def test_fragments_are_evicted_by_count_and_size(app):
+    cache = FragmentCache(max_entries=2, max_bytes=40)
+    cache.put(1, 'a' * 5)
+    cache.put(2, 'b' * 5)
+    assert cache.get(1) == ('a' * 5, None)
+    cache.put(3, 'c' * 5)  # Evicts 2, the least recently used
+    assert cache.get(2) is None
+    cache.put(4, 'd' * 11)  # Over a quarter of max_bytes, not cached
+    assert cache.get(4) is None
+    cache.put(1, 'e' * 10, 'meta')
+    assert cache.get(1) == ('e' * 10, 'meta')
+    assert cache.stats()['bytes'] == 15
+
+    invalidate_question_cache()
+    assert cache.get(1) is None
+
+
+def _login(app, user):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+    return client
+
+
+def test_results_pages_are_answered_with_304(app):
+    question = QuizQuestion(question_text='Q?', answer_a='a', answer_b='b',
+                            answer_c='c', answer_d='d', correct_answer='A')
+    user = User(username='student', password='x')
+    db.session.add_all([question, user])
+    db.session.commit()
+    result = QuizResult(user_id=user.id, score=1, total_questions=1,
+                        timestamp=datetime(2026, 1, 1),
+                        user_answers=json.dumps({str(question.id): 'A'}),
+                        question_ids=json.dumps([question.id]))
+    db.session.add(result)
+    db.session.flush()
+    save_answers(result, {str(question.id): 'A'}, {str(question.id): True})
+    db.session.commit()
+    client = _login(app, user)
+
+    for url in (f'/results?result_id={result.id}', '/results_history'):
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert response.headers['Last-Modified']
+        assert client.get(url, headers={'If-None-Match': etag}
+                          ).status_code == 304
+
+        # Changing the bank retires the tags
+        invalidate_question_cache()
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
@@ -0,0 +1,92 @@
+import json
+from datetime import datetime
+
+from app import db
+from app.models import QuizAnswer, QuizQuestion, QuizResult, User
+from app.services.result_service import (backfill_answers, decode_cursor,
+                                         encode_cursor, get_result_answers,
+                                         get_results_page, save_answers)
+
+
+def _user():
+    user = User(username='student', password='x')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _result(user, user_answers, timestamp=None):
+    result = QuizResult(user_id=user.id, score=0,
+                        total_questions=len(user_answers),
+                        timestamp=timestamp or datetime(2026, 1, 1),
+                        user_answers=json.dumps(user_answers),
+                        question_ids=json.dumps(
+                            [int(question_id)
+                             for question_id in user_answers]))
+    db.session.add(result)
+    db.session.commit()
+    return result
+
+
+def test_answers_are_read_from_rows_in_quiz_order(app):
+    result = _result(_user(), {'7': 'A', '3': 'None'})
+    save_answers(result, {'7': 'A', '3': 'None'}, {'7': True, '3': False})
+    db.session.commit()
+
+    rows = QuizAnswer.query.order_by(QuizAnswer.id).all()
+    assert [(row.question_id, row.chosen, row.is_correct)
+            for row in rows] == [(7, 'A', True), (3, None, False)]
+    assert get_result_answers(result) == ([7, 3], {'7': 'A', '3': 'None'})
+
+
+def test_backfill_copies_legacy_answers_once(app):
+    question = QuizQuestion(question_text='Q?', answer_a='a', answer_b='b',
+                            answer_c='c', answer_d='d', correct_answer='B')
+    db.session.add(question)
+    db.session.commit()
+    user = _user()
+    legacy = _result(user, {str(question.id): 'B', '999': 'None'})
+    # Read from the JSON columns until backfilled
+    assert get_result_answers(legacy) == ([question.id, 999],
+                                          {str(question.id): 'B',
+                                           '999': 'None'})
+    migrated = _result(user, {str(question.id): 'A'})
+    save_answers(migrated, {str(question.id): 'A'}, {str(question.id): False})
+    db.session.commit()
+
+    assert backfill_answers(batch_size=1) == (1, 2)
+    assert backfill_answers(batch_size=1) == (0, 0)
+    rows = QuizAnswer.query.filter_by(result_id=legacy.id).order_by(
+        QuizAnswer.id).all()
+    assert [(row.question_id, row.chosen, row.is_correct)
+            for row in rows] == [(question.id, 'B', True), (999, None, False)]
+
+
+def test_cursor_round_trip():
+    result = QuizResult(id=42, timestamp=datetime(2026, 3, 1, 12, 30, 5,
+                                                  123456))
+    assert decode_cursor(encode_cursor(result)) == (result.timestamp, 42)
+    for cursor in (None, '', 'garbage', '2026-03-01_x', 'x_1'):
+        assert decode_cursor(cursor) is None
+
+
+def test_results_pages_break_timestamp_ties_by_id(app):
+    user = _user()
+    same_time = datetime(2026, 2, 1)
+    ids = [_result(user, {'1': 'A'}, timestamp).id
+           for timestamp in (datetime(2026, 1, 1), same_time, same_time,
+                             same_time, datetime(2026, 3, 1))]
+    other = User(username='other', password='x')
+    db.session.add(other)
+    db.session.commit()
+    _result(other, {'1': 'A'}, same_time)
+
+    for per_page in (1, 2, 4, 5, 10):
+        seen, cursor = [], None
+        while True:
+            page, cursor = get_results_page(user.id, cursor, per_page)
+            assert len(page) <= per_page
+            seen += [result.id for result in page]
+            if cursor is None:
+                break
+        assert seen == [ids[4], ids[3], ids[2], ids[1], ids[0]]
@@ -0,0 +1,77 @@
+import pytest
+
+from app import db
+from app.models import QuizQuestion
+from app.services.search_service import list_questions, search_questions
+
+
+def _question(text, answer='Paris'):
+    question = QuizQuestion(question_text=text, answer_a=answer,
+                            answer_b='b', answer_c='c', answer_d='d',
+                            correct_answer='A')
+    db.session.add(question)
+    db.session.commit()
+    return question
+
+
+def _ids(text):
+    return [question.id for question in search_questions(text)[0]]
+
+
+@pytest.fixture(params=[True, False], ids=['fts', 'like'])
+def search_index(app, request):
+    if request.param:
+        assert app.extensions['question_search_fts']
+    else:
+        app.extensions['question_search_fts'] = False
+    return request.param
+
+
+def test_index_follows_inserts_updates_and_deletes(app, search_index):
+    capital = _question('What is the capital of France?')
+    river = _question('Which river flows through Cairo?', answer='Nile')
+
+    assert _ids('capi') == [capital.id]
+    assert _ids('france capital') == [capital.id]
+    assert _ids('nile') == [river.id]
+    assert _ids('capital nile') == []
+
+    capital.question_text = 'What is the largest city of France?'
+    db.session.commit()
+    assert _ids('capital') == []
+    assert _ids('largest') == [capital.id]
+
+    db.session.delete(river)
+    db.session.commit()
+    assert _ids('nile') == []
+
+
+@pytest.mark.parametrize('text', [
+    'say "hi', 'AND', 'OR NOT', 'NEAR(x y)', 'zed*', 'x:y', '100%',
+    'under_score', "it's"])
+def test_search_text_is_taken_literally(app, search_index, text):
+    match = _question(f'Odd text {text} inside')
+    _question('Nothing special here')
+
+    assert _ids(text) == [match.id]
+
+
+@pytest.mark.parametrize('text', ['"', '(', '*', '-', '^'])
+def test_punctuation_alone_is_no_syntax_error(app, search_index, text):
+    _question(f'Odd text {text} inside')
+
+    search_questions(text)
+
+
+def test_pages_continue_after_the_cursor(app, search_index):
+    ids = [_question(f'Question number {number}').id for number in range(5)]
+
+    for search in (lambda after: search_questions('question', after, 2),
+                   lambda after: list_questions(after, 2)):
+        seen, after = [], None
+        while True:
+            page, after = search(after)
+            seen += [question.id for question in page]
+            if after is None:
+                break
+        assert seen == ids
@@ -0,0 +1,41 @@
+import pytest
+
+from app import db
+from app.models import QuizQuestion
+from app.services.quiz_service import invalidate_question_cache
+from app.services.snapshot_service import get_snapshots
+
+
+def _question(text):
+    question = QuizQuestion(question_text=text, answer_a='Paris',
+                            answer_b='Rome', answer_c='Oslo',
+                            answer_d='Bern', correct_answer='C')
+    db.session.add(question)
+    db.session.commit()
+    invalidate_question_cache()
+    return question.id
+
+
+def test_snapshots_keep_order_and_skip_missing(app):
+    first, second = _question('First?'), _question('Second?')
+
+    snapshots = get_snapshots([second, 999, str(first)])
+    assert [snapshot.id for snapshot in snapshots] == [second, first]
+    snapshot = snapshots[0]
+    assert snapshot.options[2] == ('C', 'Oslo')
+    assert snapshot.correct_answer_text == 'Oslo'
+    assert snapshot.user_answer_text('B') == 'Rome'
+    assert snapshot.user_answer_text('None') == 'No answer provided'
+    with pytest.raises(AttributeError):
+        snapshot.question_text = 'Changed?'
+
+
+def test_snapshots_follow_bank_changes(app):
+    question_id = _question('Before?')
+    cached = get_snapshots([question_id])[0]
+    assert get_snapshots([question_id])[0] is cached
+
+    db.session.get(QuizQuestion, question_id).question_text = 'After?'
+    db.session.commit()
+    invalidate_question_cache()
+    assert get_snapshots([question_id])[0].question_text == 'After?'
@@ -0,0 +1,91 @@
+import pytest
+
+from app import db
+from app.models import (QuestionStats, QuizAnswer, QuizQuestion, QuizResult,
+                        User)
+from app.services import stats_service
+from app.services.stats_service import (get_question_stats_page,
+                                        rebuild_question_stats,
+                                        record_submission,
+                                        record_submissions)
+
+SUBMISSIONS = [
+    ({'1': 'A', '2': 'B'}, {'1': True, '2': False}),
+    ({'1': 'C', '2': 'None'}, {'1': False, '2': False}),
+    ({'1': 'A', '3': 'D'}, {'1': True, '3': True}),
+]
+
+
+def _stats():
+    return {row.question_id: (row.times_served, row.times_correct,
+                              row.count_a, row.count_b, row.count_c,
+                              row.count_d, row.correct_rate)
+            for row in QuestionStats.query}
+
+
+@pytest.mark.parametrize('upsert', [True, False],
+                         ids=['on_conflict', 'portable'])
+def test_counts_add_up_across_batches(app, monkeypatch, upsert):
+    if not upsert:
+        monkeypatch.setattr(stats_service, '_upsert_statement',
+                            lambda dialect_name: None)
+    record_submissions(SUBMISSIONS[:2])
+    record_submission(*SUBMISSIONS[2])
+    db.session.commit()
+
+    assert _stats() == {1: (3, 2, 2, 0, 1, 0, pytest.approx(2 / 3)),
+                        2: (2, 0, 0, 1, 0, 0, 0.0),
+                        3: (1, 1, 0, 0, 0, 1, 1.0)}
+
+
+def test_rebuild_matches_recorded_counts(app):
+    user = User(username='student', password='x')
+    db.session.add(user)
+    db.session.commit()
+    record_submissions(SUBMISSIONS)
+    for user_answers, correctness in SUBMISSIONS:
+        result = QuizResult(user_id=user.id, score=0, total_questions=2,
+                            user_answers='{}', question_ids='[]')
+        db.session.add(result)
+        db.session.flush()
+        db.session.add_all(
+            QuizAnswer(result_id=result.id, question_id=int(question_id),
+                       chosen=None if answer == 'None' else answer,
+                       is_correct=correctness[question_id])
+            for question_id, answer in user_answers.items())
+    db.session.commit()
+    recorded = _stats()
+
+    assert rebuild_question_stats() == 3
+    assert _stats() == recorded
+
+
+def test_stats_pages_by_difficulty(app):
+    questions = [QuizQuestion(question_text=f'Q{number}?', answer_a='a',
+                              answer_b='b', answer_c='c', answer_d='d',
+                              correct_answer='A') for number in range(5)]
+    db.session.add_all(questions)
+    db.session.commit()
+    # Rates 0.5, 0, 0.5, 1, 0.5
+    record_submissions(
+        ({str(question.id): 'A'}, {str(question.id): correct})
+        for question, grades in zip(questions, [(True, False), (False,),
+                                                (False, True), (True,),
+                                                (True, False)])
+        for correct in grades)
+    db.session.commit()
+    ids = [question.id for question in questions]
+
+    for hardest_first, expected in (
+            (True, [ids[1], ids[0], ids[2], ids[4], ids[3]]),
+            (False, [ids[3], ids[4], ids[2], ids[0], ids[1]])):
+        seen, cursor = [], None
+        while True:
+            rows, cursor = get_question_stats_page(hardest_first, cursor, 2)
+            seen += [stats.question_id for stats, _ in rows]
+            if cursor is None:
+                break
+        assert seen == expected
+    # A malformed cursor starts over
+    rows, _ = get_question_stats_page(True, 'garbage', 2)
+    assert [stats.question_id for stats, _ in rows] == [ids[1], ids[0]]
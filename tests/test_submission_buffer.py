@@ -0,0 +1,125 @@
+import json
+import os
+from datetime import datetime
+from time import sleep
+from types import SimpleNamespace
+
+from app import db
+from app.models import QuizResult, User
+from app.services import submission_buffer
+from app.services.submission_buffer import (SubmissionBuffer,
+                                            SubmissionJournal, _reserve_ids,
+                                            replay_journal, store_submissions)
+
+
+def _user():
+    user = User(username='student', password='x')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _record(result_id, user_id):
+    return {'id': result_id, 'user_id': user_id,
+            'attempt_id': f'attempt-{result_id}', 'score': 1, 'total': 1,
+            'answers': [[1, 'A', True]], 'at': datetime(2026, 1, 1)}
+
+
+def test_replay_is_chunked_and_idempotent(app, tmp_path):
+    user = _user()
+    journal = SubmissionJournal.claim(str(tmp_path / 'journal'))
+    for result_id in range(1, 1201):
+        journal.append(_record(result_id, user.id))
+    store_submissions([_record(1, user.id)])
+    db.session.commit()
+
+    assert replay_journal(journal) == 1199
+    assert QuizResult.query.count() == 1200
+    assert os.path.getsize(journal.path) == 0
+    journal.close()
+
+
+def test_journal_rotates_under_sustained_load(app, tmp_path, monkeypatch):
+    user = _user()
+    directory = str(tmp_path / 'journal')
+    monkeypatch.setattr(submission_buffer, 'JOURNAL_ROTATE_RECORDS', 3)
+    store = submission_buffer.store_submissions
+
+    def slow_store(records, skip_stored=False):
+        sleep(0.05)
+        return store(records, skip_stored)
+
+    monkeypatch.setattr(submission_buffer, 'store_submissions', slow_store)
+    buffer = SubmissionBuffer(app, directory, interval=0, flush_size=2,
+                              fsync=False)
+    for number in range(12):
+        attempt = SimpleNamespace(id=f'attempt-{number}', question_ids=[1])
+        buffer.submit(attempt, user, 1, {1: 'A'}, {1: True})
+    assert buffer.wait(user.id, timeout=10)
+    buffer.close()
+
+    assert QuizResult.query.count() == 12
+    journals = sorted(os.listdir(directory))
+    assert len(journals) > 1
+    assert all(os.path.getsize(os.path.join(directory, name)) == 0
+               for name in journals)
+
+
+def test_wait_for_result_buffered_elsewhere(app, tmp_path):
+    user = _user()
+    buffer = SubmissionBuffer(app, str(tmp_path / 'journal'))
+    # Reserved by another process, which has not stored it yet
+    result_id = _reserve_ids(10)[0]
+
+    assert not buffer.wait(user.id, result_id, timeout=0.05)
+    store_submissions([_record(result_id, user.id)])
+    db.session.commit()
+    assert buffer.wait(user.id, result_id, timeout=0.05)
+    # IDs that were never handed out are not waited for
+    assert buffer.wait(user.id, result_id + 100, timeout=0)
+
+
+def test_writer_reserves_ids_ahead(app, tmp_path):
+    user = _user()
+    buffer = SubmissionBuffer(app, str(tmp_path / 'journal'), interval=0,
+                              id_block=4, fsync=False)
+    for number in range(3):
+        attempt = SimpleNamespace(id=f'attempt-{number}', question_ids=[1])
+        buffer.submit(attempt, user, 1, {1: 'A'}, {1: True})
+    assert buffer.wait(user.id, timeout=10)
+    # At most one ID was left; the writer reserves the next block after
+    # storing, without a submission waiting for it
+    for _ in range(100):
+        if len(buffer._ids) > 2:
+            break
+        sleep(0.01)
+    buffer.close()
+    assert buffer._ids[0] == 4 and len(buffer._ids) > 2
+
+
+def test_bad_submission_is_set_aside(app, tmp_path, monkeypatch):
+    user = _user()
+    directory = str(tmp_path / 'journal')
+    store = submission_buffer.store_submissions
+
+    def store_but_one(records, skip_stored=False):
+        if any(record['attempt_id'] == 'attempt-1' for record in records):
+            raise ValueError('cannot be stored')
+        return store(records, skip_stored)
+
+    monkeypatch.setattr(submission_buffer, 'store_submissions',
+                        store_but_one)
+    buffer = SubmissionBuffer(app, directory, interval=0.05, fsync=False)
+    for number in range(3):
+        attempt = SimpleNamespace(id=f'attempt-{number}', question_ids=[1])
+        buffer.submit(attempt, user, 1, {1: 'A'}, {1: True})
+    assert buffer.wait(user.id, timeout=10)
+    buffer.close()
+
+    assert QuizResult.query.count() == 2
+    with open(os.path.join(directory,
+                           submission_buffer.DEAD_LETTER_NAME)) as dead:
+        assert [json.loads(line)['attempt_id'] for line in dead] == [
+            'attempt-1']
+    assert os.path.getsize(os.path.join(directory,
+                                        'submissions-0.journal')) == 0
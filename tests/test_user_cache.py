@@ -0,0 +1,45 @@
+from app import db
+from app.metrics import metrics
+from app.models import User
+from app.services.user_cache import user_cache
+
+
+def test_role_change_invalidates_after_commit(app):
+    user = User(username='alice', password='hash', role='user')
+    db.session.add(user)
+    db.session.commit()
+    assert user_cache.get(user.id).role == 'user'
+
+    user.role = 'admin'
+    db.session.flush()
+    # Until the commit, other requests still read the old row
+    assert user_cache.get(user.id).role == 'user'
+    db.session.commit()
+    assert user_cache.get(user.id).role == 'admin'
+
+
+def test_rolled_back_change_keeps_snapshot(app):
+    user = User(username='bob', password='hash', role='user')
+    db.session.add(user)
+    db.session.commit()
+    user_cache.get(user.id)
+
+    user.role = 'admin'
+    db.session.flush()
+    db.session.rollback()
+    hits = user_cache.stats()['hits']
+    assert user_cache.get(user.id).role == 'user'
+    assert user_cache.stats()['hits'] == hits + 1
+
+
+def test_cache_counters_exported(app):
+    user = User(username='carol', password='hash', role='user')
+    db.session.add(user)
+    db.session.commit()
+    user_cache.get(user.id)
+    stats = user_cache.stats()
+
+    text = metrics.render()
+    assert f'quiz_cache_misses_total{{cache="user"}} {stats["misses"]}' in text
+    assert f'quiz_cache_entries{{cache="user"}} {stats["size"]}' in text
+    assert 'quiz_cache_hits_total{cache="result_fragment"}' in text